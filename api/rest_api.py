@@ -5,7 +5,7 @@ import io
 from contextlib import redirect_stdout
 import traceback
 
-from language.interpreter.Interpreter import Interpreter
+from language.interpreter.Interpreter import Interpreter, engines
 from language.lexer.Lexer import Lexer
 from language.parser.Parser import Parser
 from language.lexer.Source import SourceString
@@ -18,6 +18,7 @@ app = FastAPI(
 
 class CodeRequest(BaseModel):
     code: str
+    engine: str = "tree"
 
 class CodeResponse(BaseModel):
     success: bool
@@ -36,6 +37,8 @@ async def execute_code(request: CodeRequest):
     try:
         if not request.code.strip():
             raise HTTPException(status_code=400, detail="No code provided")
+        if request.engine not in engines:
+            raise HTTPException(status_code=400, detail=f"Unknown engine '{request.engine}'. Available engines: {', '.join(engines)}")
         
         # Capture stdout to get print output
         output_capture = io.StringIO()
@@ -46,7 +49,7 @@ async def execute_code(request: CodeRequest):
                 lexer = Lexer(source)
                 parser = Parser(lexer)
                 parsed_program = parser.parse_program()
-                interpreter = Interpreter(parsed_program)
+                interpreter = Interpreter(parsed_program, request.engine)
                 result = interpreter.run()
             
             captured_output = output_capture.getvalue()
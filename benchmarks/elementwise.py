@@ -0,0 +1,59 @@
+"""
+Elementwise matrix expressions with and without fusion, on the list backend.
+
+    python -m benchmarks.elementwise
+    python -m benchmarks.elementwise --sizes 256 512 --repeat 5
+
+Evaluates A + B * 2 - C on square float matrices and prints the best time and the
+peak memory allocated while evaluating, once operator by operator and once fused.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from language.linalg import Fusion, NumpyBackend
+from language.nodes.Expressions import Matrix
+
+
+def evaluate(a, b, c):
+    # Reading the rows forces a lazy result
+    return (a + b * 2 - c).rows
+
+
+def measure(a, b, c, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        evaluate(a, b, c)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    tracemalloc.start()
+    evaluate(a, b, c)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=[128, 256, 512, 1024])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    NumpyBackend.enabled = False
+    print(f"{'size':>6} {'eager':>10} {'fused':>10} {'eager peak':>12} {'fused peak':>12}")
+
+    random.seed(0)
+    for size in args.sizes:
+        a, b, c = (Matrix([[random.random() for _ in range(size)] for _ in range(size)]) for _ in range(3))
+        Fusion.enabled = False
+        eager_time, eager_peak = measure(a, b, c, args.repeat)
+        Fusion.enabled = True
+        fused_time, fused_peak = measure(a, b, c, args.repeat)
+        print(f"{size:>6} {eager_time:>9.3f}s {fused_time:>9.3f}s {eager_peak / 2**20:>10.1f}MB {fused_peak / 2**20:>10.1f}MB", flush=True)
+
+
+if __name__ == "__main__":
+    main()
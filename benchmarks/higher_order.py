@@ -0,0 +1,78 @@
+"""
+map and sum written in Neo with a while loop against the map and sum builtins.
+
+    python -m benchmarks.higher_order
+    python -m benchmarks.higher_order --size 1000000 --repeat 5
+
+Squares and sums the cells of a 1 x size matrix on every engine and prints the
+best time of running the program each way. map is given once a function which is
+called per cell and once one whose body is a single arithmetic expression, which
+map runs as an elementwise kernel (see Vectorizer).
+"""
+import argparse
+import time
+
+from language.interpreter.Interpreter import Interpreter, engines
+from language.lexer.Lexer import Lexer
+from language.lexer.Source import SourceString
+from language.parser.Parser import Parser
+
+HANDWRITTEN = '''
+func square(x) {
+    return x * x
+}
+var m = range(SIZE)
+var mut squares = zeros(1, SIZE)
+var mut total = 0
+var mut i = 0
+while (i < SIZE) {
+    squares[0, i] = square(m[0, i])
+    total = total + squares[0, i]
+    i = i + 1
+}
+'''
+
+CALLED = '''
+func square(x) {
+    var squared = x * x
+    return squared
+}
+var squares = range(SIZE) |> map(square)
+var total = squares |> sum
+'''
+
+VECTORIZED = '''
+func square(x) {
+    return x * x
+}
+var squares = range(SIZE) |> map(square)
+var total = squares |> sum
+'''
+
+
+def best_time(program, engine, repeat):
+    best = None
+    for _ in range(repeat):
+        interpreter = Interpreter(Parser(Lexer(SourceString(program))).parse_program(), engine)
+        start = time.perf_counter()
+        interpreter.run()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'engine':>8} {'while loop':>12} {'map calls':>10} {'map kernel':>11}")
+    for engine in engines:
+        times = [best_time(program.replace('SIZE', str(args.size)), engine, args.repeat)
+                 for program in (HANDWRITTEN, CALLED, VECTORIZED)]
+        print(f"{engine:>8} {times[0]:>11.3f}s {times[1]:>9.3f}s {times[2]:>10.3f}s", flush=True)
+
+
+if __name__ == "__main__":
+    main()
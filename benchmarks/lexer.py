@@ -0,0 +1,67 @@
+"""
+Throughput of the lexer engines in tokens per second.
+
+    python -m benchmarks.lexer
+    python -m benchmarks.lexer --megabytes 20 --repeat 5
+
+Generates a program of matrix literals of random numbers (see parse_memory)
+followed by functions, loops and strings, and prints for every engine the number
+of tokens and the best time of turning the whole text into tokens.
+"""
+import argparse
+import io
+import time
+
+from benchmarks.parse_memory import generate
+from language.lexer.Lexer import Lexer, engines
+from language.lexer.Source import SourceString
+
+CODE = '''
+# Sum of the squares up to n
+func squares(n) {
+    var mut total = 0
+    var mut i = 0
+    while (i < n and not (i == 100)) {
+        total = total + i ^ 2 // 3
+        i = i + 1
+    }
+    return total
+}
+if (squares(10) >= 5) {
+    print("Squares: \\"big\\"")
+} else {
+    [1, 2 | 3, 4] |> print
+}
+'''
+
+
+def best_time(text, engine, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in Lexer(SourceString(text), engine=engine).yield_tokens())
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return count, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--megabytes", type=float, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    buffer = io.StringIO()
+    generate(buffer, int(args.megabytes * 2**20) // 2)
+    text = buffer.getvalue()
+    text += CODE * (len(text) // len(CODE))
+
+    print(f"source: {len(text) / 2**20:.1f}MB")
+    print(f"{'engine':>8} {'tokens':>10} {'time':>8} {'tokens/s':>11}")
+    for engine in engines:
+        count, seconds = best_time(text, engine, args.repeat)
+        print(f"{engine:>8} {count:>10} {seconds:>7.2f}s {count / seconds:>11.0f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
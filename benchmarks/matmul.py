@@ -0,0 +1,68 @@
+"""
+Pure-Python matrix multiplication kernels on square float matrices.
+
+    python -m benchmarks.matmul
+    python -m benchmarks.matmul --sizes 64 128 256 --thresholds 64 128
+
+Prints the time of the textbook triple loop (skipped above --naive-limit), of the
+transposed and tiled kernel, and of Strassen's recursion for every threshold.
+The fastest column of a row shows where Strassen starts to pay off. --workers adds
+the shared memory process pool of ParallelMultiplication with each worker count.
+"""
+import argparse
+import random
+import time
+
+from language.linalg import FlatStorage, ParallelMultiplication
+from language.linalg.Multiplication import BLOCK_SIZE, blocked, strassen
+
+
+def triple_loop(left, right):
+    result = [[0 for _ in range(len(right[0]))] for _ in range(len(left))]
+    for i in range(len(left)):
+        for j in range(len(right[0])):
+            for k in range(len(right)):
+                result[i][j] += left[i][k] * right[k][j]
+    return result
+
+
+def measure(kernel, *arguments):
+    start = time.perf_counter()
+    kernel(*arguments)
+    return time.perf_counter() - start
+
+
+def parallel(left, right, workers):
+    ParallelMultiplication.workers = workers
+    # Starts the pool, so its startup is not timed
+    ParallelMultiplication.get_pool()
+    left_cells, right_cells = FlatStorage.to_cells(left), FlatStorage.to_cells(right)
+    return measure(ParallelMultiplication.multiply, left_cells, right_cells, len(left), len(right), len(right[0]))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=[64, 128, 256, 512, 1024])
+    parser.add_argument("--thresholds", nargs="+", type=int, default=[64, 128, 256])
+    parser.add_argument("--naive-limit", type=int, default=256, help="Largest size timed with the triple loop")
+    parser.add_argument("--workers", nargs="*", type=int, default=[], help="Worker counts of the parallel kernel to time")
+    args = parser.parse_args()
+
+    columns = ["triple loop", f"tiled ({BLOCK_SIZE})"] + [f"strassen >= {threshold}" for threshold in args.thresholds]
+    columns += [f"{workers} workers" for workers in args.workers]
+    print(f"{'size':>6} " + " ".join(f"{column:>16}" for column in columns))
+
+    random.seed(0)
+    for size in args.sizes:
+        left = [[random.random() for _ in range(size)] for _ in range(size)]
+        right = [[random.random() for _ in range(size)] for _ in range(size)]
+
+        times = [measure(triple_loop, left, right) if size <= args.naive_limit else None,
+                 measure(blocked, left, right, BLOCK_SIZE)]
+        times += [measure(strassen, left, right, threshold) for threshold in args.thresholds]
+        times += [parallel(left, right, workers) for workers in args.workers]
+        print(f"{size:>6} " + " ".join(f"{'-' if seconds is None else f'{seconds:.3f}s':>16}" for seconds in times), flush=True)
+
+
+if __name__ == "__main__":
+    main()
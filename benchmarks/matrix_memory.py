@@ -0,0 +1,53 @@
+"""
+Memory held by a matrix of numbers in nested lists and in flat storage, on the list backend.
+
+    python -m benchmarks.matrix_memory
+    python -m benchmarks.matrix_memory --sizes 500 1000 2000
+
+For square matrices of random floats prints the memory the matrix keeps allocated
+once built, then the time of building a small matrix and of adding two of them.
+"""
+import argparse
+import random
+import timeit
+import tracemalloc
+
+from language.linalg import NumpyBackend
+from language.nodes.Expressions import Matrix
+
+
+def retained(build, size):
+    random.seed(0)
+    tracemalloc.start()
+    matrix = build([[random.random() for _ in range(size)] for _ in range(size)])
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del matrix
+    return current
+
+
+def best_time(operation, number):
+    return min(timeit.repeat(operation, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=[250, 500, 1000])
+    args = parser.parse_args()
+
+    NumpyBackend.enabled = False
+    print(f"{'size':>6} {'lists':>10} {'flat':>10}")
+    for size in args.sizes:
+        lists = retained(Matrix, size)
+        flat = retained(Matrix.from_rows, size)
+        print(f"{size:>6} {lists / 2**20:>8.1f}MB {flat / 2**20:>8.1f}MB", flush=True)
+
+    rows = [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0], [7.0, 8.0, 9.0]]
+    print(f"\nbuilding a 3x3 matrix: {best_time(lambda: Matrix(rows), 100000) * 1e9:.0f}ns")
+    for name, build in (("lists", Matrix), ("flat", Matrix.from_rows)):
+        left, right = build(rows), build(rows)
+        print(f"adding 3x3 matrices ({name}): {best_time(lambda: left + right, 100000) * 1e9:.0f}ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Peak memory of parsing a large generated Neo program.
+
+    python -m benchmarks.parse_memory
+    python -m benchmarks.parse_memory --megabytes 5
+
+Writes a program declaring matrix literals of random numbers, as emitted by a code
+generator, to a temporary file of the given size, parses it and prints the number
+of cells, the parsing time and the peak resident memory of the process above what
+it used before parsing.
+"""
+import argparse
+import os
+import random
+import resource
+import tempfile
+import time
+
+from language.lexer.Lexer import Lexer
+from language.lexer.Source import SourceFile
+from language.parser.Parser import Parser
+
+ROWS_PER_MATRIX = 100
+COLUMNS = 100
+
+
+def peak_rss():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def generate(file, size):
+    random.seed(0)
+    cells = 0
+    matrix_index = 0
+    while file.tell() < size:
+        rows = []
+        for _ in range(ROWS_PER_MATRIX):
+            rows.append(', '.join(str(random.randint(-999, 999)) if random.random() < 0.5 else f'{random.random():.3f}'
+                                  for _ in range(COLUMNS)))
+        file.write(f'var m{matrix_index} = [\n' + ' |\n'.join(rows) + '\n]\n')
+        cells += ROWS_PER_MATRIX * COLUMNS
+        matrix_index += 1
+    return cells
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--megabytes", type=float, default=50)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile('w', suffix='.neo', delete=False) as file:
+        cells = generate(file, int(args.megabytes * 2**20))
+        path = file.name
+
+    try:
+        before = peak_rss()
+        start = time.perf_counter()
+        program = Parser(Lexer(SourceFile(path))).parse_program()
+        seconds = time.perf_counter() - start
+        peak = peak_rss() - before
+        print(f"source: {os.path.getsize(path) / 2**20:.1f}MB, {len(program.toplevel_objects)} matrices, {cells} cells")
+        print(f"parsed in {seconds:.1f}s, peak RSS above the start: {peak / 2**20:.1f}MB")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
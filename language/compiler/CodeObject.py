@@ -0,0 +1,46 @@
+class CodeObject:
+    """
+    Compiled body of a Neo function or of the whole program.
+
+    instructions is a flat list of (opcode, argument) pairs, so the instruction
+    at offset i is instructions[i], its argument instructions[i + 1] and its
+    source position positions[i // 2]. Jump arguments are absolute offsets.
+    """
+    __slots__ = ("name", "parameters", "instructions", "constants", "names", "positions", "function")
+
+    def __init__(self, name, parameters=(), function=None):
+        self.name = name
+        self.parameters = tuple(parameters)
+        self.instructions = []
+        self.constants = []
+        self.names = []
+        self.positions = []
+        # Function node the code was compiled from, None for the program itself
+        self.function = function
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {self.name} ({len(self.instructions) // 2} instructions)'
+
+    def emit(self, opcode, argument=0, line=None, column=None):
+        offset = len(self.instructions)
+        self.instructions.append(int(opcode))
+        self.instructions.append(argument)
+        self.positions.append((line, column))
+        return offset
+
+    def patch_jump(self, offset, target=None):
+        self.instructions[offset + 1] = len(self.instructions) if target is None else target
+
+    def add_constant(self, value):
+        # Values are compared by identity, 1 and True must not share a slot
+        for index, constant in enumerate(self.constants):
+            if constant is value:
+                return index
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def add_name(self, name):
+        if name in self.names:
+            return self.names.index(name)
+        self.names.append(name)
+        return len(self.names) - 1
@@ -0,0 +1,247 @@
+from language.nodes.Instructions import Assignment, Block, Declaration, FunctionCall, IfStatement, Return, WhileLoop
+from language.nodes.ToplevelObjects import Function
+from language.nodes.Expressions import Access, BinaryOperator, Constant, Identifier, Matrix, Property, Slice, UnaryOperator
+from language.nodes.OperatorType import OperatorType
+from language.interpreter.Built_ins import builtin_functions, higher_order_builtins
+from language.resolver.Resolver import call_of, declared_names
+from language.linalg.MatrixChain import MatrixChain, is_chain
+from language.compiler.CodeObject import CodeObject
+from language.compiler.OpCode import OpCode, to_opcode
+
+
+class Compiler:
+    """
+    Lowers the AST into CodeObjects executed by the VM. Every visit_* method
+    emits the instructions of a node into the code object being compiled.
+    Expressions leave exactly one value on the stack, instructions leave none.
+    """
+    def __init__(self):
+        self.code = None
+        # Names declared in the program, a variable named like a builtin shadows it
+        self.declared_names = set()
+
+
+    def compile_program(self, parsed_program):
+        self.code = CodeObject("<program>")
+        self.declared_names = declared_names(parsed_program.toplevel_objects)
+        for top_level_object in parsed_program.toplevel_objects:
+            self.compile_instruction(top_level_object)
+        self.code.emit(OpCode.LOAD_CONST, self.code.add_constant(None))
+        self.code.emit(OpCode.RETURN_VALUE)
+        return self.code
+
+
+    def compile_function(self, function:Function):
+        name = function.name.value if function.name else "<anonymous>"
+        enclosing_code = self.code
+        if enclosing_code.function is not None:
+            # The nested function keeps the environment of the enclosing call
+            enclosing_code.function.creates_closures = True
+        self.code = CodeObject(name, [parameter.value for parameter in function.parameter_list], function)
+
+        for instruction in function.block.instructions:
+            self.compile_instruction(instruction)
+        self.code.emit(OpCode.LOAD_CONST, self.code.add_constant(None))
+        self.code.emit(OpCode.RETURN_VALUE)
+
+        function_code, self.code = self.code, enclosing_code
+        return function_code
+
+
+    def compile_instruction(self, instruction):
+        instruction.accept(self)
+        if not isinstance(instruction, (Block, IfStatement, WhileLoop, Return, Declaration, Assignment)):
+            # Expression used as an instruction - its value is discarded
+            self.code.emit(OpCode.POP_TOP)
+
+
+    def visit_function_definition(self, function:Function):
+        function_code = self.compile_function(function)
+        self.code.emit(OpCode.MAKE_FUNCTION, self.code.add_constant(function_code), function.line, function.column)
+        if function.name:
+            self.code.emit(OpCode.DEFINE_FUNCTION, self.code.add_name(function.name.value), function.name.line, function.name.column)
+
+
+    def visit_function_call(self, function_call:FunctionCall):
+        callee = function_call.function_name_or_body
+        self.compile_call(callee, function_call.arguments, callee.line, callee.column)
+
+
+    def compile_call(self, callee, arguments, line, column, tail=False):
+        if isinstance(callee, Function):
+            # Immediately invoked function expression (IIFE), the name is not bound
+            function_code = self.compile_function(callee)
+            self.code.emit(OpCode.MAKE_FUNCTION, self.code.add_constant(function_code), callee.line, callee.column)
+            call_opcode = OpCode.TAIL_CALL if tail else OpCode.CALL
+        elif callee.value in builtin_functions and callee.value not in self.declared_names:
+            self.code.emit(OpCode.LOAD_CONST, self.code.add_constant(builtin_functions[callee.value]), line, column)
+            call_opcode = OpCode.CALL_HIGHER_ORDER_BUILTIN if callee.value in higher_order_builtins else OpCode.CALL_BUILTIN
+        else:
+            self.code.emit(OpCode.LOAD_FUNCTION, self.code.add_name(callee.value), line, column)
+            call_opcode = OpCode.TAIL_CALL if tail else OpCode.CALL
+
+        for argument in arguments:
+            argument.accept(self)
+        self.code.emit(call_opcode, len(arguments), line, column)
+
+
+    def visit_block(self, block:Block):
+        declares = any(isinstance(instruction, Declaration) or (isinstance(instruction, Function) and instruction.name)
+                       for instruction in block.instructions)
+
+        if declares:
+            self.code.emit(OpCode.PUSH_SCOPE, 0, block.line, block.column)
+        for instruction in block.instructions:
+            self.compile_instruction(instruction)
+        if declares:
+            self.code.emit(OpCode.POP_SCOPE, 0, block.line, block.column)
+
+
+    def visit_if_statement(self, if_statement:IfStatement):
+        if_statement.condition.accept(self)
+        jump_to_else = self.code.emit(OpCode.POP_JUMP_IF_FALSE, 0, if_statement.line, if_statement.column)
+        if_statement.block.accept(self)
+
+        if if_statement.else_block is None:
+            self.code.patch_jump(jump_to_else)
+            return
+
+        jump_to_end = self.code.emit(OpCode.JUMP, 0, if_statement.line, if_statement.column)
+        self.code.patch_jump(jump_to_else)
+        if_statement.else_block.accept(self)
+        self.code.patch_jump(jump_to_end)
+
+
+    def visit_while_loop(self, while_loop:WhileLoop):
+        loop_start = len(self.code.instructions)
+        while_loop.condition.accept(self)
+        jump_to_end = self.code.emit(OpCode.POP_JUMP_IF_FALSE, 0, while_loop.line, while_loop.column)
+        while_loop.block.accept(self)
+        self.code.emit(OpCode.JUMP, loop_start, while_loop.line, while_loop.column)
+        self.code.patch_jump(jump_to_end)
+
+
+    def visit_return(self, return_instruction:Return):
+        call = call_of(return_instruction.expression)
+        if self.code.function is not None and call is not None:
+            # The callee returns directly to our caller, so no RETURN_VALUE is needed
+            callee, arguments = call
+            position = return_instruction.expression if isinstance(return_instruction.expression, BinaryOperator) else callee
+            self.compile_call(callee, arguments, position.line, position.column, tail=True)
+            return
+
+        if return_instruction.expression is None:
+            self.code.emit(OpCode.LOAD_CONST, self.code.add_constant(None), return_instruction.line, return_instruction.column)
+        else:
+            return_instruction.expression.accept(self)
+        self.code.emit(OpCode.RETURN_VALUE, 0, return_instruction.line, return_instruction.column)
+
+
+    def visit_assignment(self, assignment:Assignment):
+        assignment.expression.accept(self)
+        name = self.code.add_name(assignment.identifier.value)
+
+        if not assignment.first_index:
+            self.code.emit(OpCode.STORE_NAME, name, assignment.line, assignment.column)
+            return
+
+        assignment.first_index.accept(self)
+        assignment.second_index.accept(self)
+        self.code.emit(OpCode.STORE_ELEMENT, name, assignment.line, assignment.column)
+
+
+    def visit_declaration(self, declaration:Declaration):
+        declaration.expression.accept(self)
+        opcode = OpCode.DECLARE_MUTABLE_NAME if declaration.mutable else OpCode.DECLARE_NAME
+        self.code.emit(opcode, self.code.add_name(declaration.identifier.value), declaration.line, declaration.column)
+
+
+    def visit_identifier(self, identifier:Identifier):
+        if identifier.value in builtin_functions and identifier.value not in self.declared_names:
+            self.code.emit(OpCode.LOAD_CONST, self.code.add_constant(builtin_functions[identifier.value]), identifier.line, identifier.column)
+            return
+        self.code.emit(OpCode.LOAD_NAME, self.code.add_name(identifier.value), identifier.line, identifier.column)
+
+
+    def visit_matrix(self, matrix:Matrix):
+        prototype = matrix.build_prototype()
+        if prototype is not None:
+            self.code.emit(OpCode.LOAD_MATRIX, self.code.add_constant(prototype), matrix.line, matrix.column)
+            return
+
+        for row in matrix.rows:
+            for cell in row:
+                cell.accept(self)
+        shape = (len(matrix.rows), len(matrix.rows[0]))
+        self.code.emit(OpCode.BUILD_MATRIX, self.code.add_constant(shape), matrix.line, matrix.column)
+
+
+    def visit_access(self, access:Access):
+        access.identifier.accept(self)
+        access.first.accept(self)
+        access.second.accept(self)
+        self.code.emit(OpCode.LOAD_ELEMENT, 0, access.line, access.column)
+
+
+    def visit_slice(self, slice:Slice):
+        for bound in (slice.start, slice.stop):
+            if bound is None:
+                self.code.emit(OpCode.LOAD_CONST, self.code.add_constant(None), slice.line, slice.column)
+            else:
+                bound.accept(self)
+        self.code.emit(OpCode.BUILD_SLICE, 0, slice.line, slice.column)
+
+
+    def visit_property(self, property:Property):
+        property.object_name.accept(self)
+        self.code.emit(OpCode.LOAD_PROPERTY, self.code.add_name(property.property_name.value), property.line, property.column)
+
+
+    def visit_unary_operator(self, unary:UnaryOperator):
+        unary.rvalue.accept(self)
+
+        if unary.op == OperatorType.MINUS:
+            self.code.emit(OpCode.NEGATE, 0, unary.line, unary.column)
+        elif unary.op == OperatorType.NOT:
+            self.code.emit(OpCode.NOT, 0, unary.line, unary.column)
+        else:
+            self.code.emit(OpCode.RAISE, self.code.add_constant("Unknown unary operator"), unary.line, unary.column)
+
+
+    def visit_binary_operator(self, binary:BinaryOperator):
+        if binary.op == OperatorType.PIPE:
+            if isinstance(binary.rvalue, FunctionCall):
+                # Left side becomes the first argument of the call
+                call = binary.rvalue
+                self.compile_call(call.function_name_or_body, [binary.lvalue, *call.arguments], binary.line, binary.column)
+            elif isinstance(binary.rvalue, (Identifier, Function)):
+                self.compile_call(binary.rvalue, [binary.lvalue], binary.line, binary.column)
+            else:
+                self.code.emit(OpCode.RAISE, self.code.add_constant("Right side of pipe operator must be a function"), binary.rvalue.line, binary.rvalue.column)
+            return
+
+        if is_chain(binary):
+            chain = MatrixChain(binary)
+            for operand in chain.operands:
+                operand.accept(self)
+            self.code.emit(OpCode.MULTIPLY_CHAIN, self.code.add_constant(chain), binary.line, binary.column)
+            return
+
+        binary.lvalue.accept(self)
+        binary.rvalue.accept(self)
+
+        if binary.op not in to_opcode:
+            self.code.emit(OpCode.RAISE, self.code.add_constant("Unknown binary operator"), binary.line, binary.column)
+            return
+
+        # Operator errors are reported at the position of the left operand
+        self.code.emit(to_opcode[binary.op], 0, binary.lvalue.line, binary.lvalue.column)
+
+
+    def visit_literal(self, literal):
+        self.code.emit(OpCode.LOAD_CONST, self.code.add_constant(literal.value), literal.line, literal.column)
+
+
+    def visit_constant(self, constant:Constant):
+        opcode = OpCode.LOAD_MATRIX if isinstance(constant.value, Matrix) else OpCode.LOAD_CONST
+        self.code.emit(opcode, self.code.add_constant(constant.value), constant.line, constant.column)
@@ -0,0 +1,51 @@
+from language.compiler.CodeObject import CodeObject
+from language.compiler.OpCode import OpCode, constant_operations, jump_operations, name_operations
+
+
+def describe_argument(code:CodeObject, opcode, argument):
+    if opcode in name_operations:
+        return f'({code.names[argument]})'
+    if opcode in constant_operations:
+        constant = code.constants[argument]
+        if isinstance(constant, CodeObject):
+            return f'(<code {constant.name}>)'
+        if callable(constant):
+            return f'(<builtin {constant.__name__}>)'
+        return f'({constant!r})'
+    if opcode in jump_operations:
+        return f'(to {argument})'
+    return ''
+
+
+def disassemble(code:CodeObject):
+    """
+    Returns a human readable listing of a code object and of every function
+    code object nested in its constant pool.
+    """
+    header = f'Disassembly of {code.name}'
+    if code.parameters:
+        header += f' ({", ".join(code.parameters)})'
+    lines = [header + ':']
+
+    jump_targets = {code.instructions[offset + 1] for offset in range(0, len(code.instructions), 2)
+                    if code.instructions[offset] in jump_operations}
+
+    previous_line = None
+    for offset in range(0, len(code.instructions), 2):
+        opcode = OpCode(code.instructions[offset])
+        argument = code.instructions[offset + 1]
+        line, _ = code.positions[offset // 2]
+
+        line_column = str(line) if line is not None and line != previous_line else ''
+        if line is not None:
+            previous_line = line
+        marker = '>>' if offset in jump_targets else ''
+        described = describe_argument(code, opcode, argument)
+        lines.append(f'{line_column:>6} {marker:>3} {offset:>5} {opcode.name:<22} {argument:<4} {described}'.rstrip())
+
+    for constant in code.constants:
+        if isinstance(constant, CodeObject):
+            lines.append('')
+            lines.append(disassemble(constant))
+
+    return '\n'.join(lines)
@@ -0,0 +1,113 @@
+from enum import IntEnum, auto
+from language.nodes.OperatorType import OperatorType
+
+
+class OpCode(IntEnum):
+    # Stack and constants
+    LOAD_CONST = auto()
+    POP_TOP = auto()
+
+    # Variables
+    LOAD_NAME = auto()
+    STORE_NAME = auto()
+    DECLARE_NAME = auto()
+    DECLARE_MUTABLE_NAME = auto()
+    PUSH_SCOPE = auto()
+    POP_SCOPE = auto()
+
+    # Matrices
+    BUILD_MATRIX = auto()
+    # Pushes a copy-on-write matrix sharing the rows of a constant prototype
+    LOAD_MATRIX = auto()
+    LOAD_ELEMENT = auto()
+    STORE_ELEMENT = auto()
+    # Replaces start and stop on the stack with a slice, None stands for an omitted bound
+    BUILD_SLICE = auto()
+    LOAD_PROPERTY = auto()
+
+    # Operators
+    ADD = auto()
+    SUBTRACT = auto()
+    MULTIPLY = auto()
+    DIVIDE = auto()
+    DIVIDE_INTEGER = auto()
+    POWER = auto()
+    EQUAL = auto()
+    NOT_EQUAL = auto()
+    GREATER = auto()
+    GREATER_OR_EQUAL = auto()
+    LESS = auto()
+    LESS_OR_EQUAL = auto()
+    AND = auto()
+    OR = auto()
+    NEGATE = auto()
+    NOT = auto()
+    # Pops the operands of a MatrixChain constant and pushes their product
+    MULTIPLY_CHAIN = auto()
+
+    # Control flow
+    JUMP = auto()
+    POP_JUMP_IF_FALSE = auto()
+
+    # Functions
+    MAKE_FUNCTION = auto()
+    DEFINE_FUNCTION = auto()
+    LOAD_FUNCTION = auto()
+    CALL = auto()
+    # Call replacing the frame of the running function, used for 'return f(...)'
+    TAIL_CALL = auto()
+    CALL_BUILTIN = auto()
+    # Builtin taking functions, the Neo functions among the arguments are passed as Python functions
+    CALL_HIGHER_ORDER_BUILTIN = auto()
+    RETURN_VALUE = auto()
+
+    # Errors known at compile time, argument is a constant holding the message
+    RAISE = auto()
+
+
+# Opcodes whose argument is an index into CodeObject.names
+name_operations = {
+    OpCode.LOAD_NAME,
+    OpCode.STORE_NAME,
+    OpCode.DECLARE_NAME,
+    OpCode.DECLARE_MUTABLE_NAME,
+    OpCode.STORE_ELEMENT,
+    OpCode.LOAD_PROPERTY,
+    OpCode.DEFINE_FUNCTION,
+    OpCode.LOAD_FUNCTION,
+}
+
+# Opcodes whose argument is an index into CodeObject.constants
+constant_operations = {
+    OpCode.LOAD_CONST,
+    OpCode.BUILD_MATRIX,
+    OpCode.LOAD_MATRIX,
+    OpCode.MAKE_FUNCTION,
+    OpCode.MULTIPLY_CHAIN,
+    OpCode.RAISE,
+}
+
+# Opcodes whose argument is an absolute instruction offset
+jump_operations = {
+    OpCode.JUMP,
+    OpCode.POP_JUMP_IF_FALSE,
+}
+
+
+# Binary operators of the AST and the opcodes implementing them
+to_opcode = {
+    OperatorType.PLUS: OpCode.ADD,
+    OperatorType.MINUS: OpCode.SUBTRACT,
+    OperatorType.MULTIPLY: OpCode.MULTIPLY,
+    OperatorType.DIVIDE: OpCode.DIVIDE,
+    OperatorType.DIVIDE_INTEGER: OpCode.DIVIDE_INTEGER,
+    OperatorType.POWER: OpCode.POWER,
+    OperatorType.EQUAL: OpCode.EQUAL,
+    OperatorType.NOT_EQUAL: OpCode.NOT_EQUAL,
+    OperatorType.GREATER: OpCode.GREATER,
+    OperatorType.GREATER_OR_EQUAL: OpCode.GREATER_OR_EQUAL,
+    OperatorType.LESS: OpCode.LESS,
+    OperatorType.LESS_OR_EQUAL: OpCode.LESS_OR_EQUAL,
+    OperatorType.AND: OpCode.AND,
+    OperatorType.OR: OpCode.OR,
+}
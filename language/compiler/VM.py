@@ -0,0 +1,449 @@
+from language.nodes.Expressions import Matrix
+from language.nodes.Expressions.Slice import is_index, to_index, to_slice
+from language.errors.InterpreterExceptions import NeoRuntimeError
+from language.interpreter.Built_ins import builtin_functions, callable_arguments, higher_order_builtins
+from language.interpreter.Environment import Environment
+from language.compiler.OpCode import OpCode
+
+
+# Plain int aliases, comparing against IntEnum members is noticeably slower in the dispatch loop
+LOAD_CONST = int(OpCode.LOAD_CONST)
+POP_TOP = int(OpCode.POP_TOP)
+LOAD_NAME = int(OpCode.LOAD_NAME)
+STORE_NAME = int(OpCode.STORE_NAME)
+DECLARE_NAME = int(OpCode.DECLARE_NAME)
+DECLARE_MUTABLE_NAME = int(OpCode.DECLARE_MUTABLE_NAME)
+PUSH_SCOPE = int(OpCode.PUSH_SCOPE)
+POP_SCOPE = int(OpCode.POP_SCOPE)
+BUILD_MATRIX = int(OpCode.BUILD_MATRIX)
+LOAD_MATRIX = int(OpCode.LOAD_MATRIX)
+LOAD_ELEMENT = int(OpCode.LOAD_ELEMENT)
+STORE_ELEMENT = int(OpCode.STORE_ELEMENT)
+BUILD_SLICE = int(OpCode.BUILD_SLICE)
+LOAD_PROPERTY = int(OpCode.LOAD_PROPERTY)
+ADD = int(OpCode.ADD)
+SUBTRACT = int(OpCode.SUBTRACT)
+MULTIPLY = int(OpCode.MULTIPLY)
+DIVIDE = int(OpCode.DIVIDE)
+DIVIDE_INTEGER = int(OpCode.DIVIDE_INTEGER)
+POWER = int(OpCode.POWER)
+EQUAL = int(OpCode.EQUAL)
+NOT_EQUAL = int(OpCode.NOT_EQUAL)
+GREATER = int(OpCode.GREATER)
+GREATER_OR_EQUAL = int(OpCode.GREATER_OR_EQUAL)
+LESS = int(OpCode.LESS)
+LESS_OR_EQUAL = int(OpCode.LESS_OR_EQUAL)
+AND = int(OpCode.AND)
+OR = int(OpCode.OR)
+NEGATE = int(OpCode.NEGATE)
+NOT = int(OpCode.NOT)
+MULTIPLY_CHAIN = int(OpCode.MULTIPLY_CHAIN)
+JUMP = int(OpCode.JUMP)
+POP_JUMP_IF_FALSE = int(OpCode.POP_JUMP_IF_FALSE)
+MAKE_FUNCTION = int(OpCode.MAKE_FUNCTION)
+DEFINE_FUNCTION = int(OpCode.DEFINE_FUNCTION)
+LOAD_FUNCTION = int(OpCode.LOAD_FUNCTION)
+CALL = int(OpCode.CALL)
+TAIL_CALL = int(OpCode.TAIL_CALL)
+CALL_BUILTIN = int(OpCode.CALL_BUILTIN)
+CALL_HIGHER_ORDER_BUILTIN = int(OpCode.CALL_HIGHER_ORDER_BUILTIN)
+RETURN_VALUE = int(OpCode.RETURN_VALUE)
+RAISE = int(OpCode.RAISE)
+
+# Builtins taking Neo functions, a builtin loaded by name is called with CALL
+higher_order_builtin_functions = {builtin_functions[name] for name in higher_order_builtins}
+
+comparison_symbols = {
+    GREATER: '>',
+    GREATER_OR_EQUAL: '>=',
+    LESS: '<',
+    LESS_OR_EQUAL: '<=',
+}
+
+
+class VMFunction:
+    __slots__ = ("code", "environment")
+
+    def __init__(self, code, environment):
+        self.code = code
+        self.environment = environment
+
+    @property
+    def function(self):
+        return self.code.function
+
+    def __repr__(self):
+        return repr(self.code.function)
+
+
+class VM:
+    """
+    Stack machine running CodeObjects produced by the Compiler.
+
+    Calls between Neo functions do not recurse into Python: the state of the caller
+    (code, instruction pointer, scope and operand stack) is pushed on self.frames
+    and the dispatch loop simply continues in the callee.
+    """
+    # Neo calls nested deeper than this raise an error instead of growing self.frames
+    # until memory runs out, tail calls do not count
+    max_call_depth = 100000
+
+    def __init__(self, max_call_depth=None):
+        self.frames = []
+        self.max_call_depth = max_call_depth or self.max_call_depth
+
+
+    def run(self, code):
+        return self.execute(code, Environment())
+
+
+    def execute(self, code, environment):
+        base_depth = len(self.frames)
+        try:
+            return self.dispatch(code, environment, base_depth)
+        finally:
+            # Frames left behind by an error raised inside a nested call
+            del self.frames[base_depth:]
+
+
+    def python_function(self, function, line, column):
+        """
+        The function as a Python function, called by a builtin once per cell. Each call
+        runs the code in a nested dispatch loop. A function which creates no closures
+        cannot leave its environment referenced after it returns, so all its calls run
+        in one environment, emptied before each.
+        """
+        parameters = function.code.parameters
+
+        if function.code.function.creates_closures:
+            def call_function(*arguments):
+                if len(arguments) != len(parameters):
+                    raise NeoRuntimeError("Incorrect number of arguments", line, column)
+                call_env = Environment(function.environment)
+                call_env.values.update(zip(parameters, arguments))
+                return self.execute(function.code, call_env)
+            return call_function
+
+        call_env = Environment(function.environment)
+        values = call_env.values
+        mutable = call_env.mutable
+
+        def call_in_environment(*arguments):
+            if len(arguments) != len(parameters):
+                raise NeoRuntimeError("Incorrect number of arguments", line, column)
+            values.clear()
+            mutable.clear()
+            values.update(zip(parameters, arguments))
+            return self.execute(function.code, call_env)
+        return call_in_environment
+
+
+    def dispatch(self, code, environment, base_depth):
+        frames = self.frames
+        max_call_depth = self.max_call_depth
+
+        instructions = code.instructions
+        constants = code.constants
+        names = code.names
+        env = environment
+        stack = []
+        ip = 0
+
+        while True:
+            op = instructions[ip]
+            arg = instructions[ip + 1]
+            ip += 2
+
+            if op == LOAD_NAME:
+                name = names[arg]
+                scope = env
+                while scope is not None:
+                    values = scope.values
+                    if name in values:
+                        stack.append(values[name])
+                        break
+                    scope = scope.parent
+                else:
+                    # A variable named like a builtin shadows it only once declared
+                    if name not in builtin_functions:
+                        raise NeoRuntimeError(f"Variable '{name}' doesn't exist", *code.positions[ip // 2 - 1])
+                    stack.append(builtin_functions[name])
+
+            elif op == LOAD_CONST:
+                stack.append(constants[arg])
+
+            elif op == STORE_NAME:
+                name = names[arg]
+                scope = env
+                while scope is not None:
+                    if name in scope.values:
+                        if name not in scope.mutable:
+                            raise NeoRuntimeError(f"Variable '{name}' is immutable and cannot be assigned to", *code.positions[ip // 2 - 1])
+                        scope.values[name] = stack.pop()
+                        break
+                    scope = scope.parent
+                else:
+                    raise NeoRuntimeError(f"Variable '{name}' must be declared before assignment", *code.positions[ip // 2 - 1])
+
+            elif op == POP_JUMP_IF_FALSE:
+                if not stack.pop():
+                    ip = arg
+
+            elif op == JUMP:
+                ip = arg
+
+            elif op == ADD:
+                right = stack.pop()
+                left = stack[-1]
+                if isinstance(left, str) or isinstance(right, str):
+                    stack[-1] = str(left) + str(right)
+                else:
+                    stack[-1] = left + right
+
+            elif op == SUBTRACT or op == MULTIPLY or op == POWER:
+                right = stack.pop()
+                left = stack[-1]
+                if isinstance(left, str) or isinstance(right, str):
+                    operation = "substract" if op == SUBTRACT else "multiply" if op == MULTIPLY else "power"
+                    raise NeoRuntimeError(f"Strings cannot take part in {operation} operation", *code.positions[ip // 2 - 1])
+                if op == SUBTRACT:
+                    stack[-1] = left - right
+                elif op == MULTIPLY:
+                    stack[-1] = left * right
+                else:
+                    stack[-1] = left ** right
+
+            elif op == LESS or op == LESS_OR_EQUAL or op == GREATER or op == GREATER_OR_EQUAL:
+                right = stack.pop()
+                left = stack[-1]
+                try:
+                    if op == LESS:
+                        stack[-1] = left < right
+                    elif op == LESS_OR_EQUAL:
+                        stack[-1] = left <= right
+                    elif op == GREATER:
+                        stack[-1] = left > right
+                    else:
+                        stack[-1] = left >= right
+                except TypeError:
+                    raise NeoRuntimeError(f"Types '{type(left).__name__}' and '{type(right).__name__}' cannot be compared with '{comparison_symbols[op]}' operator", *code.positions[ip // 2 - 1])
+
+            elif op == EQUAL:
+                right = stack.pop()
+                stack[-1] = stack[-1] == right
+
+            elif op == NOT_EQUAL:
+                right = stack.pop()
+                stack[-1] = stack[-1] != right
+
+            elif op == POP_TOP:
+                stack.pop()
+
+            elif op == CALL:
+                function = stack[-arg - 1]
+                try:
+                    parameters = function.code.parameters
+                except AttributeError:
+                    # Builtin loaded by LOAD_FUNCTION, its name is shadowed by a variable
+                    line, column = code.positions[ip // 2 - 1]
+                    arguments = stack[len(stack) - arg:]
+                    if function in higher_order_builtin_functions:
+                        arguments = callable_arguments(arguments, VMFunction,
+                                                       lambda function: self.python_function(function, line, column), line, column)
+                    del stack[len(stack) - arg:]
+                    stack[-1] = function(line, column, *arguments)
+                    continue
+                if len(parameters) != arg:
+                    raise NeoRuntimeError("Incorrect number of arguments", *code.positions[ip // 2 - 1])
+                if len(frames) >= max_call_depth:
+                    raise NeoRuntimeError("Maximum recursion depth exceeded", *code.positions[ip // 2 - 1])
+
+                call_env = Environment(function.environment)
+                if arg:
+                    call_env.values.update(zip(parameters, stack[-arg:]))
+                    del stack[-arg - 1:]
+                else:
+                    stack.pop()
+
+                frames.append((code, ip, env, stack))
+                code = function.code
+                instructions = code.instructions
+                constants = code.constants
+                names = code.names
+                env = call_env
+                stack = []
+                ip = 0
+
+            elif op == TAIL_CALL:
+                function = stack[-arg - 1]
+                parameters = function.code.parameters
+                if len(parameters) != arg:
+                    raise NeoRuntimeError("Incorrect number of arguments", *code.positions[ip // 2 - 1])
+
+                env = Environment(function.environment)
+                if arg:
+                    env.values.update(zip(parameters, stack[-arg:]))
+
+                # Same as CALL, but the running frame is replaced instead of pushed
+                code = function.code
+                instructions = code.instructions
+                constants = code.constants
+                names = code.names
+                stack = []
+                ip = 0
+
+            elif op == RETURN_VALUE:
+                return_value = stack.pop()
+                if len(frames) == base_depth:
+                    return return_value
+                code, ip, env, stack = frames.pop()
+                instructions = code.instructions
+                constants = code.constants
+                names = code.names
+                stack.append(return_value)
+
+            elif op == LOAD_FUNCTION:
+                name = names[arg]
+                scope = env
+                while scope is not None:
+                    value = scope.values.get(name)
+                    if isinstance(value, VMFunction):
+                        stack.append(value)
+                        break
+                    scope = scope.parent
+                else:
+                    if name not in builtin_functions:
+                        raise NeoRuntimeError(f"Function '{name}' doesn't exist", *code.positions[ip // 2 - 1])
+                    stack.append(builtin_functions[name])
+
+            elif op == CALL_BUILTIN:
+                line, column = code.positions[ip // 2 - 1]
+                arguments = stack[len(stack) - arg:]
+                del stack[len(stack) - arg:]
+                stack[-1] = stack[-1](line, column, *arguments)
+
+            elif op == CALL_HIGHER_ORDER_BUILTIN:
+                line, column = code.positions[ip // 2 - 1]
+                arguments = callable_arguments(stack[len(stack) - arg:], VMFunction,
+                                               lambda function: self.python_function(function, line, column), line, column)
+                del stack[len(stack) - arg:]
+                stack[-1] = stack[-1](line, column, *arguments)
+
+            elif op == LOAD_ELEMENT:
+                second = stack.pop()
+                first = stack.pop()
+                matrix = stack[-1]
+                if not (is_index(first) and is_index(second)):
+                    raise NeoRuntimeError("Indieces must be whole numbers", *code.positions[ip // 2 - 1])
+                if not isinstance(matrix, Matrix):
+                    raise NeoRuntimeError("Matrix is needed for access operation", *code.positions[ip // 2 - 1])
+                stack[-1] = matrix.load(to_index(first), to_index(second))
+
+            elif op == BUILD_SLICE:
+                stop = stack.pop()
+                stack[-1] = to_slice(stack[-1], stop, *code.positions[ip // 2 - 1])
+
+            elif op == STORE_ELEMENT:
+                second = stack.pop()
+                first = stack.pop()
+                value = stack.pop()
+                name = names[arg]
+                if not (is_index(first) and is_index(second)):
+                    raise NeoRuntimeError("Indices must be whole numbers", *code.positions[ip // 2 - 1])
+                scope = env
+                while scope is not None:
+                    if name in scope.values:
+                        matrix = scope.values[name]
+                        if not isinstance(matrix, Matrix):
+                            raise NeoRuntimeError("Only matrix can use access operation", *code.positions[ip // 2 - 1])
+                        if name not in scope.mutable:
+                            raise NeoRuntimeError(f"Matrix variable '{name}' is immutable and cannot be modified", *code.positions[ip // 2 - 1])
+                        matrix.store(to_index(first), to_index(second), value)
+                        break
+                    scope = scope.parent
+                else:
+                    raise NeoRuntimeError(f"Matrix {name} doesn't exist", *code.positions[ip // 2 - 1])
+
+            elif op == DECLARE_NAME or op == DECLARE_MUTABLE_NAME:
+                name = names[arg]
+                if name in env.values:
+                    raise NeoRuntimeError(f"Variable '{name}' already declared in this scope", *code.positions[ip // 2 - 1])
+                env.values[name] = stack.pop()
+                if op == DECLARE_MUTABLE_NAME:
+                    env.mutable.add(name)
+
+            elif op == PUSH_SCOPE:
+                env = Environment(env)
+
+            elif op == POP_SCOPE:
+                env = env.parent
+
+            elif op == BUILD_MATRIX:
+                row_count, column_count = constants[arg]
+                cell_count = row_count * column_count
+                cells = stack[len(stack) - cell_count:]
+                del stack[len(stack) - cell_count:]
+                rows = [cells[i:i + column_count] for i in range(0, cell_count, column_count)]
+                stack.append(Matrix(rows, *code.positions[ip // 2 - 1]))
+
+            elif op == LOAD_MATRIX:
+                stack.append(constants[arg].share())
+
+            elif op == LOAD_PROPERTY:
+                object = stack[-1]
+                if not isinstance(object, Matrix):
+                    raise NeoRuntimeError("Only matrix can have properties", *code.positions[ip // 2 - 1])
+                try:
+                    property_getter = object.properties[names[arg]]
+                except KeyError:
+                    raise NeoRuntimeError(f"Unknown property '{names[arg]}'", *code.positions[ip // 2 - 1])
+                stack[-1] = property_getter(object)
+
+            elif op == DIVIDE or op == DIVIDE_INTEGER:
+                right = stack.pop()
+                left = stack[-1]
+                integer = op == DIVIDE_INTEGER
+                if isinstance(left, Matrix) or isinstance(right, Matrix):
+                    raise NeoRuntimeError(f"Matrixes cannot take part in {'integer divide' if integer else 'divide'} operation", *code.positions[ip // 2 - 1])
+                if isinstance(left, str) or isinstance(right, str):
+                    raise NeoRuntimeError(f"Strings cannot take part in {'integer divide' if integer else 'substract'} operation", *code.positions[ip // 2 - 1])
+                try:
+                    stack[-1] = left // right if integer else left / right
+                except ZeroDivisionError:
+                    raise NeoRuntimeError("Cannot divide by zero", *code.positions[ip // 2 - 1])
+
+            elif op == AND:
+                right = stack.pop()
+                stack[-1] = stack[-1] and right
+
+            elif op == OR:
+                right = stack.pop()
+                stack[-1] = stack[-1] or right
+
+            elif op == NEGATE:
+                stack[-1] = -stack[-1]
+
+            elif op == NOT:
+                stack[-1] = not bool(stack[-1])
+
+            elif op == MULTIPLY_CHAIN:
+                chain = constants[arg]
+                count = len(chain.operands)
+                values = stack[len(stack) - count:]
+                del stack[len(stack) - count:]
+                stack.append(chain.evaluate(values))
+
+            elif op == MAKE_FUNCTION:
+                stack.append(VMFunction(constants[arg], env))
+
+            elif op == DEFINE_FUNCTION:
+                name = names[arg]
+                if name in builtin_functions:
+                    raise NeoRuntimeError(f"Function name '{name}' is reserved for build-in function", *code.positions[ip // 2 - 1])
+                env.values[name] = stack[-1]
+
+            elif op == RAISE:
+                raise NeoRuntimeError(constants[arg], *code.positions[ip // 2 - 1])
+
+            else:
+                raise NeoRuntimeError(f"Unknown opcode {op}", *code.positions[ip // 2 - 1])
@@ -0,0 +1 @@
+# Compiler Package
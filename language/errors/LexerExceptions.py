@@ -5,6 +5,8 @@ class ErrorCode:
     CANT_IDENTIFY_TOKEN = 'Cant identify token. There is no match'
 
 class LexerError(Exception):
-    def __init__(self, error_code, position, char):
-        self.message = f'{error_code}. Error at line: {position[0]}, column: {position[1]}. Char: {char}'
+    def __init__(self, error_code, position, char=None):
+        self.message = f'{error_code}. Error at line: {position[0]}, column: {position[1]}'
+        if char is not None:
+            self.message += f'. Char: {char}'
         super().__init__(self.message)
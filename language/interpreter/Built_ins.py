@@ -1,5 +1,8 @@
-from language.nodes.Expressions import Matrix
+from types import FunctionType
+from language.nodes.Expressions import Matrix, SparseMatrix
+from language.nodes.Expressions.Slice import is_whole_number
 from language.errors.InterpreterExceptions import NeoRuntimeError
+from language.linalg import Vectorizer
 
 
 def neo_print(line, col, *obj):
@@ -9,16 +12,175 @@ def neo_print(line, col, *obj):
 def neo_zeros(line, col, first, second=None):
     if first <= 0 or (second and second <= 0):
         raise NeoRuntimeError("Positive scalars expected", line, col)
-    return Matrix([[0 for _ in range(int(second) if second else int(first))] for _ in range(int(first))], line, col)
+    return Matrix.filled(int(first), int(second) if second else int(first), 0, line, col)
 
 def neo_ones(line, col, first, second=None):
     if first <= 0 or (second and second <= 0):
         raise NeoRuntimeError("Positive scalars expected", line, col)
-    return Matrix([[1 for _ in range(int(second) if second else int(first))] for _ in range(int(first))], line, col)
+    return Matrix.filled(int(first), int(second) if second else int(first), 1, line, col)
+
+def factorization_of(matrix, name, line, col):
+    if not isinstance(matrix, Matrix):
+        raise NeoRuntimeError(f"Function '{name}' expects a matrix, got '{matrix.__class__.__name__}'", line, col)
+    return matrix.factorize(line, col)
+
+def invertible_factorization_of(matrix, name, line, col):
+    factorization = factorization_of(matrix, name, line, col)
+    if matrix.rowlen() != matrix.collen():
+        raise NeoRuntimeError(f"Matrix must be square to calculate '{name}'", line, col)
+    if factorization.singular:
+        raise NeoRuntimeError("Matrix is singular", line, col)
+    return factorization
+
+def neo_inverse(line, col, matrix):
+    return Matrix.from_rows(invertible_factorization_of(matrix, "inverse", line, col).inverse(), line, col)
+
+def neo_solve(line, col, matrix, right_side):
+    factorization = invertible_factorization_of(matrix, "solve", line, col)
+    if not isinstance(right_side, Matrix) or right_side.rowlen() != matrix.rowlen():
+        raise NeoRuntimeError("Right side must be a matrix with as many rows as the solved matrix", line, col)
+    if not all(isinstance(elem, (int, float)) for row in right_side.rows for elem in row):
+        raise NeoRuntimeError("Right side must contain only scalars", line, col)
+    return Matrix.from_rows(factorization.solve(right_side.rows), line, col)
+
+def neo_rank(line, col, matrix):
+    return factorization_of(matrix, "rank", line, col).rank
+
+def neo_lu(line, col, matrix):
+    # [L, U, P] with P * matrix == L * U
+    factorization = factorization_of(matrix, "lu", line, col)
+    factors = [factorization.lower, factorization.upper, factorization.permutation_matrix()]
+    return Matrix([[Matrix([row[:] for row in factor], line, col) for factor in factors]], line, col)
+
+def neo_sparse(line, col, first, second=None):
+    if isinstance(first, Matrix):
+        # Conversion of a dense matrix
+        if not all(isinstance(elem, (int, float)) for row in first.rows for elem in row):
+            raise NeoRuntimeError("Sparse matrix can hold only scalars", line, col)
+        return SparseMatrix.from_rows(first.rows, line, col)
+    if first <= 0 or (second and second <= 0):
+        raise NeoRuntimeError("Positive scalars expected", line, col)
+    return SparseMatrix(int(first), int(second) if second else int(first), line=line, column=col)
+
+def neo_dense(line, col, matrix):
+    if not isinstance(matrix, Matrix):
+        raise NeoRuntimeError(f"Function 'dense' expects a matrix, got '{matrix.__class__.__name__}'", line, col)
+    return Matrix.from_rows([row[:] for row in matrix.rows], line, col)
+
+def checked_matrix(matrix, name, line, col):
+    if not isinstance(matrix, Matrix):
+        raise NeoRuntimeError(f"Function '{name}' expects a matrix, got '{matrix.__class__.__name__}'", line, col)
+    return matrix
+
+def cells_of(matrix, name, line, col):
+    # Cells in row-major order as Python values, whatever the storage of the matrix
+    checked_matrix(matrix, name, line, col)
+    if matrix.cells is not None:
+        return matrix.cells.tolist()
+    if matrix.array is not None:
+        return matrix.array.ravel().tolist()
+    return [cell for row in matrix.rows for cell in row]
+
+def checked_function(function, name, line, col):
+    if not callable(function):
+        raise NeoRuntimeError(f"Function '{name}' expects a function, got '{function.__class__.__name__}'", line, col)
+    return function
+
+def neo_map(line, col, matrix, function):
+    matrix = checked_matrix(matrix, "map", line, col)
+    function = checked_function(function, "map", line, col)
+    results = None
+    kernel = getattr(function, "kernel", None)
+    if kernel is not None and matrix.holds_only_numbers():
+        # Floats go through NumPy at once when it is available, other numbers through the kernel's comprehension
+        if matrix.array is not None or (matrix.cells is not None and matrix.cells.typecode == 'd'):
+            array = matrix.as_array()
+            result = kernel.map_array(array) if array is not None else None
+            if result is not None:
+                return Matrix.from_array(result, line, col)
+        results = kernel.map_cells(cells_of(matrix, "map", line, col))
+    if results is None:
+        results = list(map(function, cells_of(matrix, "map", line, col)))
+    stride = matrix.collen()
+    return Matrix.from_rows([results[start:start + stride] for start in range(0, len(results), stride)], line, col)
+
+def neo_filter(line, col, matrix, function):
+    cells = cells_of(matrix, "filter", line, col)
+    function = checked_function(function, "filter", line, col)
+    kept = [cell for cell in cells if function(cell)]
+    if not kept:
+        raise NeoRuntimeError("Filter keeps no cells", line, col)
+    return Matrix.from_rows([kept], line, col)
+
+def neo_reduce(line, col, matrix, function, *initial):
+    # Left fold over the cells in row-major order, starting from the first cell when no initial value is given
+    cells = cells_of(matrix, "reduce", line, col)
+    function = checked_function(function, "reduce", line, col)
+    if len(initial) > 1:
+        raise NeoRuntimeError("Function 'reduce' takes a matrix, a function and an optional initial value", line, col)
+    result, start = (initial[0], 0) if initial else (cells[0], 1)
+    for index in range(start, len(cells)):
+        result = function(result, cells[index])
+    return result
+
+def neo_sum(line, col, matrix):
+    cells = cells_of(matrix, "sum", line, col)
+    # Bools are not counted as numbers, even though Python would add them up
+    if not matrix.holds_only_numbers() or bool in set(map(type, cells)):
+        raise NeoRuntimeError("Function 'sum' expects a matrix of numbers", line, col)
+    return sum(cells)
+
+def neo_range(line, col, first, second=None, step=1):
+    # range(n) is 0, 1, ..., n - 1, range(start, stop[, step]) counts from start up to stop (exclusive)
+    start, stop = (0, first) if second is None else (first, second)
+    if not all(is_whole_number(bound) for bound in (start, stop, step)):
+        raise NeoRuntimeError("Range bounds must be whole numbers", line, col)
+    if step == 0:
+        raise NeoRuntimeError("Range step cannot be zero", line, col)
+    numbers = range(int(start), int(stop), int(step))
+    if not numbers:
+        raise NeoRuntimeError("Range holds no numbers", line, col)
+    return Matrix.from_rows([list(numbers)], line, col)
+
+
+def callable_arguments(arguments, function_class, convert, line, col):
+    """
+    Arguments of a higher-order builtin, with the Neo functions of an engine
+    (instances of function_class) turned by convert into Python functions of
+    their arguments, and builtins given the position of the call.
+    """
+    converted = []
+    for argument in arguments:
+        if isinstance(argument, function_class):
+            kernel = Vectorizer.kernel_of(argument.function)
+            argument = convert(argument)
+            # Lets map apply a function made of one arithmetic expression without calling it per cell
+            argument.kernel = kernel
+        elif isinstance(argument, FunctionType):
+            argument = (lambda builtin: lambda *values: builtin(line, col, *values))(argument)
+        converted.append(argument)
+    return converted
 
 
 builtin_functions = {
     "print": neo_print,
     "zeros": neo_zeros,
-    "ones": neo_ones
+    "ones": neo_ones,
+    "inverse": neo_inverse,
+    "solve": neo_solve,
+    "rank": neo_rank,
+    "lu": neo_lu,
+    "sparse": neo_sparse,
+    "dense": neo_dense,
+    "map": neo_map,
+    "filter": neo_filter,
+    "reduce": neo_reduce,
+    "sum": neo_sum,
+    "range": neo_range
 }
+
+# Builtins calling the functions they are given, engines pass those functions through callable_arguments
+higher_order_builtins = {"map", "filter", "reduce"}
+
+# Builtins without side effects, a call with constant arguments can be made before running the program
+pure_builtin_functions = {"zeros", "ones", "inverse", "solve", "rank", "lu", "sum", "range"}
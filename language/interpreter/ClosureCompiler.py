@@ -0,0 +1,657 @@
+"""
+Closure-compiling execution engine.
+
+The program is walked once and every node is turned into a Python closure taking
+the current Environment. Operators, builtins and literal values are chosen at
+compile time, so running the program never goes through accept()/visit_* again.
+
+Instructions return None to continue, or a one element tuple holding the value of
+an executed 'return' which is propagated up to the enclosing function call.
+"""
+
+from language.nodes.Instructions import Assignment, Block, Declaration, FunctionCall, IfStatement, Return, WhileLoop
+from language.nodes.ToplevelObjects import Function
+from language.nodes.Expressions import Access, BinaryOperator, Identifier, Matrix, Property, Slice, UnaryOperator
+from language.nodes.Expressions.Slice import is_index, to_index, to_slice
+from language.nodes.OperatorType import OperatorType
+from language.errors.InterpreterExceptions import NeoRuntimeError
+from language.interpreter.Built_ins import builtin_functions, callable_arguments, higher_order_builtins
+from language.interpreter.Environment import Environment
+from language.resolver.Resolver import call_of, declared_names
+from language.linalg.MatrixChain import MatrixChain, is_chain
+
+
+class CompiledFunction:
+    __slots__ = ("function", "body", "environment")
+
+    def __init__(self, function, body, environment):
+        self.function = function
+        self.body = body
+        self.environment = environment
+
+    def __repr__(self):
+        return repr(self.function)
+
+
+class TailCall:
+    __slots__ = ("function", "environment")
+
+    def __init__(self, function, environment):
+        self.function = function
+        self.environment = environment
+
+
+def run_function(compiled_function, call_env):
+    # Tail calls returned by the body are run here, so they do not nest Python calls
+    while True:
+        for instruction in compiled_function.body:
+            returned = instruction(call_env)
+            if returned is not None:
+                break
+        else:
+            return None
+
+        if returned.__class__ is not TailCall:
+            return returned[0]
+        compiled_function, call_env = returned.function, returned.environment
+
+
+def python_function(compiled_function, line, column):
+    """
+    The compiled function as a Python function, called by a builtin once per cell.
+    A function which creates no closures cannot leave its environment referenced
+    after it returns, so all its calls run in one environment, emptied before each.
+    """
+    parameters = [parameter.value for parameter in compiled_function.function.parameter_list]
+
+    if compiled_function.function.creates_closures:
+        def call_function(*arguments):
+            if len(arguments) != len(parameters):
+                raise NeoRuntimeError("Incorrect number of arguments", line, column)
+            call_env = Environment(compiled_function.environment)
+            call_env.values.update(zip(parameters, arguments))
+            return run_function(compiled_function, call_env)
+        return call_function
+
+    call_env = Environment(compiled_function.environment)
+    values = call_env.values
+    mutable = call_env.mutable
+
+    def call_in_environment(*arguments):
+        if len(arguments) != len(parameters):
+            raise NeoRuntimeError("Incorrect number of arguments", line, column)
+        values.clear()
+        mutable.clear()
+        values.update(zip(parameters, arguments))
+        return run_function(compiled_function, call_env)
+    return call_in_environment
+
+
+class ClosureCompiler:
+    def __init__(self):
+        # Functions enclosing the node being compiled, innermost last
+        self.functions = []
+        # Names declared in the program, a variable named like a builtin shadows it
+        self.declared_names = set()
+
+
+    def compile_program(self, parsed_program):
+        self.declared_names = declared_names(parsed_program.toplevel_objects)
+        return list(self.compile_instructions(parsed_program.toplevel_objects))
+
+
+    def compile_instruction(self, instruction):
+        code = instruction.accept(self)
+        if isinstance(instruction, (Block, IfStatement, WhileLoop, Return, Declaration, Assignment)):
+            return code
+
+        # Expression used as an instruction - its value is discarded
+        def expression_instruction(env):
+            code(env)
+        return expression_instruction
+
+
+    def compile_instructions(self, instructions):
+        return tuple(self.compile_instruction(instruction) for instruction in instructions)
+
+
+    def compile_function_body(self, function:Function):
+        if self.functions:
+            # The nested function keeps the environment of the enclosing call
+            self.functions[-1].creates_closures = True
+        self.functions.append(function)
+        try:
+            return self.compile_instructions(function.block.instructions)
+        finally:
+            self.functions.pop()
+
+
+    def visit_function_definition(self, function:Function):
+        body = self.compile_function_body(function)
+        name = function.name.value if function.name else None
+
+        if name is None:
+            def anonymous_function(env):
+                return CompiledFunction(function, body, env)
+            return anonymous_function
+
+        line, column = function.name.line, function.name.column
+
+        def named_function(env):
+            if name in builtin_functions:
+                raise NeoRuntimeError(f"Function name '{name}' is reserved for build-in function", line, column)
+            value = CompiledFunction(function, body, env)
+            env.values[name] = value
+            return value
+        return named_function
+
+
+    def visit_function_call(self, function_call:FunctionCall):
+        callee = function_call.function_name_or_body
+        return self.compile_call(callee, [argument.accept(self) for argument in function_call.arguments], callee.line, callee.column)
+
+
+    def compile_call(self, callee, arguments, line, column, tail=False):
+        """
+        With tail=True the returned closure does not make the call but returns a
+        TailCall, which is run by the loop of the call currently being executed.
+        """
+        arguments_count = len(arguments)
+
+        call_builtin = None
+        if isinstance(callee, Function):
+            # Immediately invoked function expression (IIFE)
+            body = self.compile_function_body(callee)
+
+            def find_function(env):
+                return CompiledFunction(callee, body, env)
+        else:
+            function_name = callee.value
+
+            if function_name in builtin_functions:
+                builtin_function = builtin_functions[function_name]
+
+                if function_name in higher_order_builtins:
+                    def convert(compiled_function):
+                        return python_function(compiled_function, line, column)
+
+                    def call_builtin(env):
+                        values = callable_arguments([argument(env) for argument in arguments], CompiledFunction, convert, line, column)
+                        return builtin_function(line, column, *values)
+                else:
+                    def call_builtin(env):
+                        return builtin_function(line, column, *[argument(env) for argument in arguments])
+
+                if function_name not in self.declared_names:
+                    return call_builtin
+
+            def find_function(env):
+                scope = env
+                while scope is not None:
+                    value = scope.values.get(function_name)
+                    if isinstance(value, CompiledFunction):
+                        return value
+                    scope = scope.parent
+                if call_builtin is not None:
+                    return None
+                raise NeoRuntimeError(f"Function '{function_name}' doesn't exist", line, column)
+
+        def enter(compiled_function, env):
+            parameters = compiled_function.function.parameter_list
+            if len(parameters) != arguments_count:
+                raise NeoRuntimeError("Incorrect number of arguments", line, column)
+
+            call_env = Environment(compiled_function.environment)
+            values = call_env.values
+            for parameter, argument in zip(parameters, arguments):
+                values[parameter.value] = argument(env)
+            return call_env
+
+        if tail:
+            def tail_call(env):
+                compiled_function = find_function(env)
+                return TailCall(compiled_function, enter(compiled_function, env))
+            return tail_call
+
+        if call_builtin is not None:
+            # The builtin is called unless a Neo function declared with its name is found
+            def call_function_or_builtin(env):
+                compiled_function = find_function(env)
+                if compiled_function is None:
+                    return call_builtin(env)
+                try:
+                    return run_function(compiled_function, enter(compiled_function, env))
+                except RecursionError:
+                    raise NeoRuntimeError("Maximum recursion depth exceeded", line, column) from None
+            return call_function_or_builtin
+
+        def call_function_expression(env):
+            compiled_function = find_function(env)
+            try:
+                return run_function(compiled_function, enter(compiled_function, env))
+            except RecursionError:
+                # Raised by the innermost call, outer calls get the NeoRuntimeError
+                raise NeoRuntimeError("Maximum recursion depth exceeded", line, column) from None
+        return call_function_expression
+
+
+    def visit_block(self, block:Block):
+        instructions = self.compile_instructions(block.instructions)
+        declares = any(isinstance(instruction, Declaration) or (isinstance(instruction, Function) and instruction.name)
+                       for instruction in block.instructions)
+
+        if not declares:
+            # Nothing can be added to the scope, so the enclosing environment is reused
+            def run_block_in_place(env):
+                for instruction in instructions:
+                    returned = instruction(env)
+                    if returned is not None:
+                        return returned
+            return run_block_in_place
+
+        def run_block(env):
+            block_env = Environment(env)
+            for instruction in instructions:
+                returned = instruction(block_env)
+                if returned is not None:
+                    return returned
+        return run_block
+
+
+    def visit_if_statement(self, if_statement:IfStatement):
+        condition = if_statement.condition.accept(self)
+        block = if_statement.block.accept(self)
+
+        if if_statement.else_block is None:
+            def run_if(env):
+                if condition(env):
+                    return block(env)
+            return run_if
+
+        else_block = if_statement.else_block.accept(self)
+
+        def run_if_else(env):
+            if condition(env):
+                return block(env)
+            return else_block(env)
+        return run_if_else
+
+
+    def visit_while_loop(self, while_loop:WhileLoop):
+        condition = while_loop.condition.accept(self)
+        block = while_loop.block.accept(self)
+
+        def run_while(env):
+            while condition(env):
+                returned = block(env)
+                if returned is not None:
+                    return returned
+        return run_while
+
+
+    def visit_return(self, return_instruction:Return):
+        if return_instruction.expression is None:
+            def return_none(env):
+                return (None,)
+            return return_none
+
+        call = call_of(return_instruction.expression)
+        if self.functions and call is not None:
+            callee, arguments = call
+            # Calls made by the pipe operator report errors at the position of the operator
+            position = return_instruction.expression if isinstance(return_instruction.expression, BinaryOperator) else callee
+            return self.compile_call(callee, [argument.accept(self) for argument in arguments], position.line, position.column, tail=True)
+
+        expression = return_instruction.expression.accept(self)
+
+        def return_value(env):
+            return (expression(env),)
+        return return_value
+
+
+    def visit_assignment(self, assignment:Assignment):
+        expression = assignment.expression.accept(self)
+        name = assignment.identifier.value
+        line, column = assignment.line, assignment.column
+
+        if not assignment.first_index:
+            def assign(env):
+                value = expression(env)
+                scope = env
+                while scope is not None:
+                    if name in scope.values:
+                        if name not in scope.mutable:
+                            raise NeoRuntimeError(f"Variable '{name}' is immutable and cannot be assigned to", line, column)
+                        scope.values[name] = value
+                        return
+                    scope = scope.parent
+                raise NeoRuntimeError(f"Variable '{name}' must be declared before assignment", line, column)
+            return assign
+
+        first_index = assignment.first_index.accept(self)
+        second_index = assignment.second_index.accept(self)
+
+        def assign_element(env):
+            value = expression(env)
+            first = first_index(env)
+            second = second_index(env)
+
+            if not (is_index(first) and is_index(second)):
+                raise NeoRuntimeError("Indices must be whole numbers", line, column)
+            scope = env
+            while scope is not None:
+                if name in scope.values:
+                    matrix = scope.values[name]
+                    if not isinstance(matrix, Matrix):
+                        raise NeoRuntimeError("Only matrix can use access operation", line, column)
+                    if name not in scope.mutable:
+                        raise NeoRuntimeError(f"Matrix variable '{name}' is immutable and cannot be modified", line, column)
+                    matrix.store(to_index(first), to_index(second), value)
+                    return
+                scope = scope.parent
+            raise NeoRuntimeError(f"Matrix {name} doesn't exist", line, column)
+        return assign_element
+
+
+    def visit_declaration(self, declaration:Declaration):
+        expression = declaration.expression.accept(self)
+        name = declaration.identifier.value
+        mutable = declaration.mutable
+        line, column = declaration.line, declaration.column
+
+        def declare(env):
+            if name in env.values:
+                raise NeoRuntimeError(f"Variable '{name}' already declared in this scope", line, column)
+            env.values[name] = expression(env)
+            if mutable:
+                env.mutable.add(name)
+        return declare
+
+
+    def visit_identifier(self, identifier:Identifier):
+        name = identifier.value
+
+        builtin_function = builtin_functions.get(name)
+        if builtin_function is not None and name not in self.declared_names:
+            def load_builtin(env):
+                return builtin_function
+            return load_builtin
+
+        line, column = identifier.line, identifier.column
+
+        def load(env):
+            scope = env
+            while scope is not None:
+                values = scope.values
+                if name in values:
+                    return values[name]
+                scope = scope.parent
+            # A variable named like a builtin shadows it only once declared
+            if builtin_function is not None:
+                return builtin_function
+            raise NeoRuntimeError(f"Variable '{name}' doesn't exist", line, column)
+        return load
+
+
+    def visit_matrix(self, matrix:Matrix):
+        prototype = matrix.build_prototype()
+        if prototype is not None:
+            def share_prototype(env):
+                return prototype.share()
+            return share_prototype
+
+        rows = tuple(tuple(cell.accept(self) for cell in row) for row in matrix.rows)
+        line, column = matrix.line, matrix.column
+
+        def build_matrix(env):
+            return Matrix([[cell(env) for cell in row] for row in rows], line, column)
+        return build_matrix
+
+
+    def visit_access(self, access:Access):
+        matrix_expression = access.identifier.accept(self)
+        first_index = access.first.accept(self)
+        second_index = access.second.accept(self)
+        line, column = access.line, access.column
+
+        def load_element(env):
+            matrix = matrix_expression(env)
+            first = first_index(env)
+            second = second_index(env)
+
+            if not (is_index(first) and is_index(second)):
+                raise NeoRuntimeError("Indieces must be whole numbers", line, column)
+
+            if not isinstance(matrix, Matrix):
+                raise NeoRuntimeError("Matrix is needed for access operation", line, column)
+
+            return matrix.load(to_index(first), to_index(second))
+        return load_element
+
+
+    def visit_slice(self, slice:Slice):
+        start = slice.start.accept(self) if slice.start is not None else None
+        stop = slice.stop.accept(self) if slice.stop is not None else None
+        line, column = slice.line, slice.column
+
+        def build_slice(env):
+            return to_slice(start(env) if start else None, stop(env) if stop else None, line, column)
+        return build_slice
+
+
+    def visit_property(self, property:Property):
+        object_expression = property.object_name.accept(self)
+        property_name = property.property_name.value
+        line, column = property.line, property.column
+
+        def load_property(env):
+            object = object_expression(env)
+
+            if not isinstance(object, Matrix):
+                raise NeoRuntimeError("Only matrix can have properties", line, column)
+
+            try:
+                property_getter = object.properties[property_name]
+            except KeyError:
+                raise NeoRuntimeError(f"Unknown property '{property_name}'", line, column)
+
+            return property_getter(object)
+        return load_property
+
+
+    def visit_unary_operator(self, unary:UnaryOperator):
+        right = unary.rvalue.accept(self)
+
+        if unary.op == OperatorType.MINUS:
+            def negate(env):
+                return -right(env)
+            return negate
+
+        if unary.op == OperatorType.NOT:
+            def logical_not(env):
+                return not bool(right(env))
+            return logical_not
+
+        line, column = unary.line, unary.column
+
+        def unknown_operator(env):
+            raise NeoRuntimeError("Unknown unary operator", line, column)
+        return unknown_operator
+
+
+    def visit_binary_operator(self, binary:BinaryOperator):
+        op = binary.op
+
+        if op == OperatorType.PIPE:
+            if isinstance(binary.rvalue, FunctionCall):
+                # Left side becomes the first argument of the call
+                call = binary.rvalue
+                arguments = [binary.lvalue.accept(self), *[argument.accept(self) for argument in call.arguments]]
+                return self.compile_call(call.function_name_or_body, arguments, binary.line, binary.column)
+
+            if isinstance(binary.rvalue, (Identifier, Function)):
+                return self.compile_call(binary.rvalue, [binary.lvalue.accept(self)], binary.line, binary.column)
+
+            line, column = binary.rvalue.line, binary.rvalue.column
+
+            def invalid_pipe(env):
+                raise NeoRuntimeError("Right side of pipe operator must be a function", line, column)
+            return invalid_pipe
+
+        if is_chain(binary):
+            chain = MatrixChain(binary)
+            operands = tuple(operand.accept(self) for operand in chain.operands)
+
+            def multiply_chain(env):
+                return chain.evaluate([operand(env) for operand in operands])
+            return multiply_chain
+
+        left = binary.lvalue.accept(self)
+        right = binary.rvalue.accept(self)
+        line, column = binary.lvalue.line, binary.lvalue.column
+
+        if op == OperatorType.PLUS:
+            def plus(env):
+                l, r = left(env), right(env)
+                if isinstance(l, str) or isinstance(r, str):
+                    return str(l) + str(r)
+                return l + r
+            return plus
+
+        if op == OperatorType.MINUS:
+            def minus(env):
+                l, r = left(env), right(env)
+                if isinstance(l, str) or isinstance(r, str):
+                    raise NeoRuntimeError("Strings cannot take part in substract operation", line, column)
+                return l - r
+            return minus
+
+        if op == OperatorType.MULTIPLY:
+            def multiply(env):
+                l, r = left(env), right(env)
+                if isinstance(l, str) or isinstance(r, str):
+                    raise NeoRuntimeError("Strings cannot take part in multiply operation", line, column)
+                return l * r
+            return multiply
+
+        if op == OperatorType.DIVIDE:
+            def divide(env):
+                l, r = left(env), right(env)
+                if isinstance(l, Matrix) or isinstance(r, Matrix):
+                    raise NeoRuntimeError("Matrixes cannot take part in divide operation", line, column)
+                if isinstance(l, str) or isinstance(r, str):
+                    raise NeoRuntimeError("Strings cannot take part in substract operation", line, column)
+                try:
+                    return l / r
+                except ZeroDivisionError:
+                    raise NeoRuntimeError("Cannot divide by zero", line, column)
+            return divide
+
+        if op == OperatorType.DIVIDE_INTEGER:
+            def divide_integer(env):
+                l, r = left(env), right(env)
+                if isinstance(l, Matrix) or isinstance(r, Matrix):
+                    raise NeoRuntimeError("Matrixes cannot take part in integer divide operation", line, column)
+                if isinstance(l, str) or isinstance(r, str):
+                    raise NeoRuntimeError("Strings cannot take part in integer divide operation", line, column)
+                try:
+                    return l // r
+                except ZeroDivisionError:
+                    raise NeoRuntimeError("Cannot divide by zero", line, column)
+            return divide_integer
+
+        if op == OperatorType.POWER:
+            def power(env):
+                l, r = left(env), right(env)
+                if isinstance(l, str) or isinstance(r, str):
+                    raise NeoRuntimeError("Strings cannot take part in power operation", line, column)
+                return l ** r
+            return power
+
+        # Different types handling is done through __eq__
+        if op == OperatorType.EQUAL:
+            def equal(env):
+                return left(env) == right(env)
+            return equal
+
+        if op == OperatorType.NOT_EQUAL:
+            def not_equal(env):
+                return left(env) != right(env)
+            return not_equal
+
+        # Both sides are always evaluated, the same as in the tree-walking interpreter
+        if op == OperatorType.AND:
+            def logical_and(env):
+                l, r = left(env), right(env)
+                return l and r
+            return logical_and
+
+        if op == OperatorType.OR:
+            def logical_or(env):
+                l, r = left(env), right(env)
+                return l or r
+            return logical_or
+
+        if op == OperatorType.GREATER:
+            def greater(env):
+                l, r = left(env), right(env)
+                try:
+                    return l > r
+                except TypeError:
+                    raise NeoRuntimeError(f"Types '{type(l).__name__}' and '{type(r).__name__}' cannot be compared with '>' operator", line, column)
+            return greater
+
+        if op == OperatorType.GREATER_OR_EQUAL:
+            def greater_or_equal(env):
+                l, r = left(env), right(env)
+                try:
+                    return l >= r
+                except TypeError:
+                    raise NeoRuntimeError(f"Types '{type(l).__name__}' and '{type(r).__name__}' cannot be compared with '>=' operator", line, column)
+            return greater_or_equal
+
+        if op == OperatorType.LESS:
+            def less(env):
+                l, r = left(env), right(env)
+                try:
+                    return l < r
+                except TypeError:
+                    raise NeoRuntimeError(f"Types '{type(l).__name__}' and '{type(r).__name__}' cannot be compared with '<' operator", line, column)
+            return less
+
+        if op == OperatorType.LESS_OR_EQUAL:
+            def less_or_equal(env):
+                l, r = left(env), right(env)
+                try:
+                    return l <= r
+                except TypeError:
+                    raise NeoRuntimeError(f"Types '{type(l).__name__}' and '{type(r).__name__}' cannot be compared with '<=' operator", line, column)
+            return less_or_equal
+
+        line, column = binary.line, binary.column
+
+        def unknown_operator(env):
+            raise NeoRuntimeError("Unknown binary operator", line, column)
+        return unknown_operator
+
+
+    def visit_literal(self, literal):
+        value = literal.value
+
+        def constant(env):
+            return value
+        return constant
+
+
+    def visit_constant(self, constant_node):
+        value = constant_node.value
+
+        if isinstance(value, Matrix):
+            # Matrices are mutable, every evaluation gets its own copy-on-write matrix
+            def share_matrix(env):
+                return value.share()
+            return share_matrix
+
+        def constant(env):
+            return value
+        return constant
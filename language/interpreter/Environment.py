@@ -0,0 +1,11 @@
+class Environment:
+    """
+    Scope used by the compiled engines. Values are kept in a plain dict
+    and names declared with 'mut' are tracked in a separate set.
+    """
+    __slots__ = ("values", "mutable", "parent")
+
+    def __init__(self, parent=None):
+        self.values = {}
+        self.mutable = set()
+        self.parent = parent
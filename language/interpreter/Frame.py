@@ -0,0 +1,42 @@
+# Marks a slot whose variable was not declared yet
+UNSET = object()
+
+
+class Frame:
+    """
+    Variables of one function invocation (or of the top level code), stored in
+    the slots assigned by the Resolver. parent is the frame of the lexically
+    enclosing function, so a variable is found by following 'depth' parents.
+    """
+    __slots__ = ("slots", "parent")
+
+    def __init__(self, size, parent=None):
+        self.slots = [UNSET] * size
+        self.parent = parent
+
+
+class Closure:
+    """
+    Runtime value of a Neo function: the Function node together with the frame
+    it was defined in. The AST itself is never modified or copied by calls.
+    """
+    __slots__ = ("function", "frame")
+
+    def __init__(self, function, frame):
+        self.function = function
+        self.frame = frame
+
+    def __repr__(self):
+        return repr(self.function)
+
+
+class TailCall:
+    """
+    Returned in place of the value of 'return f(...)', the enclosing call runs
+    the callee instead of nesting another Python call.
+    """
+    __slots__ = ("closure", "arguments")
+
+    def __init__(self, closure, arguments):
+        self.closure = closure
+        self.arguments = arguments
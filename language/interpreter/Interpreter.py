@@ -1,108 +1,272 @@
 from language.nodes.Instructions import Assignment, Block, FunctionCall, IfStatement, Return, WhileLoop, Declaration
 from language.nodes.ToplevelObjects import Function
-from language.nodes.Expressions import Access, BinaryOperator, Identifier, Matrix, Property, UnaryOperator
+from language.nodes.Expressions import Access, BinaryOperator, Constant, Identifier, Matrix, Property, Slice, UnaryOperator
+from language.nodes.Expressions.Slice import is_index, to_index, to_slice
 from language.nodes.OperatorType import OperatorType
 from language.errors.InterpreterExceptions import NeoRuntimeError
-from language.interpreter.Built_ins import builtin_functions
-import copy
+from language.interpreter.Built_ins import builtin_functions, callable_arguments, higher_order_builtins
+from language.interpreter.ClosureCompiler import ClosureCompiler
+from language.interpreter.Environment import Environment
+from language.interpreter.Frame import Closure, Frame, TailCall, UNSET
+from language.resolver.Resolver import Resolver, call_of
+from language.linalg.MatrixChain import MatrixChain, is_chain
+from language.compiler.Compiler import Compiler
+from language.compiler.VM import VM
+
+# "tree" walks the AST with the Visitor, "closure" compiles it into Python closures first
+# and "vm" compiles it into bytecode executed by a stack machine
+engines = ("tree", "closure", "vm")
 
 class Interpreter():
-    def __init__(self, parsed_program):
+    default_engine = "tree"
+
+    def __init__(self, parsed_program, engine=None):
+        self.engine = engine or self.default_engine
+        if self.engine not in engines:
+            raise ValueError(f"Unknown engine '{self.engine}'. Available engines: {', '.join(engines)}")
         self.parsed_objects = parsed_program.toplevel_objects
-        self.visitor = Visitor()
+        self.visitor = None
+        self.compiled_objects = None
+        self.bytecode = None
+        if self.engine == "tree":
+            Resolver().resolve_program(parsed_program)
+            self.visitor = Visitor(parsed_program.frame_size)
+        elif self.engine == "closure":
+            self.compiled_objects = ClosureCompiler().compile_program(parsed_program)
+        elif self.engine == "vm":
+            self.bytecode = Compiler().compile_program(parsed_program)
 
     def run(self):
+        if self.compiled_objects is not None:
+            return self.run_compiled()
+        if self.bytecode is not None:
+            return self.run_bytecode()
+
         for top_level_object in self.parsed_objects:
             try:
                 top_level_object.accept(self.visitor)
             except NeoRuntimeError as e:
                 print(e)
                 return
+            # 'return' outside of a function ends the program
+            if self.visitor.returning:
+                return
+
+    def run_compiled(self):
+        global_env = Environment()
+        for compiled_object in self.compiled_objects:
+            try:
+                # 'return' outside of a function ends the program
+                if compiled_object(global_env) is not None:
+                    return
+            except NeoRuntimeError as e:
+                print(e)
+                return
+
+    def run_bytecode(self):
+        try:
+            VM().run(self.bytecode)
+        except NeoRuntimeError as e:
+            print(e)
   
 
 class Visitor:
-    def __init__(self):
-        self.scopes = [{}]
+    """
+    Tree-walking interpreter. Variables live in slot-indexed frames, the slot and
+    depth of every identifier are assigned beforehand by the Resolver.
+    """
+    def __init__(self, frame_size=0):
+        self.frame = Frame(frame_size)
+        # Set by an executed 'return' and cleared by the function call it returns from
+        self.returning = False
+        # id of a matrix literal -> its frozen prototype, None if the literal has non constant cells
+        self.prototypes = {}
+        # id of the root of a multiplication chain -> its MatrixChain
+        self.chains = {}
+
+
+    def frame_of(self, identifier:Identifier):
+        frame = self.frame
+        depth = identifier.depth
+        while depth:
+            frame = frame.parent
+            depth -= 1
+        return frame
+
+
+    def declared_frame_of(self, identifier:Identifier):
+        if identifier.slot is None:
+            return None, False
+        frame = self.frame_of(identifier)
+        return frame, frame.slots[identifier.slot] is not UNSET
+
+
+    def function_value(self, identifier:Identifier):
+        """Closure held by the innermost variable of the name which holds a function, None if there is none"""
+        if identifier.slot is None:
+            return None
+        value = self.frame_of(identifier).slots[identifier.slot]
+        if isinstance(value, Closure):
+            return value
+        for depth, slot in identifier.shadowed:
+            frame = self.frame
+            while depth:
+                frame = frame.parent
+                depth -= 1
+            value = frame.slots[slot]
+            if isinstance(value, Closure):
+                return value
+        return None
 
 
     def visit_function_definition(self, function:Function):
         if function.name and function.name.value in builtin_functions:
             raise NeoRuntimeError(f"Function name '{function.name.value}' is reserved for build-in function", function.name.line, function.name.column)
 
-        # Store function in the current scope as a value
+        # Function captures the frame it is defined in
+        closure = Closure(function, self.frame)
+
+        # Store function in the current frame as a value
         if function.name and function.name.value:
-            self.scopes[-1][function.name.value] = (function, False)
+            self.frame.slots[function.name.slot] = closure
         
-        return function
+        return closure
 
 
     def visit_function_call(self, function_call:FunctionCall):
-        line = function_call.function_name_or_body.line
-        column = function_call.function_name_or_body.column
+        callee = function_call.function_name_or_body
+        return self.call_function(callee, function_call.arguments, callee.line, callee.column)
+
+
+    def call_function(self, callee, arguments, line, column):
+        # Builtin functions are recognized by the Resolver, a Neo function of the same name is called instead
+        if isinstance(callee, Identifier) and callee.builtin and self.function_value(callee) is None:
+            builtin_function = builtin_functions[callee.value]
+            values = [arg.accept(self) for arg in arguments]
+            if callee.value in higher_order_builtins:
+                values = callable_arguments(values, Closure, lambda closure: self.python_function(closure, line, column), line, column)
+            return builtin_function(line, column, *values)
 
+        closure = self.closure_of(callee, len(arguments), line, column)
+        try:
+            return self.call(closure, [arg.accept(self) for arg in arguments])
+        except RecursionError:
+            # Raised by the innermost call, outer calls get the NeoRuntimeError
+            raise NeoRuntimeError("Maximum recursion depth exceeded", line, column) from None
+
+
+    def closure_of(self, callee, arguments_count, line, column):
         # Handle both identifier-based function calls and immediately invoked function expression (IIFE)
-        if isinstance(function_call.function_name_or_body, Function):
-            # Immediately invoked function expression (IIFE)
-            function = function_call.function_name_or_body
+        if isinstance(callee, Function):
+            closure = Closure(callee, self.frame)
         else:
-            # Traditional function call by name
-            function_name = function_call.function_name_or_body.value
-
-            # Look for function name in builtin functions
-            if function_name in builtin_functions:
-                builtin_function = builtin_functions[function_name]
-                return builtin_function(line, column, *[arg.accept(self) for arg in function_call.arguments])
-
-            # Look for function name in scopes
-            function = None
-            for scope in self.scopes[::-1]:
-                if function_name in scope:
-                    value, _ = scope[function_name]
-                    if isinstance(value, Function):
-                        function = value
-                        break
-            
-            if function is None:
-                raise NeoRuntimeError(f"Function '{function_name}' doesn't exist", line, column)
-
-        if len(function.parameter_list) != len(function_call.arguments):
-            raise NeoRuntimeError("Incorrect number of arguments", line, column)
+            closure = self.function_value(callee)
+            if closure is None:
+                raise NeoRuntimeError(f"Function '{callee.value}' doesn't exist", line, column)
 
-        for param, arg in zip(function.parameter_list, function_call.arguments):
-            # Always store as (value, mutable=False) for parameters
-            function.block.passed_variables[param.value] = (arg.accept(self), False)
+        if len(closure.function.parameter_list) != arguments_count:
+            raise NeoRuntimeError("Incorrect number of arguments", line, column)
+        return closure
+
+
+    def call(self, closure, arguments):
+        """
+        Runs the closure with already evaluated arguments. A tail call returned by the
+        body is run by the same loop, so tail recursion does not grow the Python stack.
+        """
+        caller_frame = self.frame
+        frame = previous_function = None
+        try:
+            while True:
+                function = closure.function
+                if frame is not None and function is previous_function and not function.creates_closures:
+                    # Self tail call - nothing can refer to the frame anymore, so it is reused
+                    frame.parent = closure.frame
+                    frame.slots[len(arguments):] = [UNSET] * (function.block.frame_size - len(arguments))
+                else:
+                    # Every invocation gets its own frame, parameters take the first slots
+                    frame = Frame(function.block.frame_size, closure.frame)
+                slots = frame.slots
+                for param, value in zip(function.parameter_list, arguments):
+                    slots[param.slot] = value
+
+                self.frame = frame
+                return_value = function.block.accept(self)
+                if not self.returning:
+                    return None
+                self.returning = False
+
+                if not isinstance(return_value, TailCall):
+                    return return_value
+                previous_function = function
+                closure, arguments = return_value.closure, return_value.arguments
+        finally:
+            self.frame = caller_frame
+
+
+    def python_function(self, closure, line, column):
+        """
+        The closure as a Python function, called by a builtin once per cell. A function
+        which creates no closures cannot leave its frame referenced after it returns,
+        so all its calls run in one frame, reset before each of them.
+        """
+        function = closure.function
+        if function.creates_closures:
+            def call_closure(*arguments):
+                if len(arguments) != len(function.parameter_list):
+                    raise NeoRuntimeError("Incorrect number of arguments", line, column)
+                return self.call(closure, arguments)
+            return call_closure
+
+        frame = Frame(function.block.frame_size, closure.frame)
+        slots = frame.slots
+        unset_slots = [UNSET] * function.block.frame_size
+        parameter_slots = [param.slot for param in function.parameter_list]
+        block = function.block
+
+        def call_in_frame(*arguments):
+            if len(arguments) != len(parameter_slots):
+                raise NeoRuntimeError("Incorrect number of arguments", line, column)
+            slots[:] = unset_slots
+            for slot, value in zip(parameter_slots, arguments):
+                slots[slot] = value
+
+            caller_frame = self.frame
+            self.frame = frame
+            try:
+                return_value = block.accept(self)
+            finally:
+                self.frame = caller_frame
+            if not self.returning:
+                return None
+            self.returning = False
+            if isinstance(return_value, TailCall):
+                return self.call(return_value.closure, return_value.arguments)
+            return return_value
+        return call_in_frame
 
-        return_value = function.block.accept(self)
-        if isinstance(return_value, Function):
-            # Deepcopy the function to avoid sharing the same closure
-            return copy.deepcopy(return_value)
-        return return_value
 
     def visit_block(self, block:Block):
-        if block.closure:
-            self.scopes.append(block.closure)
+        if block.own_frame:
+            enclosing_frame = self.frame
+            self.frame = Frame(block.frame_size, enclosing_frame)
+            try:
+                return self.run_block(block)
+            finally:
+                self.frame = enclosing_frame
 
-        # creating a new scope for the block
-        self.scopes.append({})
+        # Other blocks share the frame of their function, their variables are undeclared on entry
+        slots = self.frame.slots
+        for slot in block.local_slots:
+            slots[slot] = UNSET
+        return self.run_block(block)
 
-        if block.passed_variables:
-            self.scopes[-1].update(block.passed_variables)
 
-        return_value = None
+    def run_block(self, block:Block):
         for instruction in block.instructions:
             return_value = instruction.accept(self)
-            if isinstance(instruction, Return):
-                break
-
-        if isinstance(return_value, Function):
-            return_value.block.closure = self.scopes[-1]
-        
-        self.scopes.pop()
-        # Clean up the closure scopes
-        if block.closure:
-            self.scopes.pop()
-
-        return return_value
+            if self.returning:
+                return return_value
 
 
     def visit_if_statement(self, if_statement:IfStatement):
@@ -117,103 +281,129 @@ class Visitor:
     def visit_while_loop(self, while_loop:WhileLoop):
         condition = while_loop.condition.accept(self)
 
-        return_value = None
         while condition:
             return_value = while_loop.block.accept(self)
-            if (return_value is None):
-                condition = while_loop.condition.accept(self)
-            else:
+            if self.returning:
                 return return_value
+            condition = while_loop.condition.accept(self)
 
 
     def visit_return(self, return_instruction:Return):
         if return_instruction.expression is None:
-            return None
-        return return_instruction.expression.accept(self)
+            return_value = None
+        elif return_instruction.tail_call:
+            # The call is made by the enclosing Visitor.call after the current frame is left
+            callee, arguments = call_of(return_instruction.expression)
+            # Calls made by the pipe operator report errors at the position of the operator
+            position = return_instruction.expression if isinstance(return_instruction.expression, BinaryOperator) else callee
+            closure = self.closure_of(callee, len(arguments), position.line, position.column)
+            return_value = TailCall(closure, [arg.accept(self) for arg in arguments])
+        else:
+            return_value = return_instruction.expression.accept(self)
+
+        # Makes blocks and loops stop until the enclosing function call is reached
+        self.returning = True
+        return return_value
 
 
     def visit_assignment(self, assignment:Assignment):
         expression_value = assignment.expression.accept(self)
 
+        identifier = assignment.identifier
+
         if not assignment.first_index:
-            # Only allow assignment if variable already exists in any scope
-            for scope in self.scopes[::-1]:
-                if assignment.identifier.value in scope:
-                    old_value, mutable = scope[assignment.identifier.value]
-                    if not mutable:
-                        raise NeoRuntimeError(
-                            f"Variable '{assignment.identifier.value}' is immutable and cannot be assigned to",
-                            assignment.line,
-                            assignment.column
-                        )
-                    scope[assignment.identifier.value] = (expression_value, mutable)
-                    break
-            else:
+            frame, declared = self.declared_frame_of(identifier)
+            # Only allow assignment if variable is already declared
+            if not declared:
+                raise NeoRuntimeError(
+                    f"Variable '{identifier.value}' must be declared before assignment",
+                    assignment.line,
+                    assignment.column
+                )
+            if not assignment.mutable:
                 raise NeoRuntimeError(
-                    f"Variable '{assignment.identifier.value}' must be declared before assignment",
+                    f"Variable '{identifier.value}' is immutable and cannot be assigned to",
                     assignment.line,
                     assignment.column
                 )
+            frame.slots[identifier.slot] = expression_value
         else:
             first_index_value = assignment.first_index.accept(self)
             second_index_value = assignment.second_index.accept(self)
 
-            if not (first_index_value.is_integer() and second_index_value.is_integer()):
+            if not (is_index(first_index_value) and is_index(second_index_value)):
                 raise NeoRuntimeError("Indices must be whole numbers", assignment.line, assignment.column)
-            for scope in self.scopes[::-1]:
-                if assignment.identifier.value in scope:
-                    matrix, mutable = scope[assignment.identifier.value]
-                    if not isinstance(matrix, Matrix):
-                        raise NeoRuntimeError("Only matrix can use access operation", assignment.line, assignment.column)
-                    if not mutable:
-                        raise NeoRuntimeError(
-                            f"Matrix variable '{assignment.identifier.value}' is immutable and cannot be modified",
-                            assignment.line,
-                            assignment.column
-                        )
-                    matrix.rows[int(first_index_value)][int(second_index_value)] = expression_value
-                    return
-            raise NeoRuntimeError(f"Matrix {assignment.identifier.value} doesn't exist", assignment.line, assignment.column)     
+            frame, declared = self.declared_frame_of(identifier)
+            if not declared:
+                raise NeoRuntimeError(f"Matrix {identifier.value} doesn't exist", assignment.line, assignment.column)
+            matrix = frame.slots[identifier.slot]
+            if not isinstance(matrix, Matrix):
+                raise NeoRuntimeError("Only matrix can use access operation", assignment.line, assignment.column)
+            if not assignment.mutable:
+                raise NeoRuntimeError(
+                    f"Matrix variable '{identifier.value}' is immutable and cannot be modified",
+                    assignment.line,
+                    assignment.column
+                )
+            matrix.store(to_index(first_index_value), to_index(second_index_value), expression_value)
 
 
     def visit_declaration(self, declaration:Declaration):
-        identifier = declaration.identifier.value
-        if identifier in self.scopes[-1]:
-            raise NeoRuntimeError(f"Variable '{identifier}' already declared in this scope", declaration.line, declaration.column)
+        if declaration.redeclared:
+            raise NeoRuntimeError(f"Variable '{declaration.identifier.value}' already declared in this scope", declaration.line, declaration.column)
         value = declaration.expression.accept(self)
-        self.scopes[-1][identifier] = (value, declaration.mutable)
+        self.frame.slots[declaration.identifier.slot] = value
 
 
     def visit_identifier(self, identifier:Identifier):
-        # First check builtin functions
-        if identifier.value in builtin_functions:
-            return builtin_functions[identifier.value]
-        # Then check scopes
-        for scope in self.scopes[::-1]:
-            if identifier.value in scope:
-                value, _ = scope[identifier.value]
+        if identifier.slot is not None:
+            value = self.frame_of(identifier).slots[identifier.slot]
+            if value is not UNSET:
                 return value
-        
+        # Builtin functions are recognized by the Resolver, a variable of the same name shadows them
+        if identifier.builtin:
+            return builtin_functions[identifier.value]
+
         raise NeoRuntimeError(f"Variable '{identifier.value}' doesn't exist", identifier.line, identifier.column) 
 
 
     def visit_matrix(self, matrix:Matrix):
-        for row in matrix.rows:
-            for i, cell in enumerate(row):
-                row[i] = cell.accept(self)
-        return matrix
+        # The literal node is a template, every evaluation yields a new runtime matrix
+        try:
+            prototype = self.prototypes[id(matrix)]
+        except KeyError:
+            prototype = self.prototypes[id(matrix)] = matrix.build_prototype()
+        if prototype is not None:
+            return prototype.share()
+
+        return Matrix([[cell.accept(self) for cell in row] for row in matrix.rows], matrix.line, matrix.column)
+
+
+    def visit_constant(self, constant:Constant):
+        # Matrices are mutable, so the precomputed value itself is never handed out
+        if isinstance(constant.value, Matrix):
+            return constant.value.share()
+        return constant.value
 
 
     def visit_access(self, access:Access):
         matrix = access.identifier.accept(self)
+        first = access.first.accept(self)
+        second = access.second.accept(self)
 
-        if not (access.first.value.is_integer() and access.second.value.is_integer()):
+        if not (is_index(first) and is_index(second)):
             raise NeoRuntimeError("Indieces must be whole numbers", access.line, access.column)
 
         if not isinstance(matrix, Matrix):
             raise NeoRuntimeError("Matrix is needed for access operation", access.line, access.column)
 
-        return matrix.rows[int(access.first.value)][int(access.second.value)]
+        return matrix.load(to_index(first), to_index(second))
+
+
+    def visit_slice(self, slice:Slice):
+        start = slice.start.accept(self) if slice.start is not None else None
+        stop = slice.stop.accept(self) if slice.stop is not None else None
+        return to_slice(start, stop, slice.line, slice.column)
                 
 
     def visit_property(self, property:Property):
@@ -227,7 +417,7 @@ class Visitor:
         except KeyError:
             raise NeoRuntimeError(f"Unknown property '{property.property_name.value}'", property.line, property.column)
 
-        return property_getter()
+        return property_getter(object)
 
 
     def visit_unary_operator(self, unary:UnaryOperator):
@@ -246,19 +436,26 @@ class Visitor:
     def visit_binary_operator(self, binary:BinaryOperator):
         # Special handling for pipe operator - don't evaluate left side yet
         if binary.op == OperatorType.PIPE:
-            if isinstance(binary.rvalue, Identifier):
-                # Create a function call with left as the argument
-                temp_function_call = FunctionCall(binary.rvalue, [binary.lvalue], binary.line, binary.column)
-                return temp_function_call.accept(self)
-            
-            elif isinstance(binary.rvalue, Function):
-                # Create a function call with left as the first argument
-                temp_function_call = FunctionCall(binary.rvalue, [binary.lvalue], binary.line, binary.column)
-                return temp_function_call.accept(self)
-            
+            # Calls made by the pipe operator report errors at the position of the operator
+            if isinstance(binary.rvalue, FunctionCall):
+                # Left side becomes the first argument of the call
+                call = binary.rvalue
+                return self.call_function(call.function_name_or_body, [binary.lvalue, *call.arguments], binary.line, binary.column)
+
+            elif isinstance(binary.rvalue, (Identifier, Function)):
+                return self.call_function(binary.rvalue, [binary.lvalue], binary.line, binary.column)
+
             else:
                 raise NeoRuntimeError("Right side of pipe operator must be a function", binary.rvalue.line, binary.rvalue.column)
-        
+
+        if is_chain(binary):
+            # The plan of a chain is kept between evaluations
+            try:
+                chain = self.chains[id(binary)]
+            except KeyError:
+                chain = self.chains[id(binary)] = MatrixChain(binary)
+            return chain.evaluate([operand.accept(self) for operand in chain.operands])
+
         left = binary.lvalue.accept(self)
         right = binary.rvalue.accept(self)
 
@@ -1,42 +1,164 @@
+import re
 from .Source import SourceFile
 from .Token import Token, Symbol, TokenType
 from language.errors.LexerExceptions import ErrorCode, LexerError
 
+# Runs of characters are matched on the text of the source at its cursor, instead of
+# moving one character at a time
+WHITESPACE = re.compile('[ \n\t\r]+')
+# Every identifier character is a word character, \w also matches numeric characters which are not
+WORD = re.compile(r'\w+')
+ASCII_DIGITS = re.compile('[0-9]+')
+# Number can start with only one zero
+NUMBER = re.compile(r'(?:0|[0-9]+)(\.[0-9]*)?')
+
+SKIPPED_STARTS = {' ', '\n', '\t', '\r', '#'}
+
+DOUBLE_OPERATOR_STARTS = {operator[0] for operator in Symbol.double_operators}
+
+# "hand" builds each token from the character under the cursor, "regex" matches all
+# tokens with one master pattern scanned over the whole text
+engines = ("hand", "regex")
+
+OPERATORS = {**Symbol.special_characters, **Symbol.double_operators}
+
+
+def alternatives(words):
+    # Longest first, so '<=' is matched before '<'
+    return '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+# One named group per kind of token, match.lastgroup tells which one matched. Only the
+# common ASCII forms are matched here, anything else (non-ASCII letters and digits,
+# escapes in strings, too long words and strings, errors) is matched by 'other' and
+# built by the hand-written lexer from the same offset
+MASTER_PATTERN = re.compile(rf'''
+    [ ]*(?:
+    (?P<skipped>[ \n\t\r]+|\#[^\n]*\n)
+  | (?P<last_comment>\#[^\n]*)
+  | (?P<reserved>{alternatives(Symbol.reserved_words)})(?!\w)
+  | (?P<word>[A-Za-z][A-Za-z0-9_]*)(?!\w)
+  | (?P<number>(?:0|[1-9][0-9]*)(?:\.[0-9]*)?)(?![\d.])
+  | (?P<string>"[^"\\]*")
+  | (?P<operator>{alternatives(OPERATORS)})
+  | (?P<other>[\s\S])
+    )''', re.VERBOSE)
+
+
+def is_identifier_char(char):
+    return char.isalpha() or char.isdigit() or char == '_'
+
 
 class Lexer:
-    def __init__(self, source, MAX_IDENTIFIER_LENGHT = 100, MAX_STRING_LENGHT = 500):
+    default_engine = "hand"
+
+    def __init__(self, source, MAX_IDENTIFIER_LENGHT = 100, MAX_STRING_LENGHT = 500, engine=None):
         self.source = source
         self.token = None
         self.MAX_IDENTIFIER_LENGHT = MAX_IDENTIFIER_LENGHT
         self.MAX_STRING_LENGHT = MAX_STRING_LENGHT
+        self.engine = engine or self.default_engine
+        if self.engine not in engines:
+            raise ValueError(f"Unknown lexer engine '{self.engine}'. Available engines: {', '.join(engines)}")
+        self.matched_tokens = self.match_tokens() if self.engine == "regex" else None
 
 
     def yield_tokens(self):
+        if self.matched_tokens is not None:
+            for self.token in self.matched_tokens:
+                yield self.token
+            return
         while(self.token == None or self.token.token_type != TokenType.EOF):
             self.build_next_token()
             yield self.token
 
 
     def build_next_token(self):
-        while self.skip_comment() or self.skip_whitespace():
-            pass
+        if self.matched_tokens is not None:
+            # The EOF token is repeated once the text is consumed, as the hand-written lexer does
+            self.token = next(self.matched_tokens, self.token)
+        else:
+            self.build_token_at_cursor()
+
+
+    def match_tokens(self):
+        """Tokens of the regex engine, from the cursor of the source to its end"""
+        source = self.source
+        text = source.text
+        reserved_words = Symbol.reserved_words
+        offset = source.offset
+        end_offset = len(text)
+        # Line of the cursor and offset of the newline starting it, counted from the matched
+        # text instead of searched for every token
+        line, line_start = self.line_before(offset)
+        while True:
+            for match in MASTER_PATTERN.finditer(text, offset):
+                kind = match.lastgroup
+                value = match.group(kind)
+                start = match.start(kind)
+                if kind == 'skipped':
+                    if '\n' in value:
+                        line += value.count('\n')
+                        line_start = start + value.rindex('\n')
+                    continue
+                if kind == 'operator':
+                    yield Token(OPERATORS[value], value, line, start - line_start)
+                elif kind == 'word' and len(value) <= self.MAX_IDENTIFIER_LENGHT:
+                    yield Token(TokenType.IDENTIFIER, value, line, start - line_start)
+                elif kind == 'number':
+                    yield Token(TokenType.SCALAR, float(value) if '.' in value else int(value), line, start - line_start)
+                elif kind == 'reserved' and len(value) <= self.MAX_IDENTIFIER_LENGHT:
+                    yield Token(reserved_words[value], value, line, start - line_start)
+                elif kind == 'string' and len(value) - 2 <= self.MAX_STRING_LENGHT:
+                    yield Token(TokenType.STRING, value[1:-1], line, start - line_start)
+                    if '\n' in value:
+                        line += value.count('\n')
+                        line_start = start + value.rindex('\n')
+                elif kind == 'last_comment':
+                    # Skipping a comment moves past its newline, also when the text ends instead
+                    end_offset += 1
+                else:
+                    source.move_to(start)
+                    self.build_token_at_cursor()
+                    yield self.token
+                    # The hand-written token can end elsewhere than the match, scan again from its end
+                    offset = source.offset
+                    line, line_start = self.line_before(offset)
+                    break
+            else:
+                break
 
-        position = self.source.current_line, self.source.current_column
+        source.move_to(end_offset)
+        yield Token(TokenType.EOF, '', *source.position_of(end_offset))
 
-        if self.try_build_eof():
-            pass
-        elif self.try_build_identifier_or_reserved_word(position):
-            pass
-        elif self.try_build_string(position):
-            pass
-        elif self.try_build_scalar():
-            pass        
-        elif self.try_build_double_operator():
-            pass
-        elif self.try_build_special_character():
+
+    def line_before(self, offset):
+        """Line which the text before the offset ends on and the offset of the newline starting it"""
+        if offset == 0:
+            return 1, -1
+        line, column = self.source.position_of(offset - 1)
+        return line, offset - 1 - column
+
+
+    def build_token_at_cursor(self):
+        source = self.source
+        while source.current_char in SKIPPED_STARTS and (self.skip_comment() or self.skip_whitespace()):
             pass
-        else:
-            raise LexerError(ErrorCode.CANT_IDENTIFY_TOKEN, position, self.source.current_char)
+
+        position = source.position_of(source.offset)
+
+        # The first character tells which kind of token can start here
+        char = source.current_char
+        if char == '':
+            self.try_build_eof()
+        elif char.isalpha():
+            self.try_build_identifier_or_reserved_word(position)
+        elif char == '"':
+            self.try_build_string(position)
+        elif char.isdigit():
+            self.try_build_scalar()
+        elif not (self.try_build_double_operator() or self.try_build_special_character()):
+            raise LexerError(ErrorCode.CANT_IDENTIFY_TOKEN, position, char)
 
         self.token.set_position(position)
 
@@ -49,15 +171,17 @@ class Lexer:
 
 
     def try_build_identifier_or_reserved_word(self, position):
-        chars = []
         if self.source.current_char.isalpha():
-            while self.source.current_char.isalpha() or self.source.current_char.isdigit() or self.source.current_char == '_' or self.source.current_char == '-':
-                if len(chars) >= self.MAX_IDENTIFIER_LENGHT:
-                    raise LexerError(ErrorCode.EXCEED_MAX_IDENTIFIER_LENGHT, position)
-                chars.append(self.source.current_char)
-                self.source.move_to_next_char()
-                
-            word = ''.join(chars)    
+            word = WORD.match(self.source.text, self.source.offset).group()
+            if not word.isascii():
+                length = 0
+                while length < len(word) and is_identifier_char(word[length]):
+                    length += 1
+                word = word[:length]
+            if len(word) > self.MAX_IDENTIFIER_LENGHT:
+                raise LexerError(ErrorCode.EXCEED_MAX_IDENTIFIER_LENGHT, position)
+            self.source.move_to(self.source.offset + len(word))
+
             if word in Symbol.reserved_words:
                 token_type = Symbol.reserved_words[word]
                 self.token = Token(token_type, word)
@@ -72,6 +196,15 @@ class Lexer:
         if not self.source.current_char.isdigit():
             return False
 
+        text = self.source.text
+        match = NUMBER.match(text, self.source.offset)
+        if match is not None and not text[match.end():match.end() + 1].isdigit():
+            self.source.move_to(match.end())
+            number = match.group()
+            self.token = Token(TokenType.SCALAR, int(number) if match.group(1) is None else float(number))
+            return True
+
+        # Digits of other scripts
         buffer = ''
 
         # Number can start with only one zero
@@ -79,17 +212,13 @@ class Lexer:
             buffer += '0'
             self.source.move_to_next_char()
         else:
-            while self.source.current_char.isdigit():
-                buffer += self.source.current_char
-                self.source.move_to_next_char()
+            buffer += self.take_digits()
 
         # Check if the number has a dot
         if self.source.current_char == '.':
             buffer += self.source.current_char
             self.source.move_to_next_char()
-            while self.source.current_char.isdigit():
-                buffer += self.source.current_char
-                self.source.move_to_next_char()
+            buffer += self.take_digits()
 
             self.token = Token(TokenType.SCALAR, float(buffer))             
         else:
@@ -97,10 +226,21 @@ class Lexer:
         return True
 
 
+    def take_digits(self):
+        start = self.source.offset
+        match = ASCII_DIGITS.match(self.source.text, start)
+        if match is not None:
+            self.source.move_to(match.end())
+        # Digits of other scripts
+        while self.source.current_char.isdigit():
+            self.source.move_to_next_char()
+        return self.source.text[start:self.source.offset]
+
+
     def try_build_special_character(self):
         if self.source.current_char in Symbol.special_characters:
             token_type = Symbol.special_characters[self.source.current_char]
-            self.token = Token(token_type, self.source.current_char, self.source.current_line, self.source.current_column)
+            self.token = Token(token_type, self.source.current_char)
             self.source.move_to_next_char()
             return True
         return False
@@ -108,7 +248,7 @@ class Lexer:
 
     def try_build_double_operator(self):
         first_char = self.source.current_char
-        if first_char in [x[0] for x in Symbol.double_operators]:
+        if first_char in DOUBLE_OPERATOR_STARTS:
             second_char = self.source.move_to_next_char()
             if first_char + second_char in Symbol.double_operators:
                 token_type = Symbol.double_operators[first_char + second_char]
@@ -153,16 +293,16 @@ class Lexer:
 
     def skip_comment(self):
         if self.source.current_char == '#':
-            while self.source.current_char != '\n' and self.source.current_char != '':
-                self.source.move_to_next_char()
+            end = self.source.text.find('\n', self.source.offset)
+            self.source.move_to(len(self.source.text) if end == -1 else end)
             self.source.move_to_next_char()
             return True
         return False
 
 
     def skip_whitespace(self):
-        if self.source.current_char == ' ' or self.source.current_char == '\n' or self.source.current_char == '\t' or self.source.current_char == '\r':
-            while self.source.current_char == ' ' or self.source.current_char == '\n' or self.source.current_char == '\t' or self.source.current_char == '\r':
-                self.source.move_to_next_char()
+        match = WHITESPACE.match(self.source.text, self.source.offset)
+        if match is not None:
+            self.source.move_to(match.end())
             return True
         return False
\ No newline at end of file
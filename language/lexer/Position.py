@@ -0,0 +1,24 @@
+"""
+Line and column of a token or a node packed into one int.
+
+Every token and node keeps its position, so in a large program two ints per
+object, and the references to them, take a good part of the memory of the token
+stream and the AST. line << COLUMN_BITS | column is a single int, None when the
+position is not known.
+"""
+COLUMN_BITS = 32
+COLUMN_MASK = (1 << COLUMN_BITS) - 1
+
+
+def pack(line, column):
+    if line is None or column is None:
+        return None
+    return line << COLUMN_BITS | column
+
+
+def line_of(position):
+    return None if position is None else position >> COLUMN_BITS
+
+
+def column_of(position):
+    return None if position is None else position & COLUMN_MASK
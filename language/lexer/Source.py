@@ -1,49 +1,82 @@
-class SourceFile():
-    def __init__(self, filename):
-        self.file = open(filename, 'r')
-        
-        self.current_line = 1
-        self.current_column = 0
-        
-        self.current_char = self.move_to_next_char()
+"""
+Input of the Lexer.
 
+The whole text is held at once and read through an integer cursor, offset.
+current_char is the character under the cursor, '' at the end of the input.
+Line and column are not tracked while moving: they are computed from the offset
+only when a token or an error asks for them, by a binary search in the offsets
+of the newlines, indexed the first time a position is needed.
 
-    def __del__(self):
-        self.file.close()
-        
+Lines and columns count from 1, a newline character itself is at column 0 of
+the line it starts.
+"""
+import locale
+import mmap
+import os
+import re
+from bisect import bisect_right
+
+# Files of at least this many bytes are memory-mapped and decoded from the mapping,
+# without reading them into a buffer first
+MMAP_THRESHOLD = 1 << 20
+
+NEWLINE = re.compile('\n')
 
-    def move_to_next_char(self):
-        self.current_char = self.file.read(1)
 
-        self.current_column += 1
+class Source:
+    def __init__(self, text):
+        self.text = text
+        self.offset = 0
+        self.current_char = text[:1]
+        # Offsets of the newline characters, built on the first position query
+        self.newlines = None
 
-        if self.current_char == '\n':
-            self.current_line += 1
-            self.current_column = 0
 
+    def move_to_next_char(self):
+        self.offset += 1
+        self.current_char = self.text[self.offset:self.offset + 1]
         return self.current_char
 
 
-class SourceString():
-    def __init__(self, string):
-        self.string_iter = iter(string)
-        
-        self.current_line = 1
-        self.current_column = 0
-        
-        self.current_char = self.move_to_next_char()
+    def move_to(self, offset):
+        self.offset = offset
+        self.current_char = self.text[offset:offset + 1]
+        return self.current_char
 
-    def move_to_next_char(self):
-        try:
-            self.current_char = next(self.string_iter)
-        except StopIteration:
-            self.current_char = ''
 
-        self.current_column += 1
+    def position_of(self, offset):
+        """(line, column) of the character at the offset"""
+        if self.newlines is None:
+            self.newlines = [match.start() for match in NEWLINE.finditer(self.text)]
+        line_index = bisect_right(self.newlines, offset)
+        line_start = self.newlines[line_index - 1] if line_index else -1
+        return line_index + 1, offset - line_start
 
-        if self.current_char == '\n':
-            self.current_line += 1
-            self.current_column = 0
 
-        return self.current_char
-        
\ No newline at end of file
+    @property
+    def current_line(self):
+        return self.position_of(self.offset)[0]
+
+
+    @property
+    def current_column(self):
+        return self.position_of(self.offset)[1]
+
+
+class SourceFile(Source):
+    def __init__(self, filename):
+        with open(filename, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                    text = str(mapping, locale.getpreferredencoding(False))
+            else:
+                text = file.read().decode(locale.getpreferredencoding(False))
+        # Universal newlines, as a file opened in text mode reads them
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        super().__init__(text)
+
+
+class SourceString(Source):
+    pass
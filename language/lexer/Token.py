@@ -1,4 +1,5 @@
 from enum import Enum, auto
+from language.lexer import Position
 
 
 class TokenType(Enum):
@@ -19,6 +20,7 @@ class TokenType(Enum):
     ASSIGN = auto()
 
     COMMA = auto()
+    COLON = auto()
     DOT = auto()
     DELIMITER = auto()
 
@@ -64,6 +66,7 @@ class Symbol:
         '-': TokenType.MINUS,
         '^': TokenType.POWER,
         ',': TokenType.COMMA,
+        ':': TokenType.COLON,
         '.': TokenType.DOT,
         '=': TokenType.ASSIGN,
         '|': TokenType.DELIMITER
@@ -95,15 +98,24 @@ class Symbol:
 
 
 class Token:
+    __slots__ = ("token_type", "value", "position")
+
     def __init__(self, token_type=None, value="", line=None, column=None):
         self.token_type = token_type
         self.value = value
-        self.line = line
-        self.column = column
+        # Line and column packed together, see Position
+        self.position = Position.pack(line, column)
+
+    @property
+    def line(self):
+        return Position.line_of(self.position)
+
+    @property
+    def column(self):
+        return Position.column_of(self.position)
 
     def __repr__(self):
         return f"{self.token_type}\t\tvalue='{self.value}'\t\tposition=({self.line}, {self.column})"
 
     def set_position(self, position):
-        self.line = position[0]
-        self.column = position[1]
+        self.position = Position.pack(*position)
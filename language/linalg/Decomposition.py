@@ -0,0 +1,150 @@
+"""
+Factorizations behind the det property and the inverse, solve, rank and lu builtins.
+
+Matrices of ints use the fraction-free Bareiss elimination: every intermediate
+value is an exact integer, so the determinant is exact however large it gets.
+Any float cell makes the matrix go through LU decomposition with partial pivoting.
+Both stop at the first column without a pivot when only the determinant is needed,
+the matrix is singular then. Complete LU factors are kept by the matrix and shared
+with inverse, solve, rank and lu.
+"""
+
+
+# Machine epsilon of a float, scaled by the shape and the largest cell into the pivot tolerance
+EPSILON = 2.0 ** -52
+
+
+def is_integral(rows):
+    return all(type(cell) is int or type(cell) is bool for row in rows for cell in row)
+
+
+def determinant(rows):
+    if is_integral(rows):
+        return bareiss_determinant(rows)
+    return LUFactorization(rows, stop_when_singular=True).determinant()
+
+
+def bareiss_determinant(rows):
+    size = len(rows)
+    matrix = [[int(cell) for cell in row] for row in rows]
+    sign = 1
+    previous_pivot = 1
+    for k in range(size - 1):
+        if matrix[k][k] == 0:
+            swap = next((i for i in range(k + 1, size) if matrix[i][k] != 0), None)
+            if swap is None:
+                return 0
+            matrix[k], matrix[swap] = matrix[swap], matrix[k]
+            sign = -sign
+
+        pivot_row = matrix[k]
+        pivot = pivot_row[k]
+        for i in range(k + 1, size):
+            row = matrix[i]
+            factor = row[k]
+            # The division is exact, Sylvester's identity guarantees it
+            row[k + 1:] = [(cell * pivot - factor * pivot_cell) // previous_pivot
+                           for cell, pivot_cell in zip(row[k + 1:], pivot_row[k + 1:])]
+        previous_pivot = pivot
+    return sign * matrix[-1][-1]
+
+
+class LUFactorization:
+    """
+    PA = LU with partial pivoting, for a matrix of any shape. lower is the unit lower
+    triangular m x m matrix L, upper the m x n row echelon form U and permutation[i]
+    the row of A moved to row i. A column whose largest candidate pivot is within the
+    rounding tolerance has no pivot, its remaining cells are set to zero and the
+    elimination moves to the next column. rank is the number of pivots found.
+
+    With stop_when_singular the elimination stops at the first column without a
+    pivot instead, which is enough for the determinant. complete is False then and
+    the factors are not those of the matrix.
+    """
+    def __init__(self, rows, stop_when_singular=False):
+        rows_count, cols_count = len(rows), len(rows[0])
+        upper = [[float(cell) for cell in row] for row in rows]
+        lower = [[1.0 if i == j else 0.0 for j in range(rows_count)] for i in range(rows_count)]
+        permutation = list(range(rows_count))
+        sign = 1
+        largest = max((abs(cell) for row in upper for cell in row), default=0.0)
+        tolerance = max(rows_count, cols_count) * EPSILON * largest
+        pivot_columns = []
+
+        complete = True
+        rank = 0
+        for k in range(cols_count):
+            if rank == rows_count:
+                break
+            pivot_index = max(range(rank, rows_count), key=lambda i: abs(upper[i][k]))
+            if abs(upper[pivot_index][k]) <= tolerance:
+                if stop_when_singular:
+                    complete = False
+                    break
+                for i in range(rank, rows_count):
+                    upper[i][k] = 0.0
+                continue
+            if pivot_index != rank:
+                upper[rank], upper[pivot_index] = upper[pivot_index], upper[rank]
+                lower[rank][:rank], lower[pivot_index][:rank] = lower[pivot_index][:rank], lower[rank][:rank]
+                permutation[rank], permutation[pivot_index] = permutation[pivot_index], permutation[rank]
+                sign = -sign
+
+            pivot_row = upper[rank]
+            pivot = pivot_row[k]
+            pivot_tail = pivot_row[k + 1:]
+            for i in range(rank + 1, rows_count):
+                row = upper[i]
+                factor = row[k] / pivot
+                lower[i][rank] = factor
+                row[k] = 0.0
+                if factor:
+                    row[k + 1:] = [cell - factor * pivot_cell for cell, pivot_cell in zip(row[k + 1:], pivot_tail)]
+            pivot_columns.append(k)
+            rank += 1
+
+        self.lower = lower
+        self.upper = upper
+        self.permutation = permutation
+        self.sign = sign
+        self.pivot_columns = pivot_columns
+        self.rank = rank
+        self.complete = complete
+        self.singular = rows_count != cols_count or rank < rows_count
+
+    def determinant(self):
+        if self.singular:
+            return 0.0
+        result = float(self.sign)
+        for i, row in enumerate(self.upper):
+            result *= row[i]
+        return result
+
+    def solve(self, right_side):
+        """
+        Returns X with AX = B for the rows of B, the matrix must be square and not singular.
+        Every column of B is solved by forward substitution with L and back substitution with U.
+        """
+        size = len(self.upper)
+        lower, upper = self.lower, self.upper
+        columns = []
+        for column in zip(*right_side):
+            y = []
+            for i in range(size):
+                lower_row = lower[i]
+                y.append(column[self.permutation[i]] - sum(lower_row[k] * y[k] for k in range(i)))
+            x = [0.0] * size
+            for i in reversed(range(size)):
+                upper_row = upper[i]
+                x[i] = (y[i] - sum(upper_row[k] * x[k] for k in range(i + 1, size))) / upper_row[i]
+            columns.append(x)
+        return [list(row) for row in zip(*columns)]
+
+    def inverse(self):
+        size = len(self.upper)
+        return self.solve([[1.0 if i == j else 0.0 for j in range(size)] for i in range(size)])
+
+    def permutation_matrix(self):
+        """P as a matrix of ints, so that P * A == L * U"""
+        size = len(self.permutation)
+        return [[1 if self.permutation[i] == j else 0 for j in range(size)] for i in range(size)]
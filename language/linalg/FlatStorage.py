@@ -0,0 +1,124 @@
+"""
+Flat storage of matrices of numbers.
+
+A matrix whose cells are all ints or all floats can keep them in one array.array,
+row after row: cell (i, j) of a matrix with stride cells per row is
+cells[i * stride + j]. Typecode 'q' holds ints (int64) and 'd' floats, reading a
+cell gives back the Python number which was stored, so results are equal to those
+of the nested lists. The array takes 8 bytes per cell, where a list of lists takes
+a pointer and a boxed number (8 + 24 or 32 bytes).
+
+Mixed ints and floats (a mixed matrix prints its ints as ints), ints beyond int64,
+bools, strings and nested matrices stay on lists. Functions here return None when
+their result would not fit, the caller falls back to the lists.
+"""
+from array import array
+from itertools import repeat
+
+
+def typecode_of(value):
+    if type(value) is int:
+        return 'q'
+    if type(value) is float:
+        return 'd'
+    return None
+
+
+def to_cells(rows):
+    typecode = typecode_of(rows[0][0])
+    if typecode is None:
+        return None
+    cell_type = type(rows[0][0])
+    for row in rows:
+        for cell in row:
+            if type(cell) is not cell_type:
+                return None
+    cells = array(typecode)
+    try:
+        for row in rows:
+            cells.extend(row)
+    except OverflowError:
+        return None
+    return cells
+
+
+def filled(value, count):
+    typecode = typecode_of(value)
+    if typecode is None:
+        return None
+    try:
+        return array(typecode, [value]) * count
+    except OverflowError:
+        return None
+
+
+def to_rows(cells, stride):
+    return [cells[start:start + stride].tolist() for start in range(0, len(cells), stride)]
+
+
+def result_typecode(left, right):
+    # int op int gives an int, anything with a float gives a float
+    left_typecode = left.typecode if isinstance(left, array) else typecode_of(left)
+    right_typecode = right.typecode if isinstance(right, array) else typecode_of(right)
+    if left_typecode is None or right_typecode is None:
+        return None
+    return 'q' if left_typecode == right_typecode == 'q' else 'd'
+
+
+def combine(operator, left, right):
+    """Cells of left operator right, where the operands are cells of the same length or a number"""
+    typecode = result_typecode(left, right)
+    if typecode is None:
+        return None
+    if not isinstance(left, array):
+        left = repeat(left, len(right))
+    elif not isinstance(right, array):
+        right = repeat(right, len(left))
+    try:
+        return array(typecode, map(operator, left, right))
+    except OverflowError:
+        return None
+
+
+def negative(cells):
+    try:
+        return array(cells.typecode, [-cell for cell in cells])
+    except OverflowError:
+        return None
+
+
+def transpose(cells, stride):
+    # Column j is every stride-th cell starting at j, array slicing copies it in one step
+    result = array(cells.typecode)
+    for j in range(stride):
+        result.extend(cells[j::stride])
+    return result
+
+
+def block(cells, stride, rows_range, columns_range):
+    first_column, last_column = columns_range.start, columns_range.stop
+    result = array(cells.typecode)
+    for i in rows_range:
+        result.extend(cells[i * stride + first_column:i * stride + last_column])
+    return result
+
+
+def can_store(cells, value):
+    """True when value, a number or cells of another matrix, is written into the cells without changing what they hold"""
+    if isinstance(value, array):
+        return value.typecode == cells.typecode
+    if cells.typecode == 'q':
+        return type(value) is int and -2 ** 63 <= value < 2 ** 63
+    return type(value) is float
+
+
+def store_block(cells, stride, rows_range, columns_range, value, value_stride=None):
+    """Writes value, a number or the cells of a matrix of the block's shape, into the block"""
+    first_column, width = columns_range.start, len(columns_range)
+    if not isinstance(value, array):
+        row_value = array(cells.typecode, [value]) * width
+    for k, i in enumerate(rows_range):
+        start = i * stride + first_column
+        if isinstance(value, array):
+            row_value = value[k * value_stride:k * value_stride + width]
+        cells[start:start + width] = row_value
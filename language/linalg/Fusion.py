@@ -0,0 +1,72 @@
+"""
+Fused evaluation of elementwise matrix expressions on the list backend.
+
+A + B * 2 - C computed operator by operator allocates a matrix for B * 2 and one
+for A + B * 2 before the result, walking the cells three times. Instead the
+elementwise operators of list matrices build an expression (see LazyMatrix),
+evaluated in one pass the first time the cells are needed:
+
+    [[x0 + x1 * s0 - x2 for x0, x1, x2 in zip(r0, r1, r2)] for r0, r1, r2 in zip(*leaves)]
+
+The comprehension is generated once per expression shape and cached. Cells are
+combined with the same Python operators in the same order as the eager code,
+so results are equal, floats included.
+
+Expressions are tuples: ('rows', rows) for the cells of a matrix, ('scalar', value),
+('neg', operand) and (operator, left, right) with operator one of '+', '-', '*'.
+
+Set NEO_FUSION=0 in the environment to compute every operator eagerly.
+"""
+import os
+
+enabled = os.environ.get("NEO_FUSION", "1") != "0"
+
+# For smaller matrices building the expression costs more than the passes it saves
+MIN_FUSED_CELLS = 64
+
+# Longer expressions are cut, so a value accumulated in a loop does not grow without bound
+MAX_FUSED_OPERATIONS = 16
+
+NUMBER_TYPES = {int, float, bool}
+
+# Generated source of an expression -> its compiled kernel
+kernels = {}
+
+
+def is_numeric(rows):
+    return all(set(map(type, row)) <= NUMBER_TYPES for row in rows)
+
+
+def generate(expression, leaves, scalars):
+    """Returns the Python expression computing one cell, collecting leaves and scalars in order"""
+    kind = expression[0]
+    if kind == 'rows':
+        leaves.append(expression[1])
+        return f'x{len(leaves) - 1}'
+    if kind == 'scalar':
+        scalars.append(expression[1])
+        return f's{len(scalars) - 1}'
+    if kind == 'neg':
+        return f'(-{generate(expression[1], leaves, scalars)})'
+    return f'({generate(expression[1], leaves, scalars)} {kind} {generate(expression[2], leaves, scalars)})'
+
+
+def compile_kernel(cell, leaves_count, scalars_count):
+    cells = ', '.join(f'x{i}' for i in range(leaves_count)) + ','
+    rows = ', '.join(f'r{i}' for i in range(leaves_count)) + ','
+    parameters = ''.join(f', s{i}' for i in range(scalars_count))
+    source = (f'def kernel(leaves{parameters}):\n'
+              f'    return [[{cell} for {cells} in zip({rows})] for {rows} in zip(*leaves)]\n')
+    namespace = {}
+    exec(compile(source, '<fused elementwise kernel>', 'exec'), namespace)
+    return namespace['kernel']
+
+
+def evaluate(expression):
+    leaves, scalars = [], []
+    cell = generate(expression, leaves, scalars)
+    key = (cell, len(leaves), len(scalars))
+    kernel = kernels.get(key)
+    if kernel is None:
+        kernel = kernels[key] = compile_kernel(*key)
+    return kernel(leaves, *scalars)
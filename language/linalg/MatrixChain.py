@@ -0,0 +1,105 @@
+"""
+Chains of matrix multiplications, e.g. A * B * v, multiplied in the cheapest order.
+
+The parser makes '*' left associative, so A * B * v would be computed as (A * B) * v,
+an n^3 product, while A * (B * v) takes n^2. Once the operands are evaluated and
+turn out to be matrices of matching shapes, the order is chosen with the classic
+dynamic programming algorithm. Otherwise (scalars, strings, shapes which do not
+fit) the operands are multiplied in the order of the tree, as before.
+"""
+from language.nodes.Expressions import BinaryOperator, Matrix
+from language.nodes.OperatorType import OperatorType
+from language.errors.InterpreterExceptions import NeoRuntimeError
+
+
+def is_multiplication(node):
+    return isinstance(node, BinaryOperator) and node.op == OperatorType.MULTIPLY
+
+
+def is_chain(binary):
+    # A single '*' has only one order
+    return is_multiplication(binary) and (is_multiplication(binary.lvalue) or is_multiplication(binary.rvalue))
+
+
+def multiply_values(binary, left, right):
+    if isinstance(left, str) or isinstance(right, str):
+        raise NeoRuntimeError("Strings cannot take part in multiply operation", binary.lvalue.line, binary.lvalue.column)
+    return left * right
+
+
+def plan_order(dimensions):
+    """
+    Matrix i of the chain has the shape dimensions[i] x dimensions[i + 1]. Returns the
+    table split where the product of matrices i..j is best split after matrix split[i][j].
+    """
+    count = len(dimensions) - 1
+    cost = [[0] * count for _ in range(count)]
+    split = [[0] * count for _ in range(count)]
+    for length in range(2, count + 1):
+        for i in range(count - length + 1):
+            j = i + length - 1
+            cost[i][j] = None
+            for k in range(i, j):
+                candidate = cost[i][k] + cost[k + 1][j] + dimensions[i] * dimensions[k + 1] * dimensions[j + 1]
+                if cost[i][j] is None or candidate < cost[i][j]:
+                    cost[i][j], split[i][j] = candidate, k
+    return split
+
+
+class MatrixChain:
+    """
+    Created once per chain node, so the plan is reused as long as the shapes of the
+    operands stay the same, which is the case for a chain evaluated in a loop.
+    """
+    def __init__(self, root:BinaryOperator):
+        self.root = root
+        # Operands of the nested '*' operators in evaluation order
+        self.operands = []
+        self.collect_operands(root)
+        self.dimensions = None
+        self.split = None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {len(self.operands)} operands'
+
+    def collect_operands(self, node):
+        if is_multiplication(node):
+            self.collect_operands(node.lvalue)
+            self.collect_operands(node.rvalue)
+        else:
+            self.operands.append(node)
+
+    def evaluate(self, values):
+        dimensions = self.dimensions_of(values)
+        if dimensions is None:
+            return self.multiply_in_tree_order(self.root, iter(values))
+
+        if dimensions != self.dimensions:
+            self.dimensions, self.split = dimensions, plan_order(dimensions)
+        return self.multiply_planned(values, 0, len(values) - 1)
+
+    def dimensions_of(self, values):
+        # None unless all operands are matrices and every product is defined
+        dimensions = []
+        for value in values:
+            if not isinstance(value, Matrix):
+                return None
+            if dimensions and dimensions[-1] != value.rowlen():
+                return None
+            if not dimensions:
+                dimensions.append(value.rowlen())
+            dimensions.append(value.collen())
+        return dimensions
+
+    def multiply_planned(self, values, first, last):
+        if first == last:
+            return values[first]
+        middle = self.split[first][last]
+        return self.multiply_planned(values, first, middle) * self.multiply_planned(values, middle + 1, last)
+
+    def multiply_in_tree_order(self, node, values):
+        if not is_multiplication(node):
+            return next(values)
+        left = self.multiply_in_tree_order(node.lvalue, values)
+        right = self.multiply_in_tree_order(node.rvalue, values)
+        return multiply_values(node, left, right)
@@ -0,0 +1,108 @@
+"""
+Pure-Python matrix multiplication, used when the NumPy backend cannot take the matrices.
+
+The right operand is transposed once, so every cell is a dot product of two rows
+computed by sum(map(mul, ...)) in C. Each dot product still adds its terms from
+left to right starting at 0, so results equal those of the textbook triple loop.
+Large outputs are computed in tiles, which keeps the rows of the current tile in
+the CPU cache.
+
+Above STRASSEN_THRESHOLD (all dimensions) matrices of numbers are multiplied with
+Strassen's recursion, 7 instead of 8 half size products per level. It changes the
+rounding of float results, so it is used only when every cell of an operand has the
+same type. NEO_STRASSEN_THRESHOLD and NEO_BLOCK_SIZE in the environment override
+the defaults.
+"""
+import os
+from operator import add, mul, sub
+
+# Smallest dimension for which the Strassen recursion is used, see benchmarks/matmul.py
+STRASSEN_THRESHOLD = int(os.environ.get("NEO_STRASSEN_THRESHOLD", 256))
+
+# Output tiles are BLOCK_SIZE x BLOCK_SIZE cells
+BLOCK_SIZE = int(os.environ.get("NEO_BLOCK_SIZE", 32))
+
+
+def multiply(left, right, strassen_threshold=None, block_size=None):
+    """Returns the product of two matrices given as lists of rows"""
+    strassen_threshold = STRASSEN_THRESHOLD if strassen_threshold is None else strassen_threshold
+    if min(len(left), len(right), len(right[0])) >= strassen_threshold and is_homogeneous(left) and is_homogeneous(right):
+        return strassen(left, right, strassen_threshold)
+    return blocked(left, right, BLOCK_SIZE if block_size is None else block_size)
+
+
+def blocked(left, right, block_size):
+    columns = list(zip(*right))
+    if len(left) <= block_size and len(columns) <= block_size:
+        return [[sum(map(mul, row, column)) for column in columns] for row in left]
+
+    result = [[0] * len(columns) for _ in left]
+    for row_start in range(0, len(left), block_size):
+        row_block = range(row_start, min(row_start + block_size, len(left)))
+        for column_start in range(0, len(columns), block_size):
+            column_block = columns[column_start:column_start + block_size]
+            for i in row_block:
+                row = left[i]
+                result[i][column_start:column_start + block_size] = [sum(map(mul, row, column)) for column in column_block]
+    return result
+
+
+def is_homogeneous(rows):
+    cell_type = type(rows[0][0])
+    if cell_type is not int and cell_type is not float:
+        return False
+    return all(type(cell) is cell_type for row in rows for cell in row)
+
+
+def strassen(left, right, threshold):
+    rows_count, inner, columns_count = len(left), len(right), len(right[0])
+    if min(rows_count, inner, columns_count) < threshold:
+        return blocked(left, right, BLOCK_SIZE)
+
+    # Odd dimensions are padded with a zero row or column, removed from the result again
+    left = pad(left, rows_count + rows_count % 2, inner + inner % 2)
+    right = pad(right, inner + inner % 2, columns_count + columns_count % 2)
+
+    a11, a12, a21, a22 = split(left)
+    b11, b12, b21, b22 = split(right)
+
+    p1 = strassen(add_matrices(a11, a22), add_matrices(b11, b22), threshold)
+    p2 = strassen(add_matrices(a21, a22), b11, threshold)
+    p3 = strassen(a11, subtract_matrices(b12, b22), threshold)
+    p4 = strassen(a22, subtract_matrices(b21, b11), threshold)
+    p5 = strassen(add_matrices(a11, a12), b22, threshold)
+    p6 = strassen(subtract_matrices(a21, a11), add_matrices(b11, b12), threshold)
+    p7 = strassen(subtract_matrices(a12, a22), add_matrices(b21, b22), threshold)
+
+    c11 = add_matrices(subtract_matrices(add_matrices(p1, p4), p5), p7)
+    c12 = add_matrices(p3, p5)
+    c21 = add_matrices(p2, p4)
+    c22 = add_matrices(subtract_matrices(add_matrices(p1, p3), p2), p6)
+
+    top = [row1 + row2 for row1, row2 in zip(c11, c12)]
+    bottom = [row1 + row2 for row1, row2 in zip(c21, c22)]
+    return [row[:columns_count] for row in (top + bottom)[:rows_count]]
+
+
+def pad(rows, rows_count, columns_count):
+    if len(rows) == rows_count and len(rows[0]) == columns_count:
+        return rows
+    zero = type(rows[0][0])()
+    padded = [row + [zero] * (columns_count - len(row)) for row in rows]
+    padded.extend([zero] * columns_count for _ in range(rows_count - len(rows)))
+    return padded
+
+
+def split(rows):
+    half_rows, half_columns = len(rows) // 2, len(rows[0]) // 2
+    top, bottom = rows[:half_rows], rows[half_rows:]
+    return ([row[:half_columns] for row in top], [row[half_columns:] for row in top],
+            [row[:half_columns] for row in bottom], [row[half_columns:] for row in bottom])
+
+
+def add_matrices(left, right):
+    return [list(map(add, row1, row2)) for row1, row2 in zip(left, right)]
+
+
+def subtract_matrices(left, right):
+    return [list(map(sub, row1, row2)) for row1, row2 in zip(left, right)]
@@ -0,0 +1,154 @@
+"""
+Optional NumPy storage for matrices of numbers.
+
+A matrix is kept in an ndarray only when all cells are ints or all are floats (a
+mixed matrix would print its ints as floats) and integer results cannot overflow
+int64. Everything else, strings, bools or nested matrices included, stays on
+Python lists.
+
+Integer results and elementwise float operations are exactly those of the list
+implementation. Float products and determinants may differ in the last bits:
+BLAS adds the terms of a product in another order than the tiled and Strassen
+kernels, and numpy.linalg.det is not the LU factorization of Decomposition.
+
+Without NumPy installed, or with NEO_NUMPY=0 in the environment, every function
+here returns None and the list implementation is used.
+"""
+import os
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+enabled = numpy is not None and os.environ.get("NEO_NUMPY", "1") != "0"
+
+# For smaller matrices the conversion costs more than the Python loops it replaces
+MIN_ARRAY_CELLS = 64
+
+# Bound on the magnitude of integer results, Python ints never overflow but int64 does
+INT64_LIMIT = 2 ** 62
+
+
+def is_number(value):
+    return type(value) is int or type(value) is float
+
+
+def magnitude(operand):
+    # Largest absolute value an integer operand can have, 0 for floats which do not overflow
+    if type(operand) is int:
+        return abs(operand)
+    if isinstance(operand, numpy.ndarray) and operand.dtype.kind == 'i':
+        return max(int(operand.max()), -int(operand.min()))
+    return 0
+
+
+def to_array(rows):
+    if not enabled or len(rows) * len(rows[0]) < MIN_ARRAY_CELLS:
+        return None
+
+    cell_type = type(rows[0][0])
+    if cell_type is not int and cell_type is not float:
+        return None
+    for row in rows:
+        for cell in row:
+            if type(cell) is not cell_type:
+                return None
+
+    try:
+        array = numpy.array(rows, dtype=numpy.int64 if cell_type is int else numpy.float64)
+    except OverflowError:
+        return None
+    if magnitude(array) >= INT64_LIMIT:
+        return None
+    return array
+
+
+def from_cells(cells, stride):
+    """ndarray of the cells of a matrix in flat storage (see FlatStorage), None when it stays there"""
+    if not enabled or len(cells) < MIN_ARRAY_CELLS:
+        return None
+    array = numpy.frombuffer(cells, dtype=numpy.int64 if cells.typecode == 'q' else numpy.float64)
+    if magnitude(array) >= INT64_LIMIT:
+        return None
+    return array.reshape(-1, stride).copy()
+
+
+def operand_array(matrix_or_scalar):
+    # Matrices are converted through Matrix.as_array(), scalars are used as they are
+    if is_number(matrix_or_scalar):
+        return matrix_or_scalar
+    return matrix_or_scalar.as_array() if hasattr(matrix_or_scalar, "as_array") else None
+
+
+def add(left, right):
+    if left is None or right is None or not same_shape(left, right):
+        return None
+    if magnitude(left) + magnitude(right) >= INT64_LIMIT:
+        return None
+    return left + right
+
+
+def subtract(left, right):
+    if left is None or right is None or not same_shape(left, right):
+        return None
+    if magnitude(left) + magnitude(right) >= INT64_LIMIT:
+        return None
+    return left - right
+
+
+def reflected_subtract(array, scalar):
+    # scalar - array, -(array - scalar) would turn the zeros of the float result into -0.0
+    if array is None or not is_number(scalar):
+        return None
+    if magnitude(array) + magnitude(scalar) >= INT64_LIMIT:
+        return None
+    return scalar - array
+
+
+def scale(array, scalar):
+    if array is None or not is_number(scalar):
+        return None
+    if magnitude(array) * magnitude(scalar) >= INT64_LIMIT:
+        return None
+    return array * scalar
+
+
+def matmul(left, right):
+    if left is None or right is None or left.shape[1] != right.shape[0]:
+        return None
+    if left.shape[1] * magnitude(left) * magnitude(right) >= INT64_LIMIT:
+        return None
+    return left @ right
+
+
+def negative(array):
+    return None if array is None else -array
+
+
+def transpose(array):
+    # A view with swapped strides, the matrices sharing it copy it before a store
+    return None if array is None else array.T
+
+
+def equal(left, right):
+    return bool(numpy.array_equal(left, right))
+
+
+def same_shape(left, right):
+    return not isinstance(right, numpy.ndarray) or left.shape == right.shape
+
+
+def can_store(array, value):
+    """True when value, a number or an ndarray, is written into the array without changing what the cells hold"""
+    kind = array.dtype.kind
+    if isinstance(value, numpy.ndarray):
+        return value.dtype.kind == kind
+    return (kind == 'i' and type(value) is int and abs(value) < INT64_LIMIT) or (kind == 'f' and type(value) is float)
+
+
+def determinant(array):
+    # Integer matrices keep the exact Bareiss path of Decomposition
+    if array is None or array.dtype.kind != 'f':
+        return None
+    return float(numpy.linalg.det(array))
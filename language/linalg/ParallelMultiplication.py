@@ -0,0 +1,139 @@
+"""
+Opt-in parallel multiplication of large matrices of numbers on the list backend.
+
+The operands are copied into multiprocessing.shared_memory once, the left one as
+it is and the right one transposed, so every cell of the product is a dot product
+of two contiguous runs of cells. The product is split into row blocks (column
+blocks when it has fewer rows than workers) computed by a process pool which is
+started on the first parallel product and kept for the following ones. Workers
+get the names of the shared blocks and the ranges to compute, they write their
+cells straight into the shared output, so no matrix is pickled.
+
+Each dot product adds its terms from left to right starting at 0, the results
+equal those of the textbook triple loop (for floats they can differ in the last
+bits from the Strassen recursion of Multiplication). An int product which does
+not fit int64 is computed again by Multiplication with Python ints.
+
+Disabled by default. NEO_MATMUL_WORKERS in the environment, or --matmul-workers,
+sets the number of worker processes, NEO_PARALLEL_THRESHOLD or
+--parallel-threshold the smallest dimension of a product run in parallel.
+"""
+import atexit
+import multiprocessing
+import os
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+from operator import mul
+
+# Worker processes, 0 (the default) multiplies in the calling process
+workers = int(os.environ.get("NEO_MATMUL_WORKERS", 0))
+
+# Smallest dimension (rows, inner, columns) of a product computed by the pool,
+# below it starting the tasks costs more than the work they share
+threshold = int(os.environ.get("NEO_PARALLEL_THRESHOLD", 128))
+
+# Every worker gets a few blocks, so one slower block does not keep the others waiting
+BLOCKS_PER_WORKER = 4
+
+ITEM_SIZE = 8
+
+pool = None
+pool_size = 0
+
+
+def applies(rows_count, inner, columns_count):
+    return workers > 1 and min(rows_count, inner, columns_count) >= threshold
+
+
+def get_pool():
+    global pool, pool_size
+    if pool is None or pool_size != workers:
+        close_pool()
+        # Forked workers use the tracker of this process for the shared blocks they open,
+        # each would start its own otherwise and report the blocks as leaked at exit
+        resource_tracker.ensure_running()
+        pool = multiprocessing.Pool(workers)
+        pool_size = workers
+    return pool
+
+
+def close_pool():
+    global pool
+    if pool is not None:
+        pool.close()
+        pool.join()
+        pool = None
+
+
+atexit.register(close_pool)
+
+
+def split(rows_count, columns_count):
+    """(row_start, row_stop, column_start, column_stop) blocks covering the product"""
+    count = workers * BLOCKS_PER_WORKER
+    if rows_count >= workers:
+        step = -(-rows_count // count)
+        return [(start, min(start + step, rows_count), 0, columns_count) for start in range(0, rows_count, step)]
+    step = -(-columns_count // count)
+    return [(0, rows_count, start, min(start + step, columns_count)) for start in range(0, columns_count, step)]
+
+
+def to_shared(cells):
+    block = shared_memory.SharedMemory(create=True, size=max(len(cells), 1) * ITEM_SIZE)
+    view = block.buf.cast(cells.typecode)
+    view[:len(cells)] = cells
+    view.release()
+    return block
+
+
+def multiply(left, right, rows_count, inner, columns_count):
+    """
+    Product of the flat cells (see FlatStorage) of a rows_count x inner and an
+    inner x columns_count matrix, as cells of the product. None when it has to be
+    computed by Multiplication.
+    """
+    typecode = 'q' if left.typecode == right.typecode == 'q' else 'd'
+    # Column j of right becomes the contiguous run j * inner ... (j + 1) * inner
+    right_columns = array(right.typecode)
+    for j in range(columns_count):
+        right_columns.extend(right[j::columns_count])
+
+    blocks = []
+    try:
+        blocks.append(to_shared(left))
+        blocks.append(to_shared(right_columns))
+        blocks.append(shared_memory.SharedMemory(create=True, size=rows_count * columns_count * ITEM_SIZE))
+        names = tuple(block.name for block in blocks)
+        tasks = [(names, (left.typecode, right.typecode, typecode), inner, columns_count, part)
+                 for part in split(rows_count, columns_count)]
+        if not all(get_pool().map(compute_block, tasks)):
+            return None
+        result = array(typecode)
+        result.frombytes(blocks[2].buf[:rows_count * columns_count * ITEM_SIZE])
+        return result
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def compute_block(task):
+    """Runs in a worker: writes one block of the product, False when an int cell does not fit int64"""
+    names, typecodes, inner, columns_count, (row_start, row_stop, column_start, column_stop) = task
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    views = [block.buf.cast(typecode) for block, typecode in zip(blocks, typecodes)]
+    try:
+        left, right_columns, output = views
+        columns = [right_columns[j * inner:(j + 1) * inner].tolist() for j in range(column_start, column_stop)]
+        for i in range(row_start, row_stop):
+            row = left[i * inner:(i + 1) * inner].tolist()
+            cells = array(typecodes[2], [sum(map(mul, row, column)) for column in columns])
+            output[i * columns_count + column_start:i * columns_count + column_stop] = cells
+        return True
+    except OverflowError:
+        return False
+    finally:
+        for view in views:
+            view.release()
+        for block in blocks:
+            block.close()
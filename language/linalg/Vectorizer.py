@@ -0,0 +1,121 @@
+"""
+Elementwise kernels of Neo functions whose body is one arithmetic expression.
+
+A function like func(x) { return x * 2 + 1 } passed to map would be called once
+per cell. When its body is a single return of an expression made only of its
+one parameter, number literals, unary minus and the operators + - * / // ^,
+the expression is compiled into Python source instead:
+
+    [((x * s0) + s1) for x in cells]
+
+and, for an ndarray of floats, the same expression is evaluated once on the whole
+array. Kernels are generated once per expression shape and cached, like those of
+Fusion. Literals are passed as arguments, so x * 2 and x * 3 share a kernel.
+
+Cells are combined with the same Python operators the interpreter uses, results
+are equal. Whenever the kernel fails (division by zero, overflow of a power, an
+invalid float operation in NumPy) the caller calls the function cell by cell, so
+errors are reported by the interpreter as usual.
+"""
+from language.nodes.Expressions import BinaryOperator, Constant, Identifier, Scalar, UnaryOperator
+from language.nodes.Instructions import Return
+from language.nodes.OperatorType import OperatorType
+from language.linalg import NumpyBackend
+
+operators = {
+    OperatorType.PLUS: '+',
+    OperatorType.MINUS: '-',
+    OperatorType.MULTIPLY: '*',
+    OperatorType.DIVIDE: '/',
+    OperatorType.DIVIDE_INTEGER: '//',
+    OperatorType.POWER: '**',
+}
+
+# (generated expression, number of literals) -> (cells kernel, array kernel)
+kernels = {}
+
+
+class Kernel:
+    __slots__ = ("cells_kernel", "array_kernel", "scalars")
+
+    def __init__(self, cells_kernel, array_kernel, scalars):
+        self.cells_kernel = cells_kernel
+        self.array_kernel = array_kernel
+        self.scalars = scalars
+
+    def map_cells(self, cells):
+        """Results for a list of numbers, None when the function has to be called cell by cell"""
+        try:
+            return self.cells_kernel(cells, *self.scalars)
+        except (ArithmeticError, TypeError, ValueError):
+            return None
+
+    def map_array(self, array):
+        """Results for an ndarray of floats, None when the function has to be called cell by cell"""
+        numpy = NumpyBackend.numpy
+        if array.dtype != numpy.float64:
+            return None
+        try:
+            # Python gives 0 on underflow, any other float error makes the function run cell by cell
+            with numpy.errstate(all='raise', under='ignore'):
+                result = self.array_kernel(array, *self.scalars)
+        except (ArithmeticError, TypeError, ValueError):
+            return None
+        if not isinstance(result, numpy.ndarray) or result.dtype != numpy.float64 or result.shape != array.shape:
+            return None
+        return result
+
+
+def generate(expression, parameter, scalars):
+    """Python expression computing one cell, None when the expression is not supported"""
+    if isinstance(expression, Identifier):
+        return 'x' if expression.value == parameter else None
+    if isinstance(expression, (Scalar, Constant)):
+        if type(expression.value) is not int and type(expression.value) is not float:
+            return None
+        scalars.append(expression.value)
+        return f's{len(scalars) - 1}'
+    if isinstance(expression, UnaryOperator):
+        if expression.op != OperatorType.MINUS:
+            return None
+        operand = generate(expression.rvalue, parameter, scalars)
+        return None if operand is None else f'(-{operand})'
+    if isinstance(expression, BinaryOperator):
+        operator = operators.get(expression.op)
+        if operator is None:
+            return None
+        left = generate(expression.lvalue, parameter, scalars)
+        right = generate(expression.rvalue, parameter, scalars) if left is not None else None
+        return None if right is None else f'({left} {operator} {right})'
+    return None
+
+
+def compile_kernels(cell, scalars_count):
+    parameters = ''.join(f', s{i}' for i in range(scalars_count))
+    source = (f'def cells_kernel(cells{parameters}):\n'
+              f'    return [{cell} for x in cells]\n'
+              f'def array_kernel(x{parameters}):\n'
+              f'    return {cell}\n')
+    namespace = {}
+    exec(compile(source, '<elementwise function kernel>', 'exec'), namespace)
+    return namespace['cells_kernel'], namespace['array_kernel']
+
+
+def kernel_of(function):
+    """Kernel of the Function node, None when its body is not one arithmetic expression of its parameter"""
+    instructions = function.block.instructions
+    if len(function.parameter_list) != 1 or len(instructions) != 1:
+        return None
+    instruction = instructions[0]
+    if not isinstance(instruction, Return) or instruction.expression is None:
+        return None
+
+    scalars = []
+    cell = generate(instruction.expression, function.parameter_list[0].value, scalars)
+    if cell is None:
+        return None
+    key = (cell, len(scalars))
+    compiled = kernels.get(key)
+    if compiled is None:
+        compiled = kernels[key] = compile_kernels(*key)
+    return Kernel(*compiled, scalars)
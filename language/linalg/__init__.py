@@ -0,0 +1 @@
+# Linalg Package
@@ -1,14 +1,30 @@
-from .interpreter.Interpreter import Interpreter
-from .lexer.Lexer import Lexer
+from .interpreter.Interpreter import Interpreter, engines
+from .lexer.Lexer import Lexer, engines as lexer_engines
 from .parser.Parser import Parser
 from .lexer.Source import SourceFile, SourceString
+from .compiler.Compiler import Compiler
+from .compiler.Disassembler import disassemble
+from .optimizer.Optimizer import Optimizer
+from .linalg import ParallelMultiplication
 
 import argparse
 
 parser = argparse.ArgumentParser()
 parser.add_argument("filename", nargs="?", help="Pass path to Neo program to interpret (optional)", type=str)
+parser.add_argument("--engine", choices=engines, default="tree", help="Execution engine used to run the program (default: tree)")
+parser.add_argument("--lexer", choices=lexer_engines, default="hand", help="Lexer engine turning the source into tokens (default: hand)")
+parser.add_argument("--dis", action="store_true", help="Print the bytecode the program compiles to instead of running it")
+parser.add_argument("--no-optimize", action="store_true", help="Run the program as parsed, without constant folding and dead branch removal")
+parser.add_argument("--dump-ast", action="store_true", help="Print the optimized AST and the number of removed nodes instead of running the program")
+parser.add_argument("--matmul-workers", type=int, help="Processes multiplying large matrices in parallel, 0 turns it off (default: NEO_MATMUL_WORKERS or 0)")
+parser.add_argument("--parallel-threshold", type=int, help="Smallest dimension of a product multiplied in parallel (default: NEO_PARALLEL_THRESHOLD or 128)")
 args = parser.parse_args()
 
+if args.matmul_workers is not None:
+    ParallelMultiplication.workers = args.matmul_workers
+if args.parallel_threshold is not None:
+    ParallelMultiplication.threshold = args.parallel_threshold
+
 # Default source string if no filename provided
 source_string = """
 func greet(name) {
@@ -23,10 +39,21 @@ if args.filename:
     source = SourceFile(args.filename)
 else:
     source = SourceString(source_string)
-lexer = Lexer(source)
+lexer = Lexer(source, engine=args.lexer)
 parser = Parser(lexer)
 
 parsed_program = parser.parse_program()
-interpreter = Interpreter(parsed_program)
 
-interpreter.run()
\ No newline at end of file
+optimizer = Optimizer()
+if not args.no_optimize:
+    optimizer.optimize_program(parsed_program)
+
+if args.dump_ast:
+    for top_level_object in parsed_program.toplevel_objects:
+        print(top_level_object)
+    print(f"Removed nodes: {optimizer.removed_nodes}")
+elif args.dis:
+    print(disassemble(Compiler().compile_program(parsed_program)))
+else:
+    interpreter = Interpreter(parsed_program, args.engine)
+    interpreter.run()
\ No newline at end of file
@@ -1,6 +1,8 @@
 from language.nodes.Node import Node
 
 class Access(Node):
+    __slots__ = ("identifier", "first", "second")
+
     def __init__(self, identifier, first, second, line=None, column=None):
         super().__init__(line, column)
         self.identifier = identifier
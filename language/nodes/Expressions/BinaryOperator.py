@@ -1,6 +1,8 @@
 from language.nodes.Node import Node
 
 class BinaryOperator(Node):
+    __slots__ = ("lvalue", "op", "rvalue")
+
     def __init__(self, lvalue, op, rvalue, line=None, column=None):
         super().__init__(line, column)
         self.lvalue = lvalue
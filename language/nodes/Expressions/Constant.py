@@ -0,0 +1,20 @@
+from language.nodes.Node import Node
+
+class Constant(Node):
+    """
+    Value computed before the program is run, e.g. a matrix literal made only of
+    constants. A matrix value is a frozen prototype, every evaluation yields a
+    copy-on-write matrix sharing its rows.
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value, line=None, column=None):
+        super().__init__(line, column)
+        self.value = value
+
+    def __repr__(self):
+        value = repr(self.value).replace('\n', ' ')
+        return f'{self.__class__.__name__}: {value}'
+
+    def accept(self, visitor):
+        return visitor.visit_constant(self)
@@ -1,9 +1,17 @@
 from language.nodes.Node import Node
 
 class Identifier(Node):
+    __slots__ = ("value", "depth", "slot", "builtin", "shadowed")
+
     def __init__(self, string, line=None, column=None):
         super().__init__(line, column)
         self.value = string
+        # Filled in by the Resolver
+        self.depth = None
+        self.slot = None
+        self.builtin = False
+        # (depth, slot) of the outer variables of the same name, set for called names only
+        self.shadowed = ()
 
     def __repr__(self):
         return f'{self.value}'
@@ -0,0 +1,111 @@
+from language.nodes.Expressions.Matrix import Matrix, rows_slot
+from language.nodes.Expressions.SparseMatrix import SparseMatrix
+from language.linalg import Fusion
+
+
+class LazyMatrix(Matrix):
+    """
+    Result of an elementwise operation on list matrices of numbers, kept as a Fusion
+    expression until its cells are needed. Every code path of Matrix reaches the cells
+    through _rows, so reading them (print, access, a property, a matrix product,
+    a store) evaluates the whole expression in one pass. The shape is known without it.
+    """
+    __slots__ = ("expression", "shape", "operations")
+
+    def __init__(self, expression, shape, operations, line=None, column=None):
+        super().__init__(None, line, column)
+        self.expression = expression
+        self.shape = shape
+        # Number of operators in the expression
+        self.operations = operations
+        # The expression combines numbers with +, - and *, so its cells are numbers
+        self.numeric_version = self.version
+
+    @property
+    def _rows(self):
+        if self.expression is not None:
+            rows_slot.__set__(self, Fusion.evaluate(self.expression))
+            self.expression = None
+        return rows_slot.__get__(self)
+
+    @_rows.setter
+    def _rows(self, rows):
+        self.expression = None
+        rows_slot.__set__(self, rows)
+
+    def as_array(self):
+        # A pending expression is a list matrix, converting it would evaluate it
+        if self.expression is not None:
+            return None
+        return super().as_array()
+
+    def rowlen(self):
+        return self.shape[0]
+
+    def collen(self):
+        return self.shape[1]
+
+    @staticmethod
+    def fuse(operator, left, right):
+        """
+        Returns the LazyMatrix of left operator right, where one of the operands is a
+        matrix, or None when the operation has to be computed eagerly.
+        """
+        if not Fusion.enabled:
+            return None
+        matrix = left if isinstance(left, Matrix) else right
+        shape = (matrix.rowlen(), matrix.collen())
+        if shape[0] * shape[1] < Fusion.MIN_FUSED_CELLS:
+            return None
+
+        operands = []
+        for operand in (left, right):
+            if isinstance(operand, Matrix):
+                if isinstance(operand, SparseMatrix) or (operand.rowlen(), operand.collen()) != shape:
+                    return None
+            elif type(operand) is not int and type(operand) is not float:
+                return None
+            operands.append(operand)
+
+        operations = 1 + sum(operand.operations for operand in operands if LazyMatrix.is_pending(operand))
+        extend = operations <= Fusion.MAX_FUSED_OPERATIONS
+        if not extend:
+            # The operands are evaluated and become the leaves of a new expression
+            operations = 1
+
+        expressions = []
+        for operand in operands:
+            expression = LazyMatrix.expression_of(operand, extend)
+            if expression is None:
+                return None
+            expressions.append(expression)
+        return LazyMatrix((operator, *expressions), shape, operations, matrix.line, matrix.column)
+
+    @staticmethod
+    def negate(matrix):
+        if not Fusion.enabled or matrix.rowlen() * matrix.collen() < Fusion.MIN_FUSED_CELLS:
+            return None
+        operations = matrix.operations + 1 if LazyMatrix.is_pending(matrix) else 1
+        extend = operations <= Fusion.MAX_FUSED_OPERATIONS
+        if not extend:
+            operations = 1
+        expression = LazyMatrix.expression_of(matrix, extend)
+        if expression is None:
+            return None
+        return LazyMatrix(('neg', expression), (matrix.rowlen(), matrix.collen()), operations, matrix.line, matrix.column)
+
+    @staticmethod
+    def is_pending(value):
+        return isinstance(value, LazyMatrix) and value.expression is not None
+
+    @staticmethod
+    def expression_of(operand, extend):
+        if not isinstance(operand, Matrix):
+            return ('scalar', operand)
+        if extend and LazyMatrix.is_pending(operand):
+            return operand.expression
+        if not operand.holds_only_numbers():
+            return None
+        # The expression keeps the rows as they are now, the operand copies them before its next store
+        operand.shared = True
+        return ('rows', operand.rows)
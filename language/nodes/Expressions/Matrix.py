@@ -1,16 +1,163 @@
+import os
+import operator
 from language.nodes.Node import Node
+from language.nodes.Expressions.Scalar import Scalar
+from language.nodes.Expressions.Bool import Bool
+from language.nodes.Expressions.String import String
 from language.errors.InterpreterExceptions import NeoRuntimeError
+from language.linalg import Decomposition, FlatStorage, Fusion, Multiplication, NumpyBackend, ParallelMultiplication
 
 class Matrix(Node):
+    __slots__ = ("_rows", "array", "cells", "stride", "shared", "nested", "power_squares", "factorization",
+                 "version", "property_cache", "numeric_version")
+
+    # Keep the squares computed by M ^ n, so further powers of the unchanged matrix reuse them
+    cache_powers = os.environ.get("NEO_POWER_CACHE", "1") != "0"
+    # Most property results kept by one matrix, the least recently computed one is dropped first
+    max_cached_properties = 4
+
+    # m.name -> function of the matrix returning the property
+    properties = {
+        'det': lambda matrix: matrix.cached('det', matrix.determinant),
+        'rowlen': lambda matrix: matrix.cached('rowlen', matrix.rowlen),
+        'collen': lambda matrix: matrix.cached('collen', matrix.collen),
+        'transposed': lambda matrix: matrix.transposed(),
+        'copy': lambda matrix: matrix.copy(),
+    }
+
     def __init__(self, rows, line=None, column=None):
         super().__init__(line, column)
-        self.rows = rows
-        self.properties = {}
-        self.properties['det'] = self.determinant
-        self.properties['rowlen'] = self.rowlen
-        self.properties['collen'] = self.collen
-        self.properties['transposed'] = self.transposed
-        self.properties['copy'] = self.copy
+        self._rows = rows
+        # NumPy storage of a matrix of numbers, see NumpyBackend. When set, rows are built from it on demand
+        self.array = None
+        # Flat array.array storage of a matrix of numbers with stride cells per row, see FlatStorage.
+        # When set, rows are built from it on demand
+        self.cells = None
+        self.stride = None
+        # rows belong to a prototype and are copied before the first modification
+        self.shared = False
+        # Set by freeze() when the prototype holds matrices, they are shared one by one
+        self.nested = False
+        # M, M^2, M^4, ... computed by __pow__, dropped when the matrix is modified
+        self.power_squares = None
+        # LU factors of the cells shared by det and the linear algebra builtins, dropped when the matrix is modified
+        self.factorization = None
+        # Incremented by every modification, cached property results are valid for one version
+        self.version = 0
+        # property name -> (version, result), created by the first cached property
+        self.property_cache = None
+        # Version at which all cells were found to be numbers, see holds_only_numbers()
+        self.numeric_version = None
+
+    @staticmethod
+    def from_array(array, line=None, column=None):
+        matrix = Matrix(None, line, column)
+        matrix.array = array
+        return matrix
+
+    @staticmethod
+    def from_cells(cells, stride, line=None, column=None):
+        matrix = Matrix(None, line, column)
+        matrix.cells = cells
+        matrix.stride = stride
+        return matrix
+
+    @staticmethod
+    def from_rows(rows, line=None, column=None):
+        """Matrix of the rows of numbers, in flat storage when they are all ints or all floats"""
+        cells = FlatStorage.to_cells(rows)
+        if cells is None:
+            return Matrix(rows, line, column)
+        return Matrix.from_cells(cells, len(rows[0]), line, column)
+
+    @staticmethod
+    def filled(rows_count, cols_count, value, line=None, column=None):
+        cells = FlatStorage.filled(value, rows_count * cols_count)
+        if cells is None:
+            return Matrix([[value] * cols_count for _ in range(rows_count)], line, column)
+        return Matrix.from_cells(cells, cols_count, line, column)
+
+    def cached(self, name, compute):
+        """
+        Returns compute(), computed once per version of the matrix. A matrix result
+        is kept frozen and handed out through share(), the program can modify what
+        it gets. Results holding other matrices are not cached, they would have to
+        be copied anyway.
+        """
+        if self.property_cache is None:
+            self.property_cache = {}
+        entry = self.property_cache.get(name)
+        if entry is not None and entry[0] == self.version:
+            result = entry[1]
+            return result.share() if isinstance(result, Matrix) else result
+
+        result = compute()
+        if isinstance(result, Matrix):
+            if result.holds_matrices():
+                return result
+            result.freeze()
+        self.property_cache.pop(name, None)
+        if len(self.property_cache) >= Matrix.max_cached_properties:
+            del self.property_cache[next(iter(self.property_cache))]
+        self.property_cache[name] = (self.version, result)
+        return result.share() if isinstance(result, Matrix) else result
+
+    def holds_only_numbers(self):
+        if self.cells is not None:
+            return True
+        if self.numeric_version != self.version:
+            if not Fusion.is_numeric(self.rows):
+                return False
+            self.numeric_version = self.version
+        return True
+
+    def holds_matrices(self):
+        if self.array is not None or self.cells is not None:
+            return False
+        return any(isinstance(cell, Matrix) for row in self._rows for cell in row)
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            if self.array is not None:
+                self._rows = self.array.tolist()
+            else:
+                self._rows = FlatStorage.to_rows(self.cells, self.stride)
+        return self._rows
+
+    @rows.setter
+    def rows(self, rows):
+        self._rows = rows
+        self.array = None
+        self.cells = None
+        self.power_squares = None
+        self.factorization = None
+        self.version += 1
+
+    def as_array(self):
+        """Returns the cells as an ndarray, None if the matrix has to stay on lists"""
+        if self.array is None:
+            if self.cells is None:
+                self.array = NumpyBackend.to_array(self._rows)
+            else:
+                self.array = NumpyBackend.from_cells(self.cells, self.stride)
+                if self.array is not None:
+                    # The array takes over the storage
+                    self.cells = None
+        return self.array
+
+    def flat_operation(self, operator, other, reflected=False):
+        """self operator other (other operator self when reflected) in flat storage, None when it does not apply"""
+        if self.cells is None:
+            return None
+        if isinstance(other, Matrix):
+            if other.cells is None or other.stride != self.stride or len(other.cells) != len(self.cells):
+                return None
+            other = other.cells
+        cells = FlatStorage.combine(operator, other, self.cells) if reflected else FlatStorage.combine(operator, self.cells, other)
+        if cells is None:
+            return None
+        return Matrix.from_cells(cells, self.stride, self.line, self.column)
 
     
     """
@@ -76,12 +223,21 @@ class Matrix(Node):
         return visitor.visit_matrix(self)
 
     def __bool__(self):
+        if self.array is not None:
+            return bool(self.array.any())
+        if self.cells is not None:
+            return any(self.cells)
         return not all(all(num == 0 for num in row) for row in self.rows)
 
     def __eq__(self, other):
         if not isinstance(other, Matrix):
             return False
-        if self.properties["rowlen"]() != other.properties["rowlen"]() or self.properties["collen"]() != other.properties["collen"]():
+        left, right = self.as_array(), other.as_array()
+        if left is not None and right is not None:
+            return NumpyBackend.equal(left, right)
+        if self.cells is not None and other.cells is not None:
+            return self.stride == other.stride and self.cells == other.cells
+        if self.rowlen() != other.rowlen() or self.collen() != other.collen():
             return False       
         for row1, row2 in zip(self.rows, other.rows):
             for elem1, elem2 in zip(row1, row2):
@@ -90,6 +246,17 @@ class Matrix(Node):
         return True 
 
     def __neg__(self):
+        array = NumpyBackend.negative(self.as_array())
+        if array is not None:
+            return Matrix.from_array(array, self.line, self.column)
+        if self.cells is not None:
+            cells = FlatStorage.negative(self.cells)
+            if cells is not None:
+                return Matrix.from_cells(cells, self.stride, self.line, self.column)
+        fused = LazyMatrix.negate(self)
+        if fused is not None:
+            return fused
+
         result = []
         for row in self.rows:
             new_row = []
@@ -99,19 +266,32 @@ class Matrix(Node):
         return Matrix(result, self.line, self.column)
 
     def __mul__(self, other):
+        if isinstance(other, Matrix):
+            array = NumpyBackend.matmul(self.as_array(), other.as_array())
+        else:
+            array = NumpyBackend.scale(self.as_array(), other)
+        if array is not None:
+            return Matrix.from_array(array, self.line, self.column)
+        if not isinstance(other, Matrix):
+            flat = self.flat_operation(operator.mul, other)
+            if flat is not None:
+                return flat
+            fused = LazyMatrix.fuse('*', self, other)
+            if fused is not None:
+                return fused
+
         result = []
         if isinstance(other, Matrix):
-            x_rows = len(self.rows)
             x_cols = len(self.rows[0])
             y_rows = len(other.rows)
-            y_cols = len(other.rows[0])
             if x_cols != y_rows:
                 raise NeoRuntimeError("Wrong shapes of matrixes. Cannot multiply", self.line, self.column)
-            result = [[0 for _ in range(y_cols)] for _ in range(x_rows)]
-            for i in range(x_rows):
-                for j in range(y_cols):
-                    for k in range(y_rows):
-                        result[i][j] += self.rows[i][k] * other.rows[k][j]
+            product = self.parallel_product(other)
+            if product is not None:
+                return product
+            result = Multiplication.multiply(self.rows, other.rows)
+            if self.cells is not None and other.cells is not None:
+                return Matrix.from_rows(result, self.line, self.column)
         elif isinstance(other, (int, float)):
             for row in self.rows:
                 new_row = []
@@ -125,26 +305,67 @@ class Matrix(Node):
     def __rmul__(self, other):
         return self.__mul__(other)
 
+    def parallel_product(self, other):
+        """self * other computed by the process pool, None when it does not apply (see ParallelMultiplication)"""
+        rows_count, inner, columns_count = self.rowlen(), self.collen(), other.collen()
+        if not ParallelMultiplication.applies(rows_count, inner, columns_count):
+            return None
+        left = self.cells if self.cells is not None else FlatStorage.to_cells(self.rows)
+        right = other.cells if other.cells is not None else FlatStorage.to_cells(other.rows)
+        if left is None or right is None:
+            return None
+        cells = ParallelMultiplication.multiply(left, right, rows_count, inner, columns_count)
+        if cells is None:
+            return None
+        return Matrix.from_cells(cells, columns_count, self.line, self.column)
+
     def __pow__(self, other):
         if not isinstance(other, (int, float)) or other < 0:
             raise NeoRuntimeError("Matrix power can only be calculated for non-negative numbers", self.line, self.column)
 
-        n = len(self.rows)
-        if n != len(self.rows[0]):
+        n = self.rowlen()
+        if n != self.collen():
             raise NeoRuntimeError("Only square matrices can be raised to a power", self.line, self.column)
         if other == 0:
             # Identity matrix for 0 power
             return Matrix([[1.0 if i == j else 0.0 for j in range(n)] for i in range(n)], self.line, self.column)
 
-        result = Matrix([row[:] for row in self.rows], self.line, self.column)
-        for _ in range(int(other) - 1):
-            result = result * self
+        # Exponentiation by squaring: M^n is the product of the squares M^(2^i) for the bits set in n
+        exponent = int(other)
+        squares = self.power_squares or [self]
+        result = None
+        bit = 0
+        while exponent:
+            if bit == len(squares):
+                squares.append((squares[-1] * squares[-1]).freeze())
+            if exponent & 1:
+                result = squares[bit] if result is None else result * squares[bit]
+            exponent >>= 1
+            bit += 1
+
+        if Matrix.cache_powers:
+            self.power_squares = squares
+        # A square itself is never handed out, the program could modify it
+        if result is self:
+            return self.copy()
+        if any(result is square for square in squares):
+            return result.share()
         return result
 
     def __add__(self, other):
+        array = NumpyBackend.add(self.as_array(), NumpyBackend.operand_array(other))
+        if array is not None:
+            return Matrix.from_array(array, self.line, self.column)
+        flat = self.flat_operation(operator.add, other)
+        if flat is not None:
+            return flat
+        fused = LazyMatrix.fuse('+', self, other)
+        if fused is not None:
+            return fused
+
         result = []
         if isinstance(other, Matrix):
-            if self.properties["rowlen"]() != other.properties["rowlen"]() or self.properties["collen"]() != other.properties["collen"]():
+            if self.rowlen() != other.rowlen() or self.collen() != other.collen():
                 raise NeoRuntimeError("Matrixes must have the same shape", self.line, self.column)
             for row1, row2 in zip(self.rows, other.rows):
                 new_row = []
@@ -165,9 +386,19 @@ class Matrix(Node):
         return self.__add__(other)
 
     def __sub__(self, other):
+        array = NumpyBackend.subtract(self.as_array(), NumpyBackend.operand_array(other))
+        if array is not None:
+            return Matrix.from_array(array, self.line, self.column)
+        flat = self.flat_operation(operator.sub, other)
+        if flat is not None:
+            return flat
+        fused = LazyMatrix.fuse('-', self, other)
+        if fused is not None:
+            return fused
+
         result = []
         if isinstance(other, Matrix):
-            if self.properties["rowlen"]() != other.properties["rowlen"]() or self.properties["collen"]() != other.properties["collen"]():
+            if self.rowlen() != other.rowlen() or self.collen() != other.collen():
                 raise NeoRuntimeError("Matrixes must have the same shape", self.line, self.column)
             for row1, row2 in zip(self.rows, other.rows):
                 new_row = []
@@ -185,9 +416,20 @@ class Matrix(Node):
         return Matrix(result, self.line, self.column)
 
     def __rsub__(self, other):
+        if NumpyBackend.is_number(other):
+            array = NumpyBackend.reflected_subtract(self.as_array(), other)
+            if array is not None:
+                return Matrix.from_array(array, self.line, self.column)
+        flat = self.flat_operation(operator.sub, other, reflected=True)
+        if flat is not None:
+            return flat
+        fused = LazyMatrix.fuse('-', other, self)
+        if fused is not None:
+            return fused
+
         result = []
         if isinstance(other, Matrix):
-            if self.properties["rowlen"]() != other.properties["rowlen"]() or self.properties["collen"]() != other.properties["collen"]():
+            if self.rowlen() != other.rowlen() or self.collen() != other.collen():
                 raise NeoRuntimeError("Matrixes must have the same shape", self.line, self.column)
             for row1, row2 in zip(self.rows, other.rows):
                 new_row = []
@@ -204,34 +446,240 @@ class Matrix(Node):
             raise NeoRuntimeError(f"You cannot substract 'Matrix' with '{other.__class__.__name__}'", self.line, self.column)
         return Matrix(result, self.line, self.column)
 
+    def build_prototype(self):
+        """
+        For a literal, whose rows hold the nodes of the cells: returns the frozen runtime
+        matrix when all cells are constants, None otherwise.
+        """
+        if not all(isinstance(cell, (Scalar, Bool, String)) for row in self.rows for cell in row):
+            return None
+        return Matrix.from_rows([[cell.value for cell in row] for row in self.rows], self.line, self.column).freeze()
+
+    def freeze(self):
+        """
+        Makes the matrix a prototype for share(). A prototype is never handed out
+        to the program itself, so its rows are not modified.
+        """
+        if self._rows is None:
+            # Stored in an array, which holds only numbers
+            return self
+        for row in self.rows:
+            for cell in row:
+                if isinstance(cell, Matrix):
+                    cell.freeze()
+                    self.nested = True
+        return self
+
+    def share(self):
+        """Returns a new matrix using the rows of the prototype until it is modified (copy-on-write)"""
+        if self.nested:
+            # A nested matrix can be taken out and modified, so the rows holding it are never shared
+            rows = [[cell.share() if isinstance(cell, Matrix) else cell for cell in row] for row in self.rows]
+            return Matrix(rows, self.line, self.column)
+        matrix = self.storage_copy()
+        matrix.shared = True
+        return matrix
+
+    def load(self, first, second):
+        if isinstance(first, slice) or isinstance(second, slice):
+            return self.block(first, second)
+        if self.cells is not None:
+            return self.cells[self.cell_index(first, second)]
+        try:
+            return self.rows[first][second]
+        except IndexError:
+            raise NeoRuntimeError("Index out of matrix bounds", self.line, self.column)
+
+    def cell_index(self, first, second):
+        """Position of the cell in flat storage, negative indices count from the end as for lists"""
+        rows_count = len(self.cells) // self.stride
+        if not (-rows_count <= first < rows_count and -self.stride <= second < self.stride):
+            raise NeoRuntimeError("Index out of matrix bounds", self.line, self.column)
+        return first % rows_count * self.stride + second % self.stride
+
+    def store(self, first, second, value):
+        if isinstance(first, slice) or isinstance(second, slice):
+            self.store_block(first, second, value)
+            return
+        self.before_store()
+        try:
+            self.store_cell(first, second, value)
+        except IndexError:
+            raise NeoRuntimeError("Index out of matrix bounds", self.line, self.column)
+
+    def store_cell(self, first, second, value):
+        if self.array is not None:
+            # The array keeps a single cell type, any other value moves the matrix back to lists
+            if NumpyBackend.can_store(self.array, value):
+                self.array[first, second] = value
+                if self._rows is not None:
+                    self._rows[first][second] = value
+                return
+            self.rows = self.rows  # materializes the lists and drops the array
+
+        if self.cells is not None:
+            if FlatStorage.can_store(self.cells, value):
+                self.cells[self.cell_index(first, second)] = value
+                if self._rows is not None:
+                    self._rows[first][second] = value
+                return
+            self.rows = self.rows  # materializes the lists and drops the cells
+
+        self._rows[first][second] = value
+
+    def before_store(self):
+        """Drops the results computed from the cells and takes over the storage shared with other matrices"""
+        self.power_squares = None
+        self.factorization = None
+        self.version += 1
+        if self.shared:
+            if self._rows is not None:
+                self._rows = [row[:] for row in self._rows]
+            if self.array is not None:
+                self.array = self.array.copy()
+            if self.cells is not None:
+                self.cells = self.cells[:]
+            self.shared = False
+
+    def block_ranges(self, first, second):
+        """Ranges of the rows and of the columns selected by the indices, a whole number selects one"""
+        ranges = []
+        for index, length in ((first, self.rowlen()), (second, self.collen())):
+            if isinstance(index, slice):
+                selected = range(length)[index]
+                if not selected:
+                    raise NeoRuntimeError("Slice selects no cells", self.line, self.column)
+            else:
+                try:
+                    position = range(length)[index]
+                except IndexError:
+                    raise NeoRuntimeError("Index out of matrix bounds", self.line, self.column)
+                selected = range(position, position + 1)
+            ranges.append(selected)
+        return ranges
+
+    def block(self, first, second):
+        """m[first, second] with a slice, a view sharing the storage of the matrix (see copy())"""
+        rows_range, columns_range = self.block_ranges(first, second)
+        array = self.as_array()
+        if array is not None:
+            matrix = Matrix.from_array(array[rows_range.start:rows_range.stop, columns_range.start:columns_range.stop], self.line, self.column)
+        elif self.cells is not None:
+            # A copy of the block, which takes less than building the rows of the whole matrix for a view
+            cells = FlatStorage.block(self.cells, self.stride, rows_range, columns_range)
+            return Matrix.from_cells(cells, len(columns_range), self.line, self.column)
+        else:
+            matrix = SlicedMatrix(self.rows, rows_range, columns_range, self.line, self.column)
+        matrix.shared = self.shared = True
+        return matrix
+
+    def store_block(self, first, second, value):
+        """m[first, second] = value with a slice, value is a matrix of the shape of the block or a single cell for all of it"""
+        rows_range, columns_range = self.block_ranges(first, second)
+        if isinstance(value, Matrix):
+            if (value.rowlen(), value.collen()) != (len(rows_range), len(columns_range)):
+                raise NeoRuntimeError(f"Matrix of shape {len(rows_range)}x{len(columns_range)} expected", self.line, self.column)
+            if value is self:
+                value = value.copy()
+        self.before_store()
+        first_column, last_column = columns_range.start, columns_range.stop
+
+        if self.array is not None:
+            source = value.as_array() if isinstance(value, Matrix) else value
+            if source is not None and NumpyBackend.can_store(self.array, source):
+                self.array[rows_range.start:rows_range.stop, first_column:last_column] = source
+                self._rows = None
+                return
+            self.rows = self.rows
+
+        if self.cells is not None:
+            source = value.cells if isinstance(value, Matrix) else value
+            if source is not None and FlatStorage.can_store(self.cells, source):
+                FlatStorage.store_block(self.cells, self.stride, rows_range, columns_range, source, value.stride if isinstance(value, Matrix) else None)
+                self._rows = None
+                return
+            self.rows = self.rows
+
+        if isinstance(value, Matrix):
+            for row_index, source_row in zip(rows_range, value.rows):
+                self._rows[row_index][first_column:last_column] = source_row
+        else:
+            for row_index in rows_range:
+                self._rows[row_index][first_column:last_column] = [value] * len(columns_range)
+
     def rowlen(self):
-        return len(self.rows)
+        if self._rows is not None:
+            return len(self._rows)
+        if self.array is not None:
+            return self.array.shape[0]
+        return len(self.cells) // self.stride
 
     def collen(self):
-        return len(self.rows[0])
+        if self._rows is not None:
+            return len(self._rows[0])
+        if self.array is not None:
+            return self.array.shape[1]
+        return self.stride
 
     def copy(self):
-        return Matrix([row[:] for row in self.rows], self.line, self.column)
+        # The copy shares the storage, whichever of the two matrices is modified first copies it
+        matrix = self.storage_copy()
+        matrix.shared = self.shared = True
+        return matrix
+
+    def storage_copy(self):
+        matrix = Matrix(self._rows, self.line, self.column)
+        matrix.array = self.array
+        matrix.cells = self.cells
+        matrix.stride = self.stride
+        return matrix
 
     def transposed(self):
-        result = [[self.rows[j][i] for j in range(len(self.rows))] for i in range(len(self.rows[0]))]
-        return Matrix(result, self.line, self.column)
+        # Both results share the storage of the matrix, see copy()
+        array = NumpyBackend.transpose(self.as_array())
+        if array is not None:
+            matrix = Matrix.from_array(array, self.line, self.column)
+        elif self.cells is not None:
+            # Flat storage is transposed by copying its columns, a view would build the rows
+            return Matrix.from_cells(FlatStorage.transpose(self.cells, self.stride), self.rowlen(), self.line, self.column)
+        else:
+            matrix = TransposedMatrix(self.rows, self.line, self.column)
+        matrix.shared = self.shared = True
+        return matrix
 
     def determinant(self):
-        if self.properties["rowlen"]() != self.properties["collen"]():
+        if self.rowlen() != self.collen():
             raise NeoRuntimeError("Matrix must be square to calculate determinant", self.line, self.column)
 
         if not all(isinstance(elem, (int, float)) for row in self.rows for elem in row):
             raise NeoRuntimeError("Matrix determinant can only be calculated for matrices of scalars", self.line, self.column)
-        
-        def getMatrixMinor(m,i,j):
-            return [row[:j] + row[j+1:] for row in (m[:i]+m[i+1:])]
-
-        def getMatrixDeternminant(m):
-            if len(m) == 2:
-                return m[0][0]*m[1][1]-m[0][1]*m[1][0]
-            determinant = 0
-            for c in range(len(m)):
-                determinant += ((-1)**c)*m[0][c]*getMatrixDeternminant(getMatrixMinor(m,0,c))
+
+        determinant = NumpyBackend.determinant(self.as_array())
+        if determinant is not None:
             return determinant
-        return(getMatrixDeternminant(self.rows)) 
\ No newline at end of file
+        if Decomposition.is_integral(self.rows):
+            return Decomposition.bareiss_determinant(self.rows)
+        if self.factorization is None:
+            factorization = Decomposition.LUFactorization(self.rows, stop_when_singular=True)
+            # Factors of a singular matrix are left incomplete, they cannot be shared with the builtins
+            if not factorization.complete:
+                return factorization.determinant()
+            self.factorization = factorization
+        return self.factorization.determinant()
+
+    def factorize(self, line=None, column=None):
+        """Returns the LU factors of the cells, factored once until the matrix is modified"""
+        if not all(isinstance(elem, (int, float)) for row in self.rows for elem in row):
+            raise NeoRuntimeError("Matrix must contain only scalars to be factorized", line, column)
+        if self.factorization is None:
+            self.factorization = Decomposition.LUFactorization(self.rows)
+        return self.factorization 
+
+
+# Storage of _rows, for the subclasses which compute their rows on first use behind a _rows property
+rows_slot = Matrix._rows
+
+# Elementwise operators, transposed and slices return these subclasses of Matrix
+from language.nodes.Expressions.LazyMatrix import LazyMatrix
+from language.nodes.Expressions.SlicedMatrix import SlicedMatrix
+from language.nodes.Expressions.TransposedMatrix import TransposedMatrix
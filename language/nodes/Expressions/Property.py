@@ -1,6 +1,8 @@
 from language.nodes.Node import Node
 
 class Property(Node):
+    __slots__ = ("object_name", "property_name")
+
     def __init__(self, object_name, property_name, line=None, column=None):
         super().__init__(line, column)
         self.object_name = object_name
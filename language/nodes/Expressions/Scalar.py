@@ -1,6 +1,8 @@
 from language.nodes.Node import Node
 
 class Scalar(Node):
+    __slots__ = ("value",)
+
     def __init__(self, value, line=None, column=None):
         super().__init__(line, column)
         self.value = value
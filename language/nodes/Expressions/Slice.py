@@ -0,0 +1,40 @@
+from language.nodes.Node import Node
+from language.errors.InterpreterExceptions import NeoRuntimeError
+
+
+def is_whole_number(value):
+    return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+
+
+def is_index(value):
+    return isinstance(value, slice) or is_whole_number(value)
+
+
+def to_index(value):
+    return value if isinstance(value, slice) else int(value)
+
+
+def to_slice(start, stop, line, column):
+    """Runtime value of a Slice node, a Python slice of whole numbers or None for an omitted bound"""
+    for bound in (start, stop):
+        if bound is not None and not is_whole_number(bound):
+            raise NeoRuntimeError("Slice bounds must be whole numbers", line, column)
+    return slice(None if start is None else int(start), None if stop is None else int(stop))
+
+
+class Slice(Node):
+    """
+    start:stop used as an index of a matrix access, either bound can be omitted.
+    """
+    __slots__ = ("start", "stop")
+
+    def __init__(self, start, stop, line=None, column=None):
+        super().__init__(line, column)
+        self.start = start
+        self.stop = stop
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {self.start}:{self.stop}'
+
+    def accept(self, visitor):
+        return visitor.visit_slice(self)
@@ -0,0 +1,45 @@
+from language.nodes.Expressions.Matrix import Matrix, rows_slot
+from language.errors.InterpreterExceptions import NeoRuntimeError
+
+
+class SlicedMatrix(Matrix):
+    """
+    m[a:b, c:d] of a list matrix, a view of a block of the rows of m, kept as they
+    were when the slice was taken (m copies them before its next store). Element
+    reads go through the view, the rows of the block are only copied out when it
+    is read as a whole or modified.
+    """
+    __slots__ = ("source_rows", "rows_range", "columns_range")
+
+    def __init__(self, source_rows, rows_range, columns_range, line=None, column=None):
+        super().__init__(None, line, column)
+        self.source_rows = source_rows
+        self.rows_range = rows_range
+        self.columns_range = columns_range
+
+    @property
+    def _rows(self):
+        if self.source_rows is not None:
+            first_column, last_column = self.columns_range.start, self.columns_range.stop
+            rows_slot.__set__(self, [row[first_column:last_column] for row in self.source_rows[self.rows_range.start:self.rows_range.stop]])
+            self.source_rows = None
+        return rows_slot.__get__(self)
+
+    @_rows.setter
+    def _rows(self, rows):
+        self.source_rows = None
+        rows_slot.__set__(self, rows)
+
+    def load(self, first, second):
+        if self.source_rows is not None and not isinstance(first, slice) and not isinstance(second, slice):
+            try:
+                return self.source_rows[self.rows_range[first]][self.columns_range[second]]
+            except IndexError:
+                raise NeoRuntimeError("Index out of matrix bounds", self.line, self.column)
+        return super().load(first, second)
+
+    def rowlen(self):
+        return len(self.rows_range)
+
+    def collen(self):
+        return len(self.columns_range)
@@ -0,0 +1,307 @@
+from bisect import bisect_left
+from language.nodes.Expressions.Matrix import Matrix
+from language.errors.InterpreterExceptions import NeoRuntimeError
+
+# Nonzero cells listed by print, the rest is summarized
+MAX_PRINTED_CELLS = 10
+
+
+def is_scalar(value):
+    return isinstance(value, (int, float))
+
+
+class SparseMatrix(Matrix):
+    """
+    Matrix of scalars stored in CSR form: the nonzero cells of row i are data[k] in
+    the columns indices[k] for k in range(indptr[i], indptr[i + 1]), columns sorted.
+    Memory scales with the number of nonzeros. Stores go to the pending dictionary
+    first and are merged into the CSR arrays before the next whole matrix operation,
+    so filling the matrix cell by cell does not shift the arrays on every store.
+    The arrays are never modified in place, compress() builds new ones, so copies
+    of a sparse matrix share them.
+
+    Operations between sparse matrices keep them sparse, an operation with a dense
+    matrix or adding a scalar gives a dense Matrix. Code of Matrix which is not
+    overridden sees the dense rows, built on each use of rows.
+    """
+    __slots__ = ("shape", "indptr", "indices", "data", "pending")
+
+    def __init__(self, rows_count, cols_count, indptr=None, indices=None, data=None, line=None, column=None):
+        super().__init__(None, line, column)
+        self.shape = (rows_count, cols_count)
+        self.indptr = indptr if indptr is not None else [0] * (rows_count + 1)
+        self.indices = indices if indices is not None else []
+        self.data = data if data is not None else []
+        # (row, column) -> value stored since the last compress(), 0 removes the cell
+        self.pending = {}
+
+    @staticmethod
+    def from_rows(rows, line=None, column=None):
+        indptr, indices, data = [0], [], []
+        for row in rows:
+            for j, cell in enumerate(row):
+                if cell != 0:
+                    indices.append(j)
+                    data.append(cell)
+            indptr.append(len(indices))
+        return SparseMatrix(len(rows), len(rows[0]), indptr, indices, data, line, column)
+
+    @property
+    def rows(self):
+        self.compress()
+        result = [[0] * self.shape[1] for _ in range(self.shape[0])]
+        for i, row in enumerate(result):
+            for k in range(self.indptr[i], self.indptr[i + 1]):
+                row[self.indices[k]] = self.data[k]
+        return result
+
+    def to_dense(self):
+        return Matrix(self.rows, self.line, self.column)
+
+    def nonzeros(self):
+        self.compress()
+        return len(self.data)
+
+    def row_items(self, i):
+        """(column, value) pairs of the nonzero cells of row i"""
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return zip(self.indices[start:end], self.data[start:end])
+
+    def compress(self):
+        if not self.pending:
+            return
+        updates = {}
+        for (i, j), value in self.pending.items():
+            updates.setdefault(i, {})[j] = value
+        self.pending = {}
+
+        indptr, indices, data = [0], [], []
+        for i in range(self.shape[0]):
+            if i in updates:
+                cells = dict(self.row_items(i))
+                cells.update(updates[i])
+                for j in sorted(cells):
+                    if cells[j] != 0:
+                        indices.append(j)
+                        data.append(cells[j])
+            else:
+                start, end = self.indptr[i], self.indptr[i + 1]
+                indices.extend(self.indices[start:end])
+                data.extend(self.data[start:end])
+            indptr.append(len(indices))
+        self.indptr, self.indices, self.data = indptr, indices, data
+
+    def __repr__(self):
+        self.compress()
+        rows_count, cols_count = self.shape
+        lines = [f'<sparse {rows_count}x{cols_count} matrix, {len(self.data)} nonzeros>']
+        printed = 0
+        for i in range(rows_count):
+            for j, value in self.row_items(i):
+                if printed == MAX_PRINTED_CELLS:
+                    lines.append('  ...')
+                    return '\n'.join(lines)
+                lines.append(f'  ({i}, {j}) {value}')
+                printed += 1
+        return '\n'.join(lines)
+
+    def check_index(self, first, second):
+        """Indices of the cell, negative indices count from the end as for dense matrices"""
+        if isinstance(first, slice) or isinstance(second, slice):
+            raise NeoRuntimeError("Sparse matrices do not support slices", self.line, self.column)
+        rows_count, columns_count = self.shape
+        if not (-rows_count <= first < rows_count and -columns_count <= second < columns_count):
+            raise NeoRuntimeError("Index out of matrix bounds", self.line, self.column)
+        return first % rows_count, second % columns_count
+
+    def load(self, first, second):
+        first, second = self.check_index(first, second)
+        if (first, second) in self.pending:
+            return self.pending[(first, second)]
+        start, end = self.indptr[first], self.indptr[first + 1]
+        k = bisect_left(self.indices, second, start, end)
+        if k < end and self.indices[k] == second:
+            return self.data[k]
+        return 0
+
+    def store(self, first, second, value):
+        first, second = self.check_index(first, second)
+        if not is_scalar(value):
+            raise NeoRuntimeError("Sparse matrix can hold only scalars", self.line, self.column)
+        self.power_squares = None
+        self.factorization = None
+        self.version += 1
+        self.pending[(first, second)] = value
+
+    def share(self):
+        return self.copy()
+
+    def freeze(self):
+        return self
+
+    def holds_matrices(self):
+        return False
+
+    def as_array(self):
+        return None
+
+    def rowlen(self):
+        return self.shape[0]
+
+    def collen(self):
+        return self.shape[1]
+
+    def copy(self):
+        self.compress()
+        return SparseMatrix(*self.shape, self.indptr, self.indices, self.data, self.line, self.column)
+
+    def transposed(self):
+        self.compress()
+        rows_count, cols_count = self.shape
+        counts = [0] * (cols_count + 1)
+        for j in self.indices:
+            counts[j + 1] += 1
+        for j in range(cols_count):
+            counts[j + 1] += counts[j]
+        indptr = counts[:]
+        indices, data = [0] * len(self.indices), [0] * len(self.data)
+        # Rows are visited in order, so the columns of the transposed rows come out sorted
+        for i in range(rows_count):
+            for j, value in self.row_items(i):
+                indices[counts[j]] = i
+                data[counts[j]] = value
+                counts[j] += 1
+        return SparseMatrix(cols_count, rows_count, indptr, indices, data, self.line, self.column)
+
+    def __bool__(self):
+        self.compress()
+        return any(value != 0 for value in self.data)
+
+    def __eq__(self, other):
+        if not isinstance(other, Matrix) or self.shape != (other.rowlen(), other.collen()):
+            return False
+        if not isinstance(other, SparseMatrix):
+            return self.rows == other.rows
+        self.compress()
+        other.compress()
+        return self.indptr == other.indptr and self.indices == other.indices and self.data == other.data
+
+    def __neg__(self):
+        self.compress()
+        return SparseMatrix(*self.shape, self.indptr, self.indices, [-value for value in self.data], self.line, self.column)
+
+    def check_same_shape(self, other):
+        if self.shape != (other.rowlen(), other.collen()):
+            raise NeoRuntimeError("Matrixes must have the same shape", self.line, self.column)
+
+    def combine(self, other, sign):
+        """self + sign * other for a sparse other, row by row merge of the nonzeros"""
+        self.compress()
+        other.compress()
+        indptr, indices, data = [0], [], []
+        for i in range(self.shape[0]):
+            cells = dict(self.row_items(i))
+            for j, value in other.row_items(i):
+                cells[j] = cells.get(j, 0) + sign * value
+            for j in sorted(cells):
+                if cells[j] != 0:
+                    indices.append(j)
+                    data.append(cells[j])
+            indptr.append(len(indices))
+        return SparseMatrix(*self.shape, indptr, indices, data, self.line, self.column)
+
+    def add_to_dense(self, dense_rows, sign):
+        """dense + sign * self as a dense Matrix"""
+        self.compress()
+        result = [row[:] for row in dense_rows]
+        for i, row in enumerate(result):
+            for j, value in self.row_items(i):
+                row[j] += sign * value
+        return Matrix(result, self.line, self.column)
+
+    def __add__(self, other):
+        if isinstance(other, SparseMatrix):
+            self.check_same_shape(other)
+            return self.combine(other, 1)
+        if isinstance(other, Matrix):
+            self.check_same_shape(other)
+            return self.add_to_dense(other.rows, 1)
+        if is_scalar(other):
+            return self.to_dense() + other
+        raise NeoRuntimeError(f"You cannot add 'Matrix' and '{other.__class__.__name__}'", self.line, self.column)
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        if isinstance(other, SparseMatrix):
+            self.check_same_shape(other)
+            return self.combine(other, -1)
+        if isinstance(other, Matrix):
+            self.check_same_shape(other)
+            return self.add_to_dense((-other).rows, 1)
+        if is_scalar(other):
+            return self.to_dense() - other
+        raise NeoRuntimeError(f"You cannot substract 'Matrix' with '{other.__class__.__name__}'", self.line, self.column)
+
+    def __rsub__(self, other):
+        if isinstance(other, Matrix):
+            self.check_same_shape(other)
+            return self.add_to_dense(other.rows, -1)
+        if is_scalar(other):
+            return other - self.to_dense()
+        raise NeoRuntimeError(f"You cannot substract 'Matrix' with '{other.__class__.__name__}'", self.line, self.column)
+
+    def __mul__(self, other):
+        self.compress()
+        if isinstance(other, SparseMatrix):
+            if self.shape[1] != other.shape[0]:
+                raise NeoRuntimeError("Wrong shapes of matrixes. Cannot multiply", self.line, self.column)
+            other.compress()
+            # Row i of the product is the sum of the rows k of other scaled by self[i, k]
+            indptr, indices, data = [0], [], []
+            for i in range(self.shape[0]):
+                cells = {}
+                for k, value in self.row_items(i):
+                    for j, other_value in other.row_items(k):
+                        cells[j] = cells.get(j, 0) + value * other_value
+                for j in sorted(cells):
+                    if cells[j] != 0:
+                        indices.append(j)
+                        data.append(cells[j])
+                indptr.append(len(indices))
+            return SparseMatrix(self.shape[0], other.shape[1], indptr, indices, data, self.line, self.column)
+
+        if isinstance(other, Matrix):
+            if self.shape[1] != other.rowlen():
+                raise NeoRuntimeError("Wrong shapes of matrixes. Cannot multiply", self.line, self.column)
+            other_rows = other.rows
+            result = []
+            for i in range(self.shape[0]):
+                row = [0] * other.collen()
+                for k, value in self.row_items(i):
+                    row = [cell + value * other_cell for cell, other_cell in zip(row, other_rows[k])]
+                result.append(row)
+            return Matrix(result, self.line, self.column)
+
+        if is_scalar(other):
+            if other == 0:
+                return SparseMatrix(*self.shape, line=self.line, column=self.column)
+            return SparseMatrix(*self.shape, self.indptr, self.indices, [value * other for value in self.data], self.line, self.column)
+        raise NeoRuntimeError(f"You cannot multiply 'Matrix' and '{other.__class__.__name__}'", self.line, self.column)
+
+    def __rmul__(self, other):
+        if not isinstance(other, Matrix):
+            return self.__mul__(other)
+        if other.collen() != self.shape[0]:
+            raise NeoRuntimeError("Wrong shapes of matrixes. Cannot multiply", other.line, other.column)
+        self.compress()
+        result = []
+        for other_row in other.rows:
+            row = [0] * self.shape[1]
+            for k, other_value in enumerate(other_row):
+                if other_value != 0:
+                    for j, value in self.row_items(k):
+                        row[j] += other_value * value
+            result.append(row)
+        return Matrix(result, other.line, other.column)
@@ -0,0 +1,43 @@
+from language.nodes.Expressions.Matrix import Matrix, rows_slot
+from language.errors.InterpreterExceptions import NeoRuntimeError
+
+
+class TransposedMatrix(Matrix):
+    """
+    m.transposed of a list matrix, a view reading the rows of m with the indices
+    swapped. The view keeps the rows m had when it was taken, m copies them before
+    its next store. Element reads go through the view, the transposed rows are only
+    built when the matrix is read as a whole or modified.
+    """
+    __slots__ = ("source_rows", "shape")
+
+    def __init__(self, source_rows, line=None, column=None):
+        super().__init__(None, line, column)
+        self.source_rows = source_rows
+        self.shape = (len(source_rows[0]), len(source_rows))
+
+    @property
+    def _rows(self):
+        if self.source_rows is not None:
+            rows_slot.__set__(self, [list(column) for column in zip(*self.source_rows)])
+            self.source_rows = None
+        return rows_slot.__get__(self)
+
+    @_rows.setter
+    def _rows(self, rows):
+        self.source_rows = None
+        rows_slot.__set__(self, rows)
+
+    def load(self, first, second):
+        if self.source_rows is not None and not isinstance(first, slice) and not isinstance(second, slice):
+            try:
+                return self.source_rows[second][first]
+            except IndexError:
+                raise NeoRuntimeError("Index out of matrix bounds", self.line, self.column)
+        return super().load(first, second)
+
+    def rowlen(self):
+        return self.shape[0]
+
+    def collen(self):
+        return self.shape[1]
@@ -1,6 +1,8 @@
 from language.nodes.Node import Node
 
 class UnaryOperator(Node):
+    __slots__ = ("op", "rvalue")
+
     def __init__(self, op, rvalue, line=None, column=None):
         super().__init__(line, column)
         self.op = op
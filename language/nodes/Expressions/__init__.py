@@ -5,5 +5,11 @@ from .Bool import Bool
 from .String import String
 from .Property import Property
 from .Access import Access
+from .Slice import Slice
 from .Identifier import Identifier
-from .Matrix import Matrix 
\ No newline at end of file
+from .Matrix import Matrix
+from .SparseMatrix import SparseMatrix
+from .LazyMatrix import LazyMatrix
+from .TransposedMatrix import TransposedMatrix
+from .SlicedMatrix import SlicedMatrix
+from .Constant import Constant
\ No newline at end of file
@@ -1,12 +1,16 @@
 from language.nodes.Node import Node
 
 class Assignment(Node):
+    __slots__ = ("identifier", "first_index", "second_index", "expression", "mutable")
+
     def __init__(self, left_identifier, first_index, second_index, right_expression, line=None, column=None):
         super().__init__(line, column)
         self.identifier = left_identifier
         self.first_index = first_index
         self.second_index = second_index
         self.expression = right_expression
+        # Mutability of the assigned variable, set by the Resolver (None if it is not declared)
+        self.mutable = None
 
     def __repr__(self):
         return f'{self.__class__.__name__}: {self.identifier} {self.expression} [{self.first_index}, {self.second_index}]'
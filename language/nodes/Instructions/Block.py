@@ -1,12 +1,20 @@
 from language.nodes.Node import Node
 
 class Block(Node):
+    __slots__ = ("instructions", "is_function_body", "frame_size", "own_frame", "local_slots")
+
     def __init__(self, instructions, is_function_body = False, line=None, column=None):
         super().__init__(line, column)
         self.instructions = instructions
-        self.passed_variables = {}
-        self.closure = None
         self.is_function_body = is_function_body
+        # Number of slots in the frame of a function body, or of a block with its own frame, set by the Resolver
+        self.frame_size = 0
+        # Set by the Resolver for a block entered repeatedly whose variables can be captured by
+        # functions defined in it, it gets a new frame on every entry
+        self.own_frame = False
+        # Slots of the variables declared in a block sharing the frame of its function,
+        # cleared on every entry
+        self.local_slots = ()
 
     def __repr__(self):
         return f'{self.__class__.__name__}: {self.instructions}'
@@ -1,11 +1,15 @@
 from language.nodes.Node import Node
 
 class Declaration(Node):
+    __slots__ = ("identifier", "expression", "mutable", "redeclared")
+
     def __init__(self, identifier, expression, mutable=False, line=None, column=None):
         super().__init__(line, column)
         self.identifier = identifier
         self.expression = expression
         self.mutable = mutable
+        # Set by the Resolver when the name is already declared in the same block
+        self.redeclared = False
 
     def __repr__(self):
         mut_str = 'mutable' if self.mutable else 'immutable'
@@ -1,6 +1,8 @@
 from language.nodes.Node import Node
 
 class FunctionCall(Node):
+    __slots__ = ("function_name_or_body", "arguments")
+
     def __init__(self, function_name_or_body, arguments_list, line=None, column=None):
         super().__init__(line, column)
         # function_name_or_body can be either an Identifier (for named functions) or a Function (for IIFE)
@@ -1,6 +1,8 @@
 from language.nodes.Node import Node
 
 class IfStatement(Node):
+    __slots__ = ("condition", "block", "else_block")
+
     def __init__(self, condition, block, else_block, line=None, column=None):
         super().__init__(line, column)
         self.condition = condition
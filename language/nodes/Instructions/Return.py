@@ -1,9 +1,13 @@
 from language.nodes.Node import Node
 
 class Return(Node):
+    __slots__ = ("expression", "tail_call")
+
     def __init__(self, expression, line=None, column=None):
         super().__init__(line, column)
         self.expression = expression
+        # Set by the Resolver when the returned expression is a call which can reuse the frame
+        self.tail_call = False
 
     def __repr__(self):
         return f'{self.__class__.__name__}: {self.expression}'
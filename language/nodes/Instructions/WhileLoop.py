@@ -1,6 +1,8 @@
 from language.nodes.Node import Node
 
 class WhileLoop(Node):
+    __slots__ = ("condition", "block")
+
     def __init__(self, condition, block, line=None, column=None):
         super().__init__(line, column)
         self.condition = condition
@@ -1,7 +1,30 @@
+from language.lexer import Position
+
+
+def attribute_values(node):
+    """Values of the attributes of a node, kept in its __dict__ or in slots"""
+    values = list(getattr(node, '__dict__', {}).values())
+    for cls in type(node).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if hasattr(node, name):
+                values.append(getattr(node, name))
+    return values
+
+
 class Node():
+    __slots__ = ("position",)
+
     def __init__(self, line=None, column=None):
-        self.line = line
-        self.column = column
+        # Line and column packed together, see Position
+        self.position = Position.pack(line, column)
+
+    @property
+    def line(self):
+        return Position.line_of(self.position)
+
+    @property
+    def column(self):
+        return Position.column_of(self.position)
 
     def accept(self, visitor):
         raise NotImplementedError(f'{self.__class__.__name__} not implemented')
@@ -1,12 +1,16 @@
 from language.nodes.Node import Node
 
 class Function(Node):
+    __slots__ = ("name", "parameter_list", "block", "creates_closures")
+
     def __init__(self, name, parameter_list, block, line=None, column=None):
         super().__init__(line, column)
         # name can be None for anonymous functions
         self.name = name
         self.parameter_list = parameter_list
         self.block = block
+        # Set by the Resolver when functions are defined inside, their closures capture the frame
+        self.creates_closures = False
 
     def __repr__(self):
         return f'{self.__class__.__name__}: {self.name.value if self.name else "anonymous"} {self.parameter_list} {self.block}'
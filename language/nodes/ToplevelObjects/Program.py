@@ -1,8 +1,13 @@
 from language.nodes.Node import Node
 
 class Program(Node):
+    __slots__ = ("toplevel_objects", "frame_size")
+
     def __init__(self, objects):
+        super().__init__()
         self.toplevel_objects = objects
+        # Number of slots in the frame of the top level code, set by the Resolver
+        self.frame_size = 0
 
     def __repr__(self) -> str:
         return f'{self.__class__.__name__}: {self.toplevel_objects}' 
\ No newline at end of file
@@ -0,0 +1,227 @@
+from language.nodes.Node import Node, attribute_values
+from language.nodes.Instructions import Assignment, Block, Declaration, FunctionCall, IfStatement, Return, WhileLoop
+from language.nodes.ToplevelObjects import Function, Program
+from language.nodes.Expressions import Access, BinaryOperator, Bool, Constant, Identifier, Matrix, Property, Scalar, Slice, String, UnaryOperator
+from language.nodes.OperatorType import OperatorType
+from language.errors.InterpreterExceptions import NeoRuntimeError
+from language.interpreter.Built_ins import builtin_functions, pure_builtin_functions
+from language.interpreter.Interpreter import Visitor
+from language.resolver.Resolver import declared_names
+
+# Exponents above this are not folded, the result could be huge and it is not known to be needed
+MAX_FOLDED_EXPONENT = 64
+
+
+def count_nodes(node):
+    if isinstance(node, list):
+        return sum(count_nodes(item) for item in node)
+    if not isinstance(node, Node):
+        return 0
+    if isinstance(node, Constant):
+        return 1
+    return 1 + sum(count_nodes(value) for value in attribute_values(node))
+
+
+def is_constant(node):
+    return isinstance(node, (Scalar, Bool, String, Constant))
+
+
+def to_node(value, line, column):
+    if isinstance(value, bool):
+        return Bool(str(value), line, column)
+    if isinstance(value, (int, float)):
+        return Scalar(value, line, column)
+    if isinstance(value, str):
+        return String(value, line, column)
+    if isinstance(value, Matrix):
+        value.freeze()
+    return Constant(value, line, column)
+
+
+class Optimizer:
+    """
+    AST pass run between the Parser and the Interpreter. Every visit_* method returns
+    the node replacing the visited one, or None when an instruction is removed.
+
+    Constant subtrees are evaluated by the tree-walking Visitor, so folding follows the
+    runtime semantics exactly. Subtrees whose evaluation fails are kept, the error is
+    then reported by the running program at the usual position.
+    """
+    def __init__(self):
+        self.evaluator = Visitor()
+        # Number of AST nodes the optimized program has less than the parsed one
+        self.removed_nodes = 0
+        # Names declared in the program, a variable named like a builtin shadows it
+        self.declared_names = set()
+
+
+    def optimize_program(self, program:Program):
+        self.declared_names = declared_names(program.toplevel_objects)
+        program.toplevel_objects = self.optimize_instructions(program.toplevel_objects)
+        return program
+
+
+    def optimize_instructions(self, instructions):
+        optimized = []
+        for instruction in instructions:
+            instruction = instruction.accept(self)
+            if instruction is not None:
+                optimized.append(instruction)
+        return optimized
+
+
+    def replace(self, node, replacement):
+        self.removed_nodes += count_nodes(node) - count_nodes(replacement)
+        return replacement
+
+
+    def fold(self, node, evaluate):
+        try:
+            value = evaluate()
+        except (NeoRuntimeError, ArithmeticError, TypeError, ValueError):
+            return node
+        return self.replace(node, to_node(value, node.line, node.column))
+
+
+    def visit_function_definition(self, function:Function):
+        function.block.instructions = self.optimize_instructions(function.block.instructions)
+        return function
+
+
+    def visit_function_call(self, function_call:FunctionCall):
+        callee = function_call.function_name_or_body
+        if isinstance(callee, Function):
+            callee.accept(self)
+        function_call.arguments = [argument.accept(self) for argument in function_call.arguments]
+
+        if (isinstance(callee, Identifier) and callee.value in pure_builtin_functions and callee.value not in self.declared_names
+                and all(is_constant(argument) for argument in function_call.arguments)):
+            builtin_function = builtin_functions[callee.value]
+            arguments = [argument.value for argument in function_call.arguments]
+            return self.fold(function_call, lambda: builtin_function(callee.line, callee.column, *arguments))
+        return function_call
+
+
+    def visit_block(self, block:Block):
+        block.instructions = self.optimize_instructions(block.instructions)
+        return block
+
+
+    def visit_if_statement(self, if_statement:IfStatement):
+        if_statement.condition = if_statement.condition.accept(self)
+        if_statement.block = if_statement.block.accept(self)
+        if if_statement.else_block:
+            if_statement.else_block = if_statement.else_block.accept(self)
+
+        if not is_constant(if_statement.condition):
+            return if_statement
+
+        # Only the taken branch is left, as a block it keeps its own scope
+        if if_statement.condition.accept(self.evaluator):
+            return self.replace(if_statement, if_statement.block)
+        return self.replace(if_statement, if_statement.else_block)
+
+
+    def visit_while_loop(self, while_loop:WhileLoop):
+        while_loop.condition = while_loop.condition.accept(self)
+        while_loop.block = while_loop.block.accept(self)
+
+        if is_constant(while_loop.condition) and not while_loop.condition.accept(self.evaluator):
+            return self.replace(while_loop, None)
+        return while_loop
+
+
+    def visit_return(self, return_instruction:Return):
+        if return_instruction.expression is not None:
+            return_instruction.expression = return_instruction.expression.accept(self)
+        return return_instruction
+
+
+    def visit_assignment(self, assignment:Assignment):
+        assignment.expression = assignment.expression.accept(self)
+        if assignment.first_index:
+            assignment.first_index = assignment.first_index.accept(self)
+            assignment.second_index = assignment.second_index.accept(self)
+        return assignment
+
+
+    def visit_declaration(self, declaration:Declaration):
+        declaration.expression = declaration.expression.accept(self)
+        return declaration
+
+
+    def visit_identifier(self, identifier:Identifier):
+        return identifier
+
+
+    def visit_matrix(self, matrix:Matrix):
+        matrix.rows = [[cell.accept(self) for cell in row] for row in matrix.rows]
+
+        if not all(is_constant(cell) for row in matrix.rows for cell in row):
+            return matrix
+
+        rows = [[cell.accept(self.evaluator) for cell in row] for row in matrix.rows]
+        return self.replace(matrix, to_node(Matrix(rows, matrix.line, matrix.column), matrix.line, matrix.column))
+
+
+    def visit_access(self, access:Access):
+        access.first = access.first.accept(self)
+        access.second = access.second.accept(self)
+        return access
+
+
+    def visit_slice(self, slice:Slice):
+        if slice.start is not None:
+            slice.start = slice.start.accept(self)
+        if slice.stop is not None:
+            slice.stop = slice.stop.accept(self)
+        return slice
+
+
+    def visit_property(self, property:Property):
+        property.object_name = property.object_name.accept(self)
+
+        # Matrix properties do not modify the matrix
+        if is_constant(property.object_name):
+            return self.fold(property, lambda: property.accept(self.evaluator))
+        return property
+
+
+    def visit_unary_operator(self, unary:UnaryOperator):
+        unary.rvalue = unary.rvalue.accept(self)
+
+        if is_constant(unary.rvalue):
+            return self.fold(unary, lambda: unary.accept(self.evaluator))
+        return unary
+
+
+    def visit_binary_operator(self, binary:BinaryOperator):
+        if binary.op == OperatorType.PIPE and isinstance(binary.rvalue, FunctionCall):
+            # x |> f(a) calls f(x, a), f(a) alone is not evaluated and must not be folded
+            call = binary.rvalue
+            if isinstance(call.function_name_or_body, Function):
+                call.function_name_or_body.accept(self)
+            call.arguments = [argument.accept(self) for argument in call.arguments]
+            binary.lvalue = binary.lvalue.accept(self)
+            return binary
+
+        binary.lvalue = binary.lvalue.accept(self)
+        binary.rvalue = binary.rvalue.accept(self)
+
+        if binary.op == OperatorType.PIPE or not (is_constant(binary.lvalue) and is_constant(binary.rvalue)):
+            return binary
+
+        if binary.op == OperatorType.POWER:
+            exponent = binary.rvalue.value
+            if not isinstance(exponent, (int, float)) or abs(exponent) > MAX_FOLDED_EXPONENT:
+                return binary
+
+        return self.fold(binary, lambda: binary.accept(self.evaluator))
+
+
+    def visit_literal(self, literal):
+        return literal
+
+
+    def visit_constant(self, constant:Constant):
+        return constant
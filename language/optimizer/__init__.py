@@ -0,0 +1 @@
+# Optimizer Package
@@ -471,18 +471,18 @@ class Parser:
 
     def try_parse_matrix_access_with_consumed_identifier(self, identifier):
         """
-        MatrixAccess = Identifier '[' Scalar ',' Scalar ']' | Identifier '[' Scalar ']'
+        MatrixAccess = Identifier '[' Index ',' Index ']' | Identifier '[' Index ']'
         """
         if not self.check_type(TokenType.OP_SQUARE_BRACKET):
             return None
         self.consume()
 
-        first_expression = self.parse_expression()
+        first_expression = self.parse_index()
         second_expression = None
 
         if self.check_type(TokenType.COMMA):
             self.consume()
-            second_expression = self.parse_expression()
+            second_expression = self.parse_index()
         else:
             # Shorthand syntax for single index access
             second_expression = first_expression
@@ -491,3 +491,21 @@ class Parser:
         self.expect(TokenType.CL_SQUARE_BRACKET)
 
         return Access(identifier, first_expression, second_expression, identifier.line, identifier.column)
+
+
+    def parse_index(self):
+        """
+        Index = Expression | [ Expression ] ':' [ Expression ]
+        """
+        line, column = self.lexer.token.line, self.lexer.token.column
+        start = None
+        if not self.check_type(TokenType.COLON):
+            start = self.parse_expression()
+            if not self.check_type(TokenType.COLON):
+                return start
+
+        self.consume()
+        stop = None
+        if not (self.check_type(TokenType.COMMA) or self.check_type(TokenType.CL_SQUARE_BRACKET)):
+            stop = self.parse_expression()
+        return Slice(start, stop, line, column)
@@ -0,0 +1,328 @@
+from language.nodes.Instructions import Assignment, Block, Declaration, FunctionCall, IfStatement, Return, WhileLoop
+from language.nodes.ToplevelObjects import Function, Program
+from language.nodes.Expressions import Access, BinaryOperator, Identifier, Matrix, Property, Slice, UnaryOperator
+from language.nodes.OperatorType import OperatorType
+from language.nodes.Node import Node, attribute_values
+from language.interpreter.Built_ins import builtin_functions
+
+
+def call_of(expression):
+    """
+    Returns (callee, arguments) when the expression calls a Neo function, directly
+    or through the pipe operator, and None otherwise. Builtins are not Neo functions.
+    """
+    if isinstance(expression, FunctionCall):
+        callee, arguments = expression.function_name_or_body, expression.arguments
+    elif isinstance(expression, BinaryOperator) and expression.op == OperatorType.PIPE:
+        if isinstance(expression.rvalue, FunctionCall):
+            # x |> f(a, b) calls f(x, a, b)
+            callee, arguments = expression.rvalue.function_name_or_body, [expression.lvalue, *expression.rvalue.arguments]
+        else:
+            callee, arguments = expression.rvalue, [expression.lvalue]
+    else:
+        return None
+
+    if isinstance(callee, Function):
+        return callee, arguments
+    if isinstance(callee, Identifier) and callee.value not in builtin_functions:
+        return callee, arguments
+    return None
+
+
+def declares_names(instructions):
+    return any(isinstance(instruction, Declaration) or (isinstance(instruction, Function) and instruction.name)
+               for instruction in instructions)
+
+
+def defines_function(node):
+    """True when a function is defined anywhere inside the node (or a list of nodes)"""
+    if isinstance(node, Function):
+        return True
+    if isinstance(node, list):
+        return any(defines_function(item) for item in node)
+    if isinstance(node, Node):
+        return any(defines_function(value) for value in attribute_values(node))
+    return False
+
+
+def declared_names(node, names=None):
+    """Names of the variables, functions and parameters declared anywhere inside the node (or a list of nodes)"""
+    names = set() if names is None else names
+    if isinstance(node, list):
+        for item in node:
+            declared_names(item, names)
+    elif isinstance(node, Node):
+        if isinstance(node, Declaration):
+            names.add(node.identifier.value)
+        elif isinstance(node, Function):
+            names.update(parameter.value for parameter in node.parameter_list)
+            if node.name:
+                names.add(node.name.value)
+        for value in attribute_values(node):
+            declared_names(value, names)
+    return names
+
+
+class Binding:
+    def __init__(self, slot, mutable):
+        self.slot = slot
+        self.mutable = mutable
+
+
+class FunctionScope:
+    """
+    All block scopes of one function share its frame, every declaration gets its own slot.
+    A block which needs a frame of its own gets a FunctionScope too, with own_block set.
+    """
+    def __init__(self, parent=None, function=None, own_block=False):
+        self.parent = parent
+        # Function node owning the frame, None for the program
+        self.function = function
+        self.own_block = own_block
+        self.blocks = []
+        self.slot_count = 0
+        # Number of loops the resolver is in, blocks inside a loop are entered more than once per frame
+        self.loop_depth = 0
+
+    def new_slot(self):
+        self.slot_count += 1
+        return self.slot_count - 1
+
+
+class BlockScope:
+    def __init__(self):
+        # name -> Binding, contains names declared anywhere in the block
+        self.bindings = {}
+        # names already declared at the point the resolver is at
+        self.declared = set()
+
+
+class Resolver:
+    """
+    Static pass run between Parser and Interpreter. Every Identifier gets the
+    (depth, slot) of the variable it refers to: depth is the number of function
+    frames to go up and slot the index in that frame. Names declared in a block
+    are bound from their declaration on, earlier uses refer to the enclosing
+    scopes. Functions run later than they are defined, so in their bodies the
+    names of the enclosing blocks are visible in the whole block. Identifiers
+    which cannot be resolved keep depth and slot set to None and fail at runtime
+    when evaluated.
+    """
+    def __init__(self):
+        self.function = None
+
+
+    def resolve_program(self, program:Program):
+        self.function = FunctionScope()
+        self.begin_block(program.toplevel_objects)
+        for top_level_object in program.toplevel_objects:
+            top_level_object.accept(self)
+        self.end_block()
+        program.frame_size = self.function.slot_count
+        return program
+
+
+    def begin_block(self, instructions):
+        block = BlockScope()
+        self.function.blocks.append(block)
+
+        # Hoist the names declared in the block, so they can be referenced by functions defined earlier
+        for instruction in instructions:
+            if isinstance(instruction, Declaration):
+                self.hoist(block, instruction.identifier.value, instruction.mutable)
+            elif isinstance(instruction, Function) and instruction.name:
+                self.hoist(block, instruction.name.value, False)
+        return block
+
+
+    def hoist(self, block, name, mutable):
+        if name not in block.bindings:
+            block.bindings[name] = Binding(self.function.new_slot(), mutable)
+        return block.bindings[name]
+
+
+    def end_block(self):
+        self.function.blocks.pop()
+
+
+    def lookup(self, name):
+        return next(self.lookup_all(name), (None, None))
+
+
+    def lookup_all(self, name):
+        """(depth, binding) of every variable of the name visible here, innermost first"""
+        depth = 0
+        function = self.function
+        # True once the lookup leaves the function being resolved
+        hoisted = False
+        while function is not None:
+            for block in reversed(function.blocks):
+                if name in (block.bindings if hoisted else block.declared):
+                    yield depth, block.bindings[name]
+            hoisted = hoisted or not function.own_block
+            function = function.parent
+            depth += 1
+
+
+    def resolve_identifier(self, identifier:Identifier):
+        depth, binding = self.lookup(identifier.value)
+        if binding is not None:
+            identifier.depth, identifier.slot = depth, binding.slot
+        # A variable named like a builtin shadows it once set, the builtin is used until then
+        identifier.builtin = identifier.value in builtin_functions
+        return binding
+
+
+    def resolve_callee(self, callee):
+        callee.accept(self)
+        if isinstance(callee, Identifier):
+            # A call skips the variables of the name which do not hold a function, as the
+            # other engines do, so the outer ones are kept to be tried in turn
+            callee.shadowed = tuple((depth, binding.slot) for depth, binding in self.lookup_all(callee.value))[1:]
+
+
+    def visit_function_definition(self, function:Function):
+        if function.name:
+            block = self.function.blocks[-1]
+            binding = self.hoist(block, function.name.value, False)
+            block.declared.add(function.name.value)
+            function.name.depth, function.name.slot = 0, binding.slot
+
+        if self.function.function is not None:
+            self.function.function.creates_closures = True
+
+        self.function = FunctionScope(self.function, function)
+        block = BlockScope()
+        self.function.blocks.append(block)
+        for parameter in function.parameter_list:
+            binding = self.hoist(block, parameter.value, False)
+            block.declared.add(parameter.value)
+            parameter.depth, parameter.slot = 0, binding.slot
+
+        # Function body shares the block scope with the parameters
+        for instruction in function.block.instructions:
+            if isinstance(instruction, Declaration):
+                self.hoist(block, instruction.identifier.value, instruction.mutable)
+            elif isinstance(instruction, Function) and instruction.name:
+                self.hoist(block, instruction.name.value, False)
+        for instruction in function.block.instructions:
+            instruction.accept(self)
+
+        function.block.frame_size = self.function.slot_count
+        self.function = self.function.parent
+
+
+    def visit_function_call(self, function_call:FunctionCall):
+        self.resolve_callee(function_call.function_name_or_body)
+        for argument in function_call.arguments:
+            argument.accept(self)
+
+
+    def visit_block(self, block:Block):
+        enclosing = self.function
+        # Functions defined in a block run more than once in the same frame would all
+        # capture the variables of its last run, such a block gets a frame per run
+        block.own_frame = (enclosing.loop_depth > 0 and declares_names(block.instructions)
+                           and defines_function(block.instructions))
+        if block.own_frame:
+            self.function = FunctionScope(enclosing, enclosing.function, own_block=True)
+
+        scope = self.begin_block(block.instructions)
+        for instruction in block.instructions:
+            instruction.accept(self)
+        self.end_block()
+
+        if block.own_frame:
+            block.frame_size = self.function.slot_count
+            self.function = enclosing
+        else:
+            block.local_slots = tuple(binding.slot for binding in scope.bindings.values())
+
+
+    def visit_if_statement(self, if_statement:IfStatement):
+        if_statement.condition.accept(self)
+        if_statement.block.accept(self)
+        if if_statement.else_block:
+            if_statement.else_block.accept(self)
+
+
+    def visit_while_loop(self, while_loop:WhileLoop):
+        while_loop.condition.accept(self)
+        self.function.loop_depth += 1
+        while_loop.block.accept(self)
+        self.function.loop_depth -= 1
+
+
+    def visit_return(self, return_instruction:Return):
+        if return_instruction.expression is not None:
+            return_instruction.expression.accept(self)
+        # 'return' outside of a function ends the program, there is no frame to reuse
+        return_instruction.tail_call = self.function.function is not None and call_of(return_instruction.expression) is not None
+
+
+    def visit_assignment(self, assignment:Assignment):
+        assignment.expression.accept(self)
+        binding = self.resolve_identifier(assignment.identifier)
+        assignment.mutable = binding.mutable if binding else None
+
+        if assignment.first_index:
+            assignment.first_index.accept(self)
+            assignment.second_index.accept(self)
+
+
+    def visit_declaration(self, declaration:Declaration):
+        declaration.expression.accept(self)
+
+        block = self.function.blocks[-1]
+        name = declaration.identifier.value
+        binding = self.hoist(block, name, declaration.mutable)
+        declaration.identifier.depth, declaration.identifier.slot = 0, binding.slot
+        declaration.redeclared = name in block.declared
+        block.declared.add(name)
+
+
+    def visit_identifier(self, identifier:Identifier):
+        self.resolve_identifier(identifier)
+
+
+    def visit_matrix(self, matrix:Matrix):
+        for row in matrix.rows:
+            for cell in row:
+                cell.accept(self)
+
+
+    def visit_access(self, access:Access):
+        access.identifier.accept(self)
+        access.first.accept(self)
+        access.second.accept(self)
+
+
+    def visit_slice(self, slice:Slice):
+        for bound in (slice.start, slice.stop):
+            if bound is not None:
+                bound.accept(self)
+
+
+    def visit_property(self, property:Property):
+        property.object_name.accept(self)
+
+
+    def visit_unary_operator(self, unary:UnaryOperator):
+        unary.rvalue.accept(self)
+
+
+    def visit_binary_operator(self, binary:BinaryOperator):
+        binary.lvalue.accept(self)
+        if binary.op == OperatorType.PIPE:
+            # x |> f calls f
+            self.resolve_callee(binary.rvalue)
+        else:
+            binary.rvalue.accept(self)
+
+
+    def visit_literal(self, literal):
+        pass
+
+
+    def visit_constant(self, constant):
+        pass
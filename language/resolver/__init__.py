@@ -0,0 +1 @@
+# Resolver Package
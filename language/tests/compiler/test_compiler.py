@@ -0,0 +1,117 @@
+import re
+import pytest
+from ...compiler.Compiler import Compiler
+from ...compiler.Disassembler import disassemble
+from ...compiler.OpCode import OpCode
+from ...compiler.VM import VM
+from ...errors.InterpreterExceptions import NeoRuntimeError
+from ...interpreter.Interpreter import Interpreter
+from ...lexer.Lexer import Lexer
+from ...parser.Parser import Parser
+from ...lexer.Source import SourceString
+
+
+def compile_neo(program):
+    return Compiler().compile_program(Parser(Lexer(SourceString(program))).parse_program())
+
+
+def opcodes(code):
+    return [OpCode(op) for op in code.instructions[::2]]
+
+
+def test_while_loop_jumps():
+    code = compile_neo('''
+    var mut i = 0
+    while (i < 3) {
+        i = i + 1
+    }
+    ''')
+    assert opcodes(code) == [
+        OpCode.LOAD_CONST, OpCode.DECLARE_MUTABLE_NAME,
+        OpCode.LOAD_NAME, OpCode.LOAD_CONST, OpCode.LESS, OpCode.POP_JUMP_IF_FALSE,
+        OpCode.LOAD_NAME, OpCode.LOAD_CONST, OpCode.ADD, OpCode.STORE_NAME,
+        OpCode.JUMP,
+        OpCode.LOAD_CONST, OpCode.RETURN_VALUE
+    ]
+    # Loop jumps back to the condition and the exit jumps past the loop
+    assert code.instructions[21] == 4
+    assert code.instructions[11] == 22
+
+
+def test_function_code_in_constant_pool():
+    code = compile_neo('''
+    func add(x, y) {
+        return x + y
+    }
+    ''')
+    function_code = code.constants[code.instructions[1]]
+    assert function_code.name == "add"
+    assert function_code.parameters == ("x", "y")
+    assert opcodes(function_code)[:4] == [OpCode.LOAD_NAME, OpCode.LOAD_NAME, OpCode.ADD, OpCode.RETURN_VALUE]
+
+
+def test_disassembler_listing():
+    listing = disassemble(compile_neo('''
+    func double(x) {
+        return x * 2
+    }
+    print(double(4))
+    '''))
+    assert "Disassembly of <program>:" in listing
+    assert "Disassembly of double (x):" in listing
+    assert re.search(r"LOAD_FUNCTION\s+\d+\s+\(double\)", listing)
+    assert re.search(r"CALL_BUILTIN\s+1", listing)
+    assert re.search(r"MULTIPLY", listing)
+
+
+def test_deep_recursion_does_not_use_python_stack(capsys):
+    program = '''
+    func count_down(n) {
+        if (n == 0) {
+            return 0
+        } else {
+            return 1 + count_down(n - 1)
+        }
+    }
+    print(count_down(20000))
+    '''
+    Interpreter(Parser(Lexer(SourceString(program))).parse_program(), "vm").run()
+    assert capsys.readouterr().out.strip() == "20000"
+
+
+def test_call_depth_limit_is_configurable():
+    code = compile_neo('''
+    func count_down(n) {
+        if (n == 0) {
+            return 0
+        }
+        return 1 + count_down(n - 1)
+    }
+    return count_down(10)
+    ''')
+    assert VM(max_call_depth=11).run(code) == 10
+    with pytest.raises(NeoRuntimeError, match="Maximum recursion depth exceeded"):
+        VM(max_call_depth=10).run(code)
+
+def test_tail_call_in_function_only():
+    code = compile_neo('''
+    func countdown(n) {
+        if (n == 0) {
+            return n
+        }
+        return countdown(n - 1)
+    }
+    return countdown(3)
+    ''')
+    function_code = code.constants[0]
+    assert opcodes(function_code)[-3:] == [OpCode.TAIL_CALL, OpCode.LOAD_CONST, OpCode.RETURN_VALUE]
+    assert OpCode.TAIL_CALL not in opcodes(code)
+
+
+def test_pipe_into_higher_order_builtin():
+    code = compile_neo('''
+    var m = [1, 2] |> map(func(x) { return x * 2 })
+    ''')
+    # The left side of the pipe is pushed as the first argument
+    assert opcodes(code)[:5] == [OpCode.LOAD_CONST, OpCode.LOAD_MATRIX, OpCode.MAKE_FUNCTION,
+                                 OpCode.CALL_HIGHER_ORDER_BUILTIN, OpCode.DECLARE_NAME]
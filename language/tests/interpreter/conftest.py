@@ -0,0 +1,9 @@
+import pytest
+from ...interpreter.Interpreter import Interpreter, engines
+
+
+@pytest.fixture(autouse=True, params=engines)
+def engine(request, monkeypatch):
+    """Run every interpreter test once per execution engine"""
+    monkeypatch.setattr(Interpreter, "default_engine", request.param)
+    return request.param
@@ -232,4 +232,122 @@ def test_anonymous_function_inline_argument(capsys):
     6
     14
     '''
-    run_neo_and_assert(program, expected, capsys) 
\ No newline at end of file
+    run_neo_and_assert(program, expected, capsys) 
+def test_recursive_call_in_argument_keeps_caller_parameters(capsys):
+    program = '''
+    func pair_sum(a, b) {
+        return a * 10 + b
+    }
+    print(pair_sum(1, pair_sum(2, 3)))
+    '''
+    expected = '''
+    33
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_recursive_tree_walk_with_local_helper(capsys):
+    program = '''
+    func count_nodes(depth) {
+        func children() {
+            return count_nodes(depth - 1) + count_nodes(depth - 1)
+        }
+        if (depth == 0) {
+            return 1
+        } else {
+            return 1 + children()
+        }
+    }
+    print(count_nodes(4))
+    '''
+    expected = '''
+    31
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_returned_closures_do_not_share_state(capsys):
+    program = '''
+    func make_adder(n) {
+        return func(x) {
+            return x + n
+        }
+    }
+    var add_one = make_adder(1)
+    var add_ten = make_adder(10)
+    print(add_one(5))
+    print(add_ten(5))
+    print(add_one(5))
+    '''
+    expected = '''
+    6
+    15
+    6
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_self_tail_call_does_not_grow_stack(capsys):
+    program = '''
+    func accumulate(n, acc, step) {
+        if (n == 0) {
+            return acc
+        }
+        return accumulate(n - 1, acc + step, step)
+    }
+    print(accumulate(20000, [0, 0], [1, 2]))
+    '''
+    expected = '''
+    -----------------
+    | 20000   40000 |
+    -----------------
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_mutual_tail_calls_do_not_grow_stack(capsys):
+    program = '''
+    func is_even(n) {
+        if (n == 0) {
+            return True
+        }
+        return is_odd(n - 1)
+    }
+    func is_odd(n) {
+        if (n == 0) {
+            return False
+        }
+        return n - 1 |> is_even
+    }
+    print(is_even(20001))
+    print(is_odd(20001))
+    '''
+    expected = '''
+    False
+    True
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_return_inside_loop_ends_function(capsys):
+    program = '''
+    func first_above(limit) {
+        var mut i = 0
+        while (True) {
+            i = i + 1
+            if (i * i > limit) {
+                return i
+            }
+        }
+        print("unreachable")
+    }
+    print(first_above(50))
+    '''
+    expected = '''
+    8
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_unbounded_recursion_raises_error(capsys):
+    program = '''
+    func f(n) {
+        return 1 + f(n + 1)
+    }
+    print(f(0))
+    '''
+    run_neo_and_assert(program, "Error at line: 3, column: 20. Maximum recursion depth exceeded", capsys)
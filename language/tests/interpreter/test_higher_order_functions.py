@@ -163,4 +163,155 @@ def test_function_returning_global_function(capsys):
     mult_op(8, 2): 16
     sub_op(8, 2): 6
     '''
-    run_neo_and_assert(program, expected, capsys)
\ No newline at end of file
+    run_neo_and_assert(program, expected, capsys)
+
+def test_map_filter_reduce_builtins(capsys):
+    program = '''
+    func square(x) {
+        return x * x
+    }
+
+    var m = [1, 2 | 3, 4]
+    print(map(m, square))
+    print(m |> filter(func(x) { return x > 2 }))
+    print(reduce(m, func(total, x) { return total + x }))
+    print(reduce(m, func(total, x) { return total * x }, 10))
+    '''
+    expected = '''
+    ----------
+    | 1   4  |
+    | 9   16 |
+    ----------
+    ---------
+    | 3   4 |
+    ---------
+    10
+    240
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_sum_and_range_builtins_in_pipes(capsys):
+    program = '''
+    print(range(4))
+    print(range(1, 10, 4) |> map(func(x) { return x * 2 }) |> sum)
+    print([0.5, 1 | 2, 3] |> sum)
+    '''
+    expected = '''
+    -----------------
+    | 0   1   2   3 |
+    -----------------
+    30
+    6.5
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_map_with_closures_and_recursion(capsys):
+    program = '''
+    func create_adder(base) {
+        return func(value) { return base + value }
+    }
+
+    func factorial(n, result) {
+        if (n <= 1) {
+            return result
+        }
+        return factorial(n - 1, result * n)
+    }
+
+    func counter(x) {
+        var mut count = 0
+        while (count < x) {
+            count = count + 1
+        }
+        return count
+    }
+
+    print(range(3) |> map(create_adder(10)))
+    print(range(1, 5) |> map(func(n) { return factorial(n, 1) }))
+    print(range(3) |> map(counter))
+    '''
+    expected = '''
+    ----------------
+    | 10   11   12 |
+    ----------------
+    ------------------
+    | 1   2   6   24 |
+    ------------------
+    -------------
+    | 0   1   2 |
+    -------------
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_map_with_wrong_function_raises_error(capsys):
+    program = '''
+    var m = [1, 2]
+    print(map(m, func(a, b) { return a + b }))
+    '''
+    run_neo_and_assert(program, "Error at line: 3, column: 11. Incorrect number of arguments", capsys)
+
+def test_sum_of_strings_raises_error(capsys):
+    program = '''
+    print(["a", "b"] |> sum)
+    '''
+    run_neo_and_assert(program, "Error at line: 2, column: 22. Function 'sum' expects a matrix of numbers", capsys)
+
+def test_variables_shadow_builtins(capsys):
+    program = '''
+    print([1, 2] |> sum)
+    var sum = 5
+    print(sum + 1)
+    {
+        var reduce = func(a, b) { return a }
+        print(reduce(7, 9))
+        print([1, 2] |> map(func(x) { return reduce(x, 0) }) |> sum |> range)
+    }
+    print(reduce([4, 5], func(a, b) { return a + b }))
+    '''
+    expected = '''
+    3
+    6
+    7
+    -------------
+    | 0   1   2 |
+    -------------
+    9
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_sum_of_bools_raises_error(capsys):
+    program = '''
+    print(sum([True, False]))
+    '''
+    run_neo_and_assert(program, "Error at line: 2, column: 11. Function 'sum' expects a matrix of numbers", capsys)
+
+def test_map_of_arithmetic_expression_matches_calls(capsys):
+    program = '''
+    func halve(x) {
+        return x / 2 - 1
+    }
+
+    func halve_called(x) {
+        var result = x / 2 - 1
+        return result
+    }
+
+    var m = range(100) |> map(func(x) { return x * 1.5 })
+    print(map(m, halve) == map(m, halve_called))
+    print(map([1, 2 | 3, 4], func(x) { return -x ^ 2 + 1 }))
+    '''
+    expected = '''
+    True
+    -----------
+    | 2    5  |
+    | 10   17 |
+    -----------
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_map_of_arithmetic_expression_reports_errors(capsys):
+    program = '''
+    var m = [1, 0]
+    print(map(m, func(x) { return 1 / x }))
+    '''
+    run_neo_and_assert(program, "Error at line: 3, column: 35. Cannot divide by zero", capsys)
@@ -3,6 +3,7 @@ from ...interpreter.Interpreter import Interpreter
 from ...lexer.Lexer import Lexer
 from ...parser.Parser import Parser
 from ...lexer.Source import SourceString
+from ...linalg import Decomposition
 
 def run_neo_and_assert(program, expected_output, capsys):
     source = SourceString(program)
@@ -200,3 +201,302 @@ def test_matrix_mutable_element_assignment(capsys):
     '''
     run_neo_and_assert(program, expected, capsys)
 
+
+def test_matrix_literal_is_evaluated_on_every_pass(capsys):
+    program = '''
+    var mut i = 0
+    while (i < 3) {
+        var m = [i, i * 2]
+        print(m)
+        i = i + 1
+    }
+    '''
+    expected = '''
+    ---------
+    | 0   0 |
+    ---------
+    ---------
+    | 1   2 |
+    ---------
+    ---------
+    | 2   4 |
+    ---------
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_constant_matrix_literal_is_not_shared_after_modification(capsys):
+    program = '''
+    func kernel() {
+        return [1, 2 | 3, [4, 5]]
+    }
+    var mut first = kernel()
+    var second = kernel()
+    first[0, 0] = 10
+    var mut nested = first[1, 1]
+    nested[0, 0] = 40
+    print(first[0, 0], second[0, 0], nested[0, 0])
+    print(second)
+    '''
+    expected = '''
+    10 1 40
+    -----------------
+    | 1       2     |
+    | 3   --------- |
+    |     | 4   5 | |
+    |     --------- |
+    -----------------
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_matrix_power_by_squaring(capsys):
+    program = '''
+    var fibonacci = [1, 1 | 1, 0]
+    var power = fibonacci ^ 90
+    print(power[0, 1])
+    print(fibonacci ^ 1)
+    '''
+    expected = '''
+    2880067194370816120
+    ---------
+    | 1   1 |
+    | 1   0 |
+    ---------
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_matrix_power_after_modification(capsys):
+    program = '''
+    var mut m = [1, 1 | 0, 1]
+    var mut square = m ^ 2
+    print(m ^ 4)
+    square[0, 0] = 7
+    m[0, 1] = 2
+    print(m ^ 2, m ^ 4)
+    '''
+    expected = '''
+    ---------
+    | 1   4 |
+    | 0   1 |
+    ---------
+    ---------
+    | 1   4 |
+    | 0   1 |
+    --------- ---------
+    | 1   8 |
+    | 0   1 |
+    ---------
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_matrix_multiplication_chain(capsys):
+    program = '''
+    var a = [1, 2 | 3, 4]
+    var v = [1 | 1]
+    print(a * a * v, 2 * a * v)
+    '''
+    expected = '''
+    ------
+    | 17 |
+    | 37 |
+    ------ ------
+    |  6 |
+    | 14 |
+    ------
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+def test_matrix_multiplication_chain_with_string(capsys):
+    program = '''
+    var a = [1, 2 | 3, 4]
+    print(a * a * "x")
+    '''
+    run_neo_and_assert(program, "Error at line: 3, column: 13. Strings cannot take part in multiply operation", capsys)
+
+
+def test_matrix_determinant_of_single_cell_and_singular_matrix(capsys):
+    program = '''
+    var single = [7]
+    var singular = [1, 2, 3 | 4, 5, 6 | 7, 8, 9]
+    var floats = [0.5, 1 | 2, 4]
+    print(single.det)
+    print(singular.det)
+    print(floats.det)
+    '''
+    expected = '''
+    7
+    0
+    0.0
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+
+def test_linear_algebra_builtins(capsys):
+    program = '''
+    var a = [4, 3 | 6, 3]
+    print(solve(a, [10 | 12]))
+    print(inverse(a) * a)
+    print(rank([1, 2, 3 | 2, 4, 6]))
+    var factors = lu(a)
+    print(factors[0, 2] * a == factors[0, 0] * factors[0, 1])
+    '''
+    expected = '''
+    -------
+    | 1.0 |
+    | 2.0 |
+    -------
+    -------------
+    | 1.0   0.0 |
+    | 0.0   1.0 |
+    -------------
+    1
+    True
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+
+def test_inverse_of_singular_matrix_raises_error(capsys):
+    program = '''
+    var m = [1, 2 | 2, 4]
+    print(inverse(m))
+    '''
+    run_neo_and_assert(program, "Error at line: 3, column: 11. Matrix is singular", capsys)
+
+
+def test_matrix_properties_follow_modifications(capsys):
+    program = '''
+    var mut m = [1, 2 | 3, 4]
+    print(m.det)
+    m[0, 0] = 5
+    print(m.det)
+    var mut t = m.transposed
+    t[0, 1] = 100
+    print(m.transposed)
+    '''
+    expected = '''
+    -2
+    14
+    ---------
+    | 5   3 |
+    | 2   4 |
+    ---------
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+
+def test_matrix_determinant_computed_once_per_version(capsys, monkeypatch):
+    computed = []
+    bareiss_determinant = Decomposition.bareiss_determinant
+    monkeypatch.setattr(Decomposition, "bareiss_determinant", lambda rows: computed.append(rows) or bareiss_determinant(rows))
+
+    program = '''
+    var mut m = [2, 0 | 0, 2]
+    var mut i = 0
+    while (i < m.det) {
+        i = i + 1
+    }
+    m[0, 0] = 3
+    print(m.det)
+    print(i)
+    '''
+    run_neo_and_assert(program, "6 4", capsys)
+    assert len(computed) == 2
+
+
+def test_elementwise_expression_sees_operands_at_evaluation(capsys):
+    program = '''
+    var mut a = ones(8)
+    var b = a * 2 + a - 0.5
+    a[0, 0] = 10
+    print(b[0, 0] + b[7, 7])
+    print(a[0, 0] + b.rowlen)
+    '''
+    expected = '''
+    5.0
+    18
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+
+def test_copy_and_transposed_are_independent_of_the_matrix(capsys):
+    program = '''
+    var mut m = [1, 2, 3 | 4, 5, 6]
+    var mut c = m.copy
+    var mut t = m.transposed
+    m[0, 1] = 20
+    c[1, 0] = 40
+    print(t[1, 0] + t[2, 1])
+    t[0, 0] = 10
+    print(m[0, 0] + m[0, 1] + c[0, 1] + c[1, 0] + t[0, 0])
+    '''
+    expected = '''
+    8
+    73
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+
+def test_matrix_slices_and_block_assignment(capsys):
+    program = '''
+    var mut m = [1, 2, 3 | 4, 5, 6 | 7, 8, 9]
+    var column = m[:, 2]
+    var corner = m[1:, 1:]
+    m[1:3, 1:3] = [50, 60 | 80, 90]
+    m[0, :] = 0
+    print(column)
+    print(corner)
+    print(m)
+    var i = 1
+    print(m[i:, 0])
+    '''
+    expected = '''
+    -----
+    | 3 |
+    | 6 |
+    | 9 |
+    -----
+    ---------
+    | 5   6 |
+    | 8   9 |
+    ---------
+    ---------------
+    | 0   0    0  |
+    | 4   50   60 |
+    | 7   80   90 |
+    ---------------
+    -----
+    | 4 |
+    | 7 |
+    -----
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+
+def test_block_assignment_of_wrong_shape_raises_error(capsys):
+    program = '''
+    var mut m = zeros(3)
+    m[0:2, 0:2] = ones(3)
+    '''
+    run_neo_and_assert(program, "Error at line: 2, column: 17. Matrix of shape 2x2 expected", capsys)
+
+
+def test_access_out_of_bounds_raises_error(capsys):
+    program = '''
+    var m = [1, 2 | 3, 4]
+    var s = ["a", "b"]
+    print(m[1, -2])
+    print(s[0, 2])
+    '''
+    run_neo_and_assert(program, "3 Error at line: 3, column: 13. Index out of matrix bounds", capsys)
+
+
+def test_slice_with_index_out_of_bounds_raises_error(capsys):
+    program = '''
+    var mut m = [1, 2 | 3, 4]
+    print(m[5, :])
+    '''
+    run_neo_and_assert(program, "Error at line: 2, column: 17. Index out of matrix bounds", capsys)
+    program = '''
+    var mut m = [1, 2 | 3, 4]
+    m[2, :] = 5
+    '''
+    run_neo_and_assert(program, "Error at line: 2, column: 17. Index out of matrix bounds", capsys)
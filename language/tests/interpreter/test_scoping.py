@@ -213,3 +213,69 @@ def test_function_declaration_scoping(capsys):
     Outer inner_func result: inner
     '''
     run_neo_and_assert(program, expected, capsys)
+
+def test_use_before_declaration_in_block_refers_to_outer_variable(capsys):
+    program = '''
+    var a = 1
+    {
+        print(a)
+        var a = 2
+        print(a)
+    }
+    '''
+    run_neo_and_assert(program, "1 2", capsys)
+
+def test_use_before_declaration_in_function_refers_to_global(capsys):
+    program = '''
+    var a = 1
+    func f() {
+        print(a)
+        var a = 2
+        return a
+    }
+    print(f())
+    '''
+    run_neo_and_assert(program, "1 2", capsys)
+
+def test_loop_block_variables_are_undeclared_on_every_iteration(capsys):
+    program = '''
+    var mut i = 0
+    while (i < 2) {
+        if (i == 1) { print(x) }
+        var x = 5
+        i = i + 1
+    }
+    '''
+    run_neo_and_assert(program, "Error at line: 4, column: 29. Variable 'x' doesn't exist", capsys)
+
+def test_closures_capture_variables_of_their_own_loop_iteration(capsys):
+    program = '''
+    var mut i = 0
+    var mut f0 = 0
+    var mut f1 = 0
+    while (i < 2) {
+        var j = i * 10
+        if (i == 0) { f0 = func() { return j } }
+        if (i == 1) { f1 = func() { return j } }
+        i = i + 1
+    }
+    print(f0(), f1())
+    '''
+    run_neo_and_assert(program, "0 10", capsys)
+
+def test_call_skips_variables_which_are_not_functions(capsys):
+    program = '''
+    func f(x) {
+        return x + 1
+    }
+    func g() {
+        var f = 5
+        return f(f)
+    }
+    print(g())
+    {
+        var f = 10
+        print(f |> f)
+    }
+    '''
+    run_neo_and_assert(program, "6 11", capsys)
@@ -0,0 +1,110 @@
+import re
+from ...interpreter.Interpreter import Interpreter
+from ...lexer.Lexer import Lexer
+from ...parser.Parser import Parser
+from ...lexer.Source import SourceString
+from ...nodes.Expressions import Matrix, SparseMatrix
+
+def run_neo_and_assert(program, expected_output, capsys):
+    source = SourceString(program)
+    lexer = Lexer(source)
+    parser = Parser(lexer)
+    interpreter = Interpreter(parser.parse_program())
+    interpreter.run()
+    captured = capsys.readouterr()
+    assert re.sub(r'\s+', '', captured.out) == re.sub(r'\s+', '', expected_output)
+
+
+def test_sparse_matrix_assignment_access_and_summary(capsys):
+    program = '''
+    var mut s = sparse(1000, 500)
+    var mut i = 0
+    while (i < 500) {
+        s[i, i] = i + 1
+        i = i + 1
+    }
+    s[0, 0] = 0
+    print(s[3, 3] + s[3, 4] + s[0, 0])
+    print(s.rowlen)
+    print(s.collen)
+    print(s)
+    '''
+    expected = '''
+    4
+    1000
+    500
+    <sparse 1000x500 matrix, 499 nonzeros>
+      (1, 1) 2
+      (2, 2) 3
+      (3, 3) 4
+      (4, 4) 5
+      (5, 5) 6
+      (6, 6) 7
+      (7, 7) 8
+      (8, 8) 9
+      (9, 9) 10
+      (10, 10) 11
+      ...
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+
+def test_sparse_and_dense_arithmetic(capsys):
+    program = '''
+    var a = sparse([1, 0 | 0, 3])
+    var b = sparse([0, 2 | 0, 1])
+    print(a + b)
+    print(a * b)
+    print(a - [1, 1 | 1, 1])
+    print([1, 2 | 3, 4] * b)
+    print(dense(a * 2) == [2, 0 | 0, 6])
+    '''
+    expected = '''
+    <sparse 2x2 matrix, 3 nonzeros>
+      (0, 0) 1
+      (0, 1) 2
+      (1, 1) 4
+    <sparse 2x2 matrix, 2 nonzeros>
+      (0, 1) 2
+      (1, 1) 3
+    -----------
+    | 0    -1 |
+    | -1   2  |
+    -----------
+    ----------
+    | 0   4  |
+    | 0   10 |
+    ----------
+    True
+    '''
+    run_neo_and_assert(program, expected, capsys)
+
+
+def test_sparse_matrix_holds_only_scalars(capsys):
+    program = '''
+    var mut s = sparse(2)
+    s[0, 1] = "text"
+    '''
+    run_neo_and_assert(program, "Error at line: 2, column: 17. Sparse matrix can hold only scalars", capsys)
+
+
+def test_sparse_matrix_negative_indices_count_from_end(capsys):
+    program = '''
+    var m = [1, 2 | 3, 4]
+    var mut s = sparse(m)
+    s[-1, -2] = 5
+    print(s[-1, 0], m[-1, 0], s[1, -1], s[0, -2])
+    print(s[-3, 0])
+    '''
+    run_neo_and_assert(program, "5 3 4 1 Error at line: 3, column: 17. Index out of matrix bounds", capsys)
+
+
+def test_sparse_storage_scales_with_nonzeros():
+    sparse = SparseMatrix(100000, 100000)
+    for i in range(0, 100000, 1000):
+        sparse.store(i, 99999 - i, 1.5)
+    sparse.compress()
+    assert len(sparse.indices) == len(sparse.data) == 100
+    assert sparse.transposed().load(99999, 0) == 1.5
+    assert (sparse * sparse.transposed()).nonzeros() == 100
+    assert SparseMatrix.from_rows([[0, 1], [2, 0]]) * Matrix([[1], [1]]) == Matrix([[1], [2]])
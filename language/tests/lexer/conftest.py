@@ -0,0 +1,9 @@
+import pytest
+from ...lexer.Lexer import Lexer, engines
+
+
+@pytest.fixture(autouse=True, params=engines)
+def engine(request, monkeypatch):
+    """Run every lexer test once per lexer engine"""
+    monkeypatch.setattr(Lexer, "default_engine", request.param)
+    return request.param
@@ -1,6 +1,9 @@
-from ...lexer.Lexer import Lexer
+from ...lexer.Lexer import Lexer, engines
+from ...errors.LexerExceptions import LexerError
 from ...lexer.Token import TokenType
-from ...lexer.Source import SourceString
+import pytest
+from ...lexer import Source
+from ...lexer.Source import SourceFile, SourceString
 
 def test_lexer_token_values():
     neo_code = '''
@@ -67,4 +70,58 @@ def test_lexer_program():
     lexer = Lexer(SourceString(neo_code))
     tokens = list(lexer.yield_tokens())
     token_types = [token.token_type for token in tokens]
-    assert token_types == expected_types, f"Token types {token_types} != expected {expected_types}"
\ No newline at end of file
+    assert token_types == expected_types, f"Token types {token_types} != expected {expected_types}"
+
+def test_lexer_token_positions():
+    neo_code = 'var x = 1\n  print(x)'
+    expected = [(1, 1), (1, 5), (1, 7), (1, 9), (2, 3), (2, 8), (2, 9), (2, 10)]
+    tokens = list(Lexer(SourceString(neo_code)).yield_tokens())
+    assert [(token.line, token.column) for token in tokens[:len(expected)]] == expected
+    assert not hasattr(tokens[0], "__dict__")
+
+def test_source_positions_are_computed_from_offsets():
+    source = SourceString('ab\n\ncd')
+    # A newline is at column 0 of the line it starts, the end of the input follows the last character
+    expected = [(1, 1), (1, 2), (2, 0), (3, 0), (3, 1), (3, 2), (3, 3)]
+    assert [source.position_of(offset) for offset in range(7)] == expected
+    source.move_to(5)
+    assert (source.current_char, source.current_line, source.current_column) == ('d', 3, 2)
+    assert source.move_to_next_char() == ''
+
+@pytest.mark.parametrize("mmap_threshold", [0, Source.MMAP_THRESHOLD])
+def test_source_file_gives_tokens_of_its_text(tmp_path, monkeypatch, mmap_threshold):
+    monkeypatch.setattr(Source, "MMAP_THRESHOLD", mmap_threshold)
+    neo_code = 'var x = 1.5 # comment\n  print("a b", x)\n'
+    path = tmp_path / "program.neo"
+    path.write_bytes(neo_code.replace('\n', '\r\n').encode())
+    from_file = [(token.token_type, token.value, token.line, token.column) for token in Lexer(SourceFile(path)).yield_tokens()]
+    from_string = [(token.token_type, token.value, token.line, token.column) for token in Lexer(SourceString(neo_code)).yield_tokens()]
+    assert from_file == from_string
+    assert from_file[-1] == (TokenType.EOF, '', 3, 1)
+
+def test_lexer_tokens_of_other_scripts_and_escapes():
+    neo_code = 'zażółć = 1.5٥ + 00\n"a\\"b\nc" # end'
+    tokens = [(token.token_type, token.value, token.line, token.column) for token in Lexer(SourceString(neo_code)).yield_tokens()]
+    assert tokens == [
+        (TokenType.IDENTIFIER, 'zażółć', 1, 1), (TokenType.ASSIGN, '=', 1, 8), (TokenType.SCALAR, 1.55, 1, 10),
+        (TokenType.PLUS, '+', 1, 15), (TokenType.SCALAR, 0, 1, 17), (TokenType.SCALAR, 0, 1, 18),
+        (TokenType.STRING, 'a"b\nc', 2, 1), (TokenType.EOF, '', 3, 10)
+    ]
+
+@pytest.mark.parametrize("neo_code, message", [
+    ('x = 1 $', 'Cant identify token. There is no match. Error at line: 1, column: 7. Char: $'),
+    ('\n  "never closed', 'Failed to build a string. No matching right quotation mark. Error at line: 2, column: 3'),
+    ('x = "' + 'a' * 600 + '"', 'Exceeded max length of a string. Error at line: 1, column: 5'),
+    ('var ' + 'a' * 101, 'Exceeded max length of an identifier. Error at line: 1, column: 5'),
+])
+def test_lexer_errors(neo_code, message):
+    with pytest.raises(LexerError) as error:
+        list(Lexer(SourceString(neo_code)).yield_tokens())
+    assert error.value.message == message
+
+def test_lexer_engines_give_the_same_tokens():
+    neo_code = 'func f(x) {\n  # comment\n  return x * 2 |> g("s \\" t")\n}\nvar m = [1, 0.5 | -3, 4.]'
+    tokens = {engine: [(token.token_type, token.value, token.line, token.column)
+                       for token in Lexer(SourceString(neo_code), engine=engine).yield_tokens()]
+              for engine in engines}
+    assert tokens["regex"] == tokens["hand"]
@@ -0,0 +1,137 @@
+import random
+from fractions import Fraction
+import pytest
+from ...interpreter.Built_ins import builtin_functions
+from ...linalg import Decomposition
+from ...linalg.Decomposition import LUFactorization, bareiss_determinant, determinant
+from ...nodes.Expressions import Matrix
+
+
+def cofactor_determinant(rows):
+    if len(rows) == 1:
+        return rows[0][0]
+    return sum((-1) ** c * rows[0][c] * cofactor_determinant([row[:c] + row[c + 1:] for row in rows[1:]])
+               for c in range(len(rows)))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 6])
+def test_bareiss_equals_cofactor_expansion(size):
+    random.seed(size)
+    rows = [[random.randint(-9, 9) for _ in range(size)] for _ in range(size)]
+    assert bareiss_determinant(rows) == cofactor_determinant(rows)
+
+
+def test_bareiss_is_exact_for_large_integers():
+    random.seed(4)
+    size = 12
+    rows = [[random.randint(-10**12, 10**12) for _ in range(size)] for _ in range(size)]
+    # The determinant has about 150 digits, far beyond what a float keeps exactly
+    assert bareiss_determinant(rows) == exact_determinant([[Fraction(cell) for cell in row] for row in rows])
+
+
+def exact_determinant(rows):
+    # Gaussian elimination on fractions, the reference for the Bareiss result
+    rows = [list(row) for row in rows]
+    result = Fraction(1)
+    for k in range(len(rows)):
+        pivot = next(i for i in range(k, len(rows)) if rows[i][k] != 0)
+        if pivot != k:
+            rows[k], rows[pivot] = rows[pivot], rows[k]
+            result = -result
+        result *= rows[k][k]
+        for i in range(k + 1, len(rows)):
+            factor = rows[i][k] / rows[k][k]
+            rows[i] = [a - factor * b for a, b in zip(rows[i], rows[k])]
+    return result
+
+
+def test_bareiss_swaps_rows_on_zero_pivot():
+    assert bareiss_determinant([[0, 1], [1, 0]]) == -1
+    assert bareiss_determinant([[0, 2, 1], [3, 0, 0], [0, 0, 4]]) == -24
+
+
+def test_singular_matrices_are_detected():
+    assert determinant([[1, 2, 3], [2, 4, 6], [7, 8, 9]]) == 0
+    factorization = LUFactorization([[1.5, 2.0, 3.0], [0.0, 0.0, 0.0], [1.0, 1.0, 1.0]])
+    assert factorization.singular
+    assert factorization.determinant() == 0.0
+
+
+def test_lu_determinant_of_floats():
+    random.seed(3)
+    rows = [[random.random() for _ in range(8)] for _ in range(8)]
+    assert determinant(rows) == pytest.approx(float(exact_determinant([[Fraction(cell) for cell in row] for row in rows])))
+
+
+def multiply(left, right):
+    return [[sum(a * b for a, b in zip(row, column)) for column in zip(*right)] for row in left]
+
+
+@pytest.mark.parametrize("rows", [
+    [[2.0, 1.0, 1.0], [4.0, -6.0, 0.0], [-2.0, 7.0, 2.0]],
+    [[1, 2, 3], [2, 4, 6], [1, 0, 1]],
+    [[0, 1, 2, 3], [0, 2, 4, 7], [0, 0, 0, 1]],
+])
+def test_lu_factors_reconstruct_permuted_matrix(rows):
+    factorization = LUFactorization(rows)
+    product = multiply(factorization.lower, factorization.upper)
+    permuted = multiply(factorization.permutation_matrix(), rows)
+    for product_row, permuted_row in zip(product, permuted):
+        assert product_row == pytest.approx(permuted_row)
+
+
+@pytest.mark.parametrize("rows, rank", [
+    ([[1, 2], [3, 4]], 2),
+    ([[1, 2, 3], [2, 4, 6], [1, 0, 1]], 2),
+    ([[0, 1, 2, 3], [0, 2, 4, 7], [0, 0, 0, 1]], 2),
+    ([[0.1, 0.2], [0.3, 0.6]], 1),
+    ([[0, 0], [0, 0]], 0),
+])
+def test_rank(rows, rank):
+    assert LUFactorization(rows).rank == rank
+
+
+def test_solve_and_inverse():
+    random.seed(5)
+    rows = [[random.random() for _ in range(6)] for _ in range(6)]
+    factorization = LUFactorization(rows)
+    identity = [[1.0 if i == j else 0.0 for j in range(6)] for i in range(6)]
+    for product_row, identity_row in zip(multiply(rows, factorization.inverse()), identity):
+        assert product_row == pytest.approx(identity_row)
+    right_side = [[1.0, 2.0]] * 6
+    for product_row, right_row in zip(multiply(rows, factorization.solve(right_side)), right_side):
+        assert product_row == pytest.approx(right_row)
+
+
+def test_builtins_reuse_factorization_until_matrix_is_modified(monkeypatch):
+    factorizations = []
+    class CountingFactorization(Decomposition.LUFactorization):
+        def __init__(self, rows):
+            factorizations.append(rows)
+            super().__init__(rows)
+    monkeypatch.setattr(Decomposition, "LUFactorization", CountingFactorization)
+
+    matrix = Matrix([[2.0, 1.0], [1.0, 3.0]])
+    builtin_functions["inverse"](1, 1, matrix)
+    builtin_functions["solve"](1, 1, matrix, Matrix([[1], [2]]))
+    builtin_functions["rank"](1, 1, matrix)
+    assert matrix.determinant() == pytest.approx(5.0)
+    assert len(factorizations) == 1
+
+    matrix.store(0, 0, 4.0)
+    assert builtin_functions["rank"](1, 1, matrix) == 2
+    assert len(factorizations) == 2
+
+
+def test_determinant_stops_at_first_column_without_pivot():
+    rows = [[0.0, 1.0, 2.0], [0.0, 3.0, 4.0], [0.0, 5.0, 7.0]]
+    factorization = LUFactorization(rows, stop_when_singular=True)
+    assert not factorization.complete
+    assert factorization.rank == 0
+    assert factorization.determinant() == 0.0
+    assert LUFactorization(rows).complete
+
+    matrix = Matrix(rows)
+    assert matrix.determinant() == 0.0
+    assert matrix.factorization is None
+    assert matrix.factorize().rank == 2
@@ -0,0 +1,84 @@
+import pytest
+from ...linalg import NumpyBackend
+from ...nodes.Expressions import Matrix
+from ...errors.InterpreterExceptions import NeoRuntimeError
+
+
+@pytest.fixture(autouse=True)
+def list_backend(monkeypatch):
+    monkeypatch.setattr(NumpyBackend, "enabled", False)
+
+
+def test_cells_of_one_number_type_are_stored_flat():
+    assert Matrix.from_rows([[1, 2], [3, 4]]).cells.typecode == 'q'
+    assert Matrix.from_rows([[1.0, 2.0], [3.0, 4.0]]).cells.typecode == 'd'
+    # Mixed cells print differently than floats, bools and big ints do not fit
+    for rows in ([[1, 2.0]], [[True, False]], [[2 ** 70, 1]], [["a", 1]]):
+        matrix = Matrix.from_rows(rows)
+        assert matrix.cells is None and matrix.rows == rows
+
+
+def test_cells_are_addressed_by_stride():
+    matrix = Matrix.from_rows([[1, 2, 3], [4, 5, 6]])
+    assert (matrix.rowlen(), matrix.collen()) == (2, 3)
+    assert matrix.load(1, 0) == 4 and matrix.load(-1, -1) == 6
+    matrix.store(0, -1, 30)
+    assert list(matrix.cells) == [1, 2, 30, 4, 5, 6]
+    assert matrix.rows == [[1, 2, 30], [4, 5, 6]]
+    with pytest.raises(NeoRuntimeError, match="Index out of matrix bounds"):
+        matrix.load(0, 3)
+
+
+def test_storing_another_type_moves_the_matrix_to_lists():
+    matrix = Matrix.from_rows([[1, 2], [3, 4]])
+    matrix.store(0, 0, 0.5)
+    assert matrix.cells is None
+    assert matrix.rows == [[0.5, 2], [3, 4]]
+
+
+@pytest.mark.parametrize("operation", [
+    lambda a, b: a + b,
+    lambda a, b: a - b,
+    lambda a, b: 2.5 - a,
+    lambda a, b: a * 3,
+    lambda a, b: -a,
+    lambda a, b: a * b.transposed(),
+    lambda a, b: a.transposed(),
+])
+def test_results_equal_those_of_lists(operation):
+    rows_a, rows_b = [[1, -2, 3], [4, 5, -6]], [[7, 8, 9], [-1, 0, 2]]
+    flat = operation(Matrix.from_rows(rows_a), Matrix.from_rows(rows_b))
+    lists = operation(Matrix(rows_a), Matrix(rows_b))
+    assert flat.cells is not None
+    assert flat.rows == lists.rows
+    assert [type(cell) for row in flat.rows for cell in row] == [type(cell) for row in lists.rows for cell in row]
+
+
+def test_overflowing_results_stay_on_lists():
+    matrix = Matrix.from_rows([[2 ** 62, 1]])
+    result = matrix + matrix
+    assert result.cells is None
+    assert result.rows == [[2 ** 63, 2]]
+
+
+def test_copy_shares_cells_until_written():
+    matrix = Matrix.from_rows([[1.0, 2.0], [3.0, 4.0]])
+    copy = matrix.copy()
+    assert copy.cells is matrix.cells
+    copy.store(0, 0, 10.0)
+    assert matrix.load(0, 0) == 1.0 and copy.load(0, 0) == 10.0
+
+
+def test_blocks_are_read_and_written_in_place():
+    matrix = Matrix.filled(4, 4, 0)
+    matrix.store(slice(1, 3), slice(2, None), Matrix.from_rows([[1, 2], [3, 4]]))
+    matrix.store(3, slice(None), 9)
+    assert matrix.cells is not None
+    assert matrix.rows == [[0, 0, 0, 0], [0, 0, 1, 2], [0, 0, 3, 4], [9, 9, 9, 9]]
+    assert matrix.load(slice(1, None), slice(2, None)).rows == [[1, 2], [3, 4], [9, 9]]
+
+
+def test_matrix_keeps_attributes_in_slots():
+    matrix = Matrix.filled(2, 2, 1.0)
+    assert not hasattr(matrix, "__dict__")
+    assert Matrix.properties["det"](matrix) == 0.0
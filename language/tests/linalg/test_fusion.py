@@ -0,0 +1,56 @@
+import random
+import pytest
+from ...linalg import Fusion, NumpyBackend
+from ...nodes.Expressions import LazyMatrix, Matrix
+
+
+@pytest.fixture(autouse=True)
+def list_backend(monkeypatch):
+    monkeypatch.setattr(NumpyBackend, "enabled", False)
+
+
+def random_matrix(size=10, cell=random.random):
+    return Matrix([[cell() for _ in range(size)] for _ in range(size)])
+
+
+def eagerly(operation, monkeypatch):
+    with monkeypatch.context() as patch:
+        patch.setattr(Fusion, "enabled", False)
+        return operation()
+
+
+@pytest.mark.parametrize("operation", [
+    lambda a, b, c: a + b * 2 - c,
+    lambda a, b, c: -(a - 1.5) + 3 * c,
+    lambda a, b, c: 1 - a - (b + c) * 0.5,
+])
+def test_fused_results_equal_eager_results(operation, monkeypatch):
+    random.seed(1)
+    a, b, c = random_matrix(), random_matrix(), random_matrix(cell=lambda: random.randint(-5, 5))
+    fused = operation(a, b, c)
+    assert isinstance(fused, LazyMatrix) and fused.expression is not None
+    assert fused.rows == eagerly(lambda: operation(a, b, c), monkeypatch).rows
+
+
+def test_expression_keeps_operands_as_they_were():
+    a, b = random_matrix(), random_matrix()
+    expected = [[x + y for x, y in zip(row_a, row_b)] for row_a, row_b in zip(a.rows, b.rows)]
+    result = a + b
+    a.store(0, 0, 100.0)
+    assert result.rows == expected
+    assert a.rows[0][0] == 100.0
+
+
+def test_small_and_non_numeric_matrices_are_computed_eagerly():
+    assert not isinstance(Matrix([[1, 2], [3, 4]]) + 1, LazyMatrix)
+    strings = Matrix([["a"] * 10 for _ in range(10)])
+    assert not isinstance(strings * 2, LazyMatrix)
+
+
+def test_long_expressions_are_cut():
+    matrix = random_matrix(cell=lambda: random.randint(0, 9))
+    result = matrix
+    for _ in range(3 * Fusion.MAX_FUSED_OPERATIONS):
+        result = result + 1
+        assert result.operations <= Fusion.MAX_FUSED_OPERATIONS
+    assert result.rows == [[cell + 3 * Fusion.MAX_FUSED_OPERATIONS for cell in row] for row in matrix.rows]
@@ -0,0 +1,43 @@
+from ...lexer.Lexer import Lexer
+from ...parser.Parser import Parser
+from ...lexer.Source import SourceString
+from ...linalg.MatrixChain import MatrixChain, plan_order
+from ...nodes.Expressions import Matrix
+
+
+def chain_of(neo_expression):
+    return MatrixChain(Parser(Lexer(SourceString(neo_expression))).parse_program().toplevel_objects[0])
+
+
+def ones(rows_count, cols_count):
+    return Matrix([[1] * cols_count for _ in range(rows_count)])
+
+
+def test_plan_of_textbook_chain():
+    # ((A1 (A2 A3)) ((A4 A5) A6)) with 15125 scalar multiplications
+    split = plan_order([30, 35, 15, 5, 10, 20, 25])
+    assert split[0][5] == 2
+    assert split[0][2] == 0
+    assert split[3][5] == 4
+
+
+def test_operands_of_nested_multiplications():
+    chain = chain_of('a * b * (c * d)')
+    assert [operand.value for operand in chain.operands] == ['a', 'b', 'c', 'd']
+
+
+def test_vector_is_multiplied_first():
+    chain = chain_of('a * b * v')
+    result = chain.evaluate([ones(20, 20), ones(20, 20), ones(20, 1)])
+    assert result.rows == [[400]] * 20
+    assert chain.split[0][2] == 0
+
+
+def test_plan_is_kept_for_the_same_shapes():
+    chain = chain_of('a * b * c')
+    chain.evaluate([ones(2, 3), ones(3, 4), ones(4, 5)])
+    split = chain.split
+    chain.evaluate([ones(2, 3), ones(3, 4), ones(4, 5)])
+    assert chain.split is split
+    chain.evaluate([ones(5, 4), ones(4, 3), ones(3, 2)])
+    assert chain.split is not split
@@ -0,0 +1,42 @@
+import random
+import pytest
+from ...linalg.Multiplication import blocked, multiply
+
+
+def triple_loop(left, right):
+    result = [[0 for _ in range(len(right[0]))] for _ in range(len(left))]
+    for i in range(len(left)):
+        for j in range(len(right[0])):
+            for k in range(len(right)):
+                result[i][j] += left[i][k] * right[k][j]
+    return result
+
+
+def random_rows(rows_count, cols_count, cell):
+    return [[cell() for _ in range(cols_count)] for _ in range(rows_count)]
+
+
+@pytest.mark.parametrize("shape", [(1, 1, 1), (5, 7, 3), (40, 33, 70)])
+def test_tiled_kernel_equals_triple_loop(shape):
+    random.seed(1)
+    m, k, n = shape
+    left, right = random_rows(m, k, random.random), random_rows(k, n, random.random)
+    # Dot products add their terms in the same order, so even floats are equal
+    assert blocked(left, right, 8) == triple_loop(left, right)
+
+
+@pytest.mark.parametrize("shape", [(8, 8, 8), (13, 9, 21), (33, 40, 17)])
+def test_strassen_equals_triple_loop_for_ints(shape):
+    random.seed(2)
+    m, k, n = shape
+    cell = lambda: random.randint(-50, 50)
+    left, right = random_rows(m, k, cell), random_rows(k, n, cell)
+    assert multiply(left, right, strassen_threshold=2) == triple_loop(left, right)
+
+
+def test_strassen_is_not_used_for_mixed_cells():
+    left = [[1, 2.5], [3, 4]]
+    right = [[1, 0], [0, 1]]
+    # 1 * 1 + 2.5 * 0 is a float but 3 * 0 + 4 * 1 stays an int
+    assert multiply(left, right, strassen_threshold=1) == [[1.0, 2.5], [3, 4]]
+    assert type(multiply(left, right, strassen_threshold=1)[1][1]) is int
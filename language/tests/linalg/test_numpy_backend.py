@@ -0,0 +1,83 @@
+import pytest
+from ...linalg import NumpyBackend
+from ...nodes.Expressions import Matrix
+
+numpy = pytest.importorskip("numpy")
+if not NumpyBackend.enabled:
+    pytest.skip("NumPy backend disabled with NEO_NUMPY=0", allow_module_level=True)
+
+
+def matrix(rows_count, cols_count, cell=lambda i, j: i * 7 + j):
+    return Matrix([[cell(i, j) for j in range(cols_count)] for i in range(rows_count)])
+
+
+def on_lists(operation, monkeypatch):
+    with monkeypatch.context() as patch:
+        patch.setattr(NumpyBackend, "enabled", False)
+        return operation()
+
+
+@pytest.mark.parametrize("operation", [
+    lambda a, b: a * b.transposed(),
+    lambda a, b: a + b,
+    lambda a, b: a - b,
+    lambda a, b: 3 - a,
+    lambda a, b: -a * 2.5,
+])
+def test_array_results_match_lists(operation, monkeypatch):
+    a, b = matrix(10, 12), matrix(10, 12, lambda i, j: i - j)
+    result = operation(a, b)
+    assert result.array is not None
+    expected = on_lists(lambda: operation(matrix(10, 12), matrix(10, 12, lambda i, j: i - j)), monkeypatch)
+    assert result.rows == expected.rows
+    assert [type(cell) for cell in result.rows[0]] == [type(cell) for cell in expected.rows[0]]
+
+
+def test_reflected_subtract_keeps_sign_of_zeros(monkeypatch):
+    result = 0.5 - matrix(8, 8, lambda i, j: 0.5)
+    assert result.array is not None
+    expected = on_lists(lambda: 0.5 - matrix(8, 8, lambda i, j: 0.5), monkeypatch)
+    assert str(result.rows) == str(expected.rows) == str([[0.0] * 8] * 8)
+
+def test_small_mixed_and_nested_matrices_stay_on_lists():
+    assert matrix(2, 2).as_array() is None
+    assert matrix(10, 10, lambda i, j: 1.5 if i == j else 1).as_array() is None
+    assert matrix(10, 10, lambda i, j: "x").as_array() is None
+    assert matrix(10, 10, lambda i, j: matrix(2, 2)).as_array() is None
+
+
+def test_integer_overflow_falls_back_to_lists():
+    big = matrix(10, 10, lambda i, j: 2 ** 40)
+    result = big * big
+    assert result.array is None
+    assert result.rows[0][0] == 10 * 2 ** 80
+
+
+def test_store_of_other_type_moves_matrix_to_lists():
+    result = matrix(10, 10) + 1
+    result.store(0, 0, "text")
+    assert result.array is None
+    assert result.rows[0][:2] == ["text", 2]
+
+
+def test_transposed_array_is_a_view_until_written():
+    original = matrix(10, 12)
+    transposed = original.transposed()
+    assert numpy.shares_memory(transposed.array, original.array)
+
+    original.store(0, 1, -5)
+    assert transposed.load(1, 0) == 1
+    transposed.store(2, 0, 100)
+    assert original.load(0, 2) == 2
+
+
+def test_slices_of_arrays_are_views_and_blocks_are_stored_natively():
+    original = matrix(10, 10)
+    block = original.load(slice(0, 2), slice(None))
+    assert numpy.shares_memory(block.array, original.array)
+
+    original.store(slice(0, 8), slice(2, 10), matrix(8, 8, lambda i, j: -1))
+    assert original.array is not None and original.load(7, 9) == -1
+    assert block.load(0, 0) == 0
+    original.store(slice(0, 1), slice(None), 0.5)
+    assert original.array is None and original.load(0, 3) == 0.5
@@ -0,0 +1,47 @@
+import random
+import pytest
+from ...linalg import FlatStorage, NumpyBackend, ParallelMultiplication
+from ...linalg.Multiplication import blocked
+from ...nodes.Expressions import Matrix
+
+
+@pytest.fixture(autouse=True)
+def parallel_kernel(monkeypatch):
+    monkeypatch.setattr(NumpyBackend, "enabled", False)
+    monkeypatch.setattr(ParallelMultiplication, "workers", 2)
+    monkeypatch.setattr(ParallelMultiplication, "threshold", 4)
+    yield
+    ParallelMultiplication.close_pool()
+
+
+def random_rows(rows_count, columns_count, cell=random.random):
+    return [[cell() for _ in range(columns_count)] for _ in range(rows_count)]
+
+
+@pytest.mark.parametrize("shape", [(9, 7, 5), (1, 6, 12), (12, 4, 1)])
+def test_parallel_product_equals_textbook_order(shape):
+    random.seed(2)
+    rows_count, inner, columns_count = shape
+    left, right = random_rows(rows_count, inner), random_rows(inner, columns_count)
+    cells = ParallelMultiplication.multiply(FlatStorage.to_cells(left), FlatStorage.to_cells(right), *shape)
+    assert FlatStorage.to_rows(cells, columns_count) == blocked(left, right, 32)
+
+
+def test_matrix_product_uses_the_pool_for_numbers_only():
+    random.seed(3)
+    left = Matrix(random_rows(6, 6, lambda: random.randint(-9, 9)))
+    right = Matrix(random_rows(6, 6, lambda: random.randint(-9, 9)))
+    product = left * right
+    assert product.cells is not None and product.cells.typecode == 'q'
+    assert product.rows == blocked(left.rows, right.rows, 32)
+
+    # Mixed cells stay on the serial kernel
+    mixed = Matrix([[1, 2.5] * 3] * 6)
+    assert (mixed * right).cells is None
+
+
+def test_int_products_beyond_int64_are_computed_with_python_ints():
+    big = Matrix.from_rows([[2 ** 40] * 5] * 5)
+    product = big * big
+    assert product.cells is None
+    assert product.rows[0][0] == 5 * 2 ** 80
@@ -0,0 +1,60 @@
+import pytest
+from ...errors.InterpreterExceptions import NeoRuntimeError
+from ...linalg import NumpyBackend
+from ...nodes.Expressions import Matrix, SlicedMatrix, TransposedMatrix
+
+
+def test_copy_shares_rows_until_written():
+    matrix = Matrix([[1, "a"], [3, 4]])
+    copy = matrix.copy()
+    assert copy.rows is matrix.rows
+
+    copy.store(0, 0, 10)
+    assert copy.rows is not matrix.rows
+    assert matrix.rows == [[1, "a"], [3, 4]]
+    matrix.store(1, 1, 40)
+    assert copy.rows == [[10, "a"], [3, 4]]
+
+
+def test_transposed_view_reads_without_building_rows(monkeypatch):
+    monkeypatch.setattr(NumpyBackend, "enabled", False)
+    matrix = Matrix([[float(i * 100 + j) for j in range(100)] for i in range(50)])
+    transposed = matrix.transposed()
+    assert isinstance(transposed, TransposedMatrix)
+    assert (transposed.rowlen(), transposed.collen()) == (100, 50)
+    assert transposed.load(7, 3) == 307.0
+    assert transposed.source_rows is not None
+
+    matrix.store(3, 7, -1.0)
+    assert transposed.load(7, 3) == 307.0
+    transposed.store(0, 0, 5.0)
+    assert transposed.source_rows is None
+    assert transposed.rows[7][3] == 307.0 and transposed.rows[0][0] == 5.0
+    assert matrix.load(0, 0) == 0.0
+
+
+def test_slice_is_a_view_and_block_store_copies_rows(monkeypatch):
+    monkeypatch.setattr(NumpyBackend, "enabled", False)
+    matrix = Matrix([[i * 10 + j for j in range(10)] for i in range(10)])
+    block = matrix.load(slice(2, 5), slice(None))
+    assert isinstance(block, SlicedMatrix)
+    assert (block.rowlen(), block.collen()) == (3, 10)
+    assert block.load(-1, 4) == 44
+
+    matrix.store(slice(0, 3), slice(0, 3), Matrix([[-1] * 3] * 3))
+    assert block.load(0, 0) == 20
+    assert matrix.rows[2][:4] == [-1, -1, -1, 23]
+    matrix.store(slice(None), 9, 0)
+    assert [row[9] for row in matrix.rows] == [0] * 10
+
+
+def test_views_raise_neo_error_for_reads_out_of_bounds(monkeypatch):
+    monkeypatch.setattr(NumpyBackend, "enabled", False)
+    matrix = Matrix([[1, 2, 3], [4, 5, 6]])
+    transposed = matrix.transposed()
+    block = matrix.load(slice(0, 2), slice(1, 3))
+    assert isinstance(transposed, TransposedMatrix) and isinstance(block, SlicedMatrix)
+    for view, first, second in ((transposed, 5, 0), (transposed, 0, 2), (block, 0, 7), (block, -3, 0)):
+        with pytest.raises(NeoRuntimeError, match="Index out of matrix bounds"):
+            view.load(first, second)
+    assert transposed.source_rows is not None and block.source_rows is not None
@@ -0,0 +1,54 @@
+import pytest
+from ...linalg import NumpyBackend, Vectorizer
+from ...lexer.Lexer import Lexer
+from ...lexer.Source import SourceString
+from ...parser.Parser import Parser
+
+
+def function(neo_code):
+    return Parser(Lexer(SourceString(f'var f = {neo_code}'))).parse_program().toplevel_objects[0].expression
+
+
+@pytest.mark.parametrize("neo_code", [
+    'func(x) { return x * 2 + 1 }',
+    'func(value) { return -(value - 0.5) ^ 2 / 3 }',
+    'func(x) { return x // 4 }',
+])
+def test_single_arithmetic_expression_gets_a_kernel(neo_code):
+    assert Vectorizer.kernel_of(function(neo_code)) is not None
+
+
+@pytest.mark.parametrize("neo_code", [
+    'func(x) { print(x) return x }',
+    'func(x) { return x * y }',
+    'func(x) { return x > 2 }',
+    'func(x, y) { return x + y }',
+    'func(x) { return square(x) }',
+    'func(x) { return x + "a" }',
+])
+def test_other_functions_are_called_per_cell(neo_code):
+    assert Vectorizer.kernel_of(function(neo_code)) is None
+
+
+def test_kernels_are_shared_by_expressions_of_the_same_shape():
+    double, triple = (Vectorizer.kernel_of(function(f'func(x) {{ return x * {n} }}')) for n in (2, 3))
+    assert double.cells_kernel is triple.cells_kernel
+    assert double.map_cells([1, 2.5]) == [2, 5.0] and triple.map_cells([1, 2.5]) == [3, 7.5]
+
+
+def test_failing_kernel_leaves_the_cells_to_the_function():
+    kernel = Vectorizer.kernel_of(function('func(x) { return 1 / x }'))
+    assert kernel.map_cells([1, 2]) == [1.0, 0.5]
+    assert kernel.map_cells([1, 0]) is None
+
+
+def test_array_kernel_matches_the_cells_kernel():
+    numpy = pytest.importorskip("numpy")
+    if not NumpyBackend.enabled:
+        pytest.skip("NumPy backend disabled with NEO_NUMPY=0")
+    kernel = Vectorizer.kernel_of(function('func(x) { return (x * 3 - 1) / 7 + x ^ 2 }'))
+    cells = [i / 10 for i in range(-50, 50)]
+    assert kernel.map_array(numpy.array(cells)).tolist() == kernel.map_cells(cells)
+    # NumPy would give nan and inf, Python raises
+    assert Vectorizer.kernel_of(function('func(x) { return x ^ 0.5 }')).map_array(numpy.array([-1.0])) is None
+    assert Vectorizer.kernel_of(function('func(x) { return 1 / x }')).map_array(numpy.array([0.0])) is None
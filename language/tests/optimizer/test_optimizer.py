@@ -0,0 +1,91 @@
+import re
+import pytest
+from ...lexer.Lexer import Lexer
+from ...parser.Parser import Parser
+from ...lexer.Source import SourceString
+from ...optimizer.Optimizer import Optimizer
+from ...interpreter.Interpreter import Interpreter, engines
+from ...nodes.Expressions import BinaryOperator, Bool, Constant, Matrix, Scalar
+from ...nodes.Instructions import Block
+
+
+def optimize(neo_code):
+    optimizer = Optimizer()
+    program = optimizer.optimize_program(Parser(Lexer(SourceString(neo_code))).parse_program())
+    return program, optimizer.removed_nodes
+
+
+def test_arithmetic_is_folded():
+    program, removed = optimize('var a = 2 * 3 + 1 > 6')
+    expression = program.toplevel_objects[0].expression
+    assert isinstance(expression, Bool) and expression.value is True
+    assert removed == 6
+
+
+def test_expressions_with_variables_are_kept():
+    program, _ = optimize('var a = b + 2 * 3')
+    expression = program.toplevel_objects[0].expression
+    assert isinstance(expression, BinaryOperator)
+    assert isinstance(expression.rvalue, Scalar) and expression.rvalue.value == 6
+
+
+def test_failing_expression_is_left_for_runtime():
+    program, removed = optimize('var a = 1 / 0')
+    assert isinstance(program.toplevel_objects[0].expression, BinaryOperator)
+    assert removed == 0
+
+
+def test_constant_branches_are_pruned():
+    program, removed = optimize('''
+    if (True) { print(1) } else { print(2) }
+    if (1 > 2) { print(3) }
+    while (False) { print(4) }
+    ''')
+    assert len(program.toplevel_objects) == 1
+    assert isinstance(program.toplevel_objects[0], Block)
+    assert removed == 20
+
+
+def test_constant_matrix_and_pure_builtin_are_precomputed():
+    program, _ = optimize('''
+    var m = [1, 2 | 3, 4 * 2]
+    var z = zeros(2, 3)
+    var n = [1, x]
+    ''')
+    m, z, n = (declaration.expression for declaration in program.toplevel_objects)
+    assert isinstance(m, Constant) and m.value.rows == [[1, 2], [3, 8]]
+    assert isinstance(z, Constant) and z.value.rows == [[0, 0, 0], [0, 0, 0]]
+    assert isinstance(n, Matrix)
+
+
+def test_builtin_shadowed_by_variable_is_not_precomputed():
+    program, _ = optimize('''
+    var z = zeros(2, 3)
+    var zeros = func(a, b) { return a }
+    ''')
+    assert not isinstance(program.toplevel_objects[0].expression, Constant)
+
+@pytest.mark.parametrize("engine", engines)
+def test_precomputed_matrix_is_not_shared(engine, capsys):
+    program, _ = optimize('''
+    var mut i = 0
+    while (i < 2) {
+        var mut m = [0, 0]
+        m[0, 1] = m[0, 1] + 1
+        print(m[0, 1])
+        i = i + 1
+    }
+    ''')
+    Interpreter(program, engine).run()
+    assert re.sub(r'\s+', '', capsys.readouterr().out) == '11'
+
+
+@pytest.mark.parametrize("engine", engines)
+def test_call_on_right_side_of_pipe_is_not_folded(engine, capsys):
+    program, _ = optimize('''
+    print(range(1, 3) |> map(func(x) { return x * 2 }) |> sum)
+    print(1 |> range(4))
+    ''')
+    assert isinstance(program.toplevel_objects[0].arguments[0], BinaryOperator)
+    Interpreter(program, engine).run()
+    assert re.sub(r'\s+', '', capsys.readouterr().out) == '6-------------|123|-------------'
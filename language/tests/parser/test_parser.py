@@ -92,4 +92,45 @@ def test_function():
     assert isinstance(fun.block.instructions[0].condition, Scalar)
     assert isinstance(fun.block.instructions[0].else_block.instructions[0], FunctionCall)
     assert isinstance(fun.block.instructions[0].block.instructions[0], Return)
-    assert isinstance(fun.block.instructions[0].block.instructions[0].expression, Property)
\ No newline at end of file
+    assert isinstance(fun.block.instructions[0].block.instructions[0].expression, Property)
+
+def test_matrix_slices():
+    neo_code = '''
+    var a = m[0:10, 2]
+    var b = m[:, 3]
+    var c = m[1:, :n]
+    m[0:5, 0:5] = other
+    '''
+    parser = Parser(Lexer(SourceString(neo_code)))
+    objects = parser.parse_program().toplevel_objects
+
+    first = objects[0].expression
+    assert isinstance(first.first, Slice) and isinstance(first.second, Scalar)
+    assert first.first.start.value == 0 and first.first.stop.value == 10
+
+    second = objects[1].expression
+    assert second.first.start is None and second.first.stop is None
+    assert second.second.value == 3
+
+    third = objects[2].expression
+    assert third.first.start.value == 1 and third.first.stop is None
+    assert third.second.start is None and isinstance(third.second.stop, Identifier)
+
+    assignment = objects[3]
+    assert isinstance(assignment.first_index, Slice) and isinstance(assignment.second_index, Slice)
+
+
+def test_nodes_are_slotted_and_keep_positions():
+    neo_code = '''
+    var m = [1, 2 | x, 4]
+    print(m[0, 1] + -m.det)
+    '''
+    objects = Parser(Lexer(SourceString(neo_code))).parse_program().toplevel_objects
+    matrix = objects[0].expression
+    assert (matrix.line, matrix.column) == (2, 13)
+    assert (matrix.rows[1][0].line, matrix.rows[1][0].column) == (2, 21)
+    call = objects[1]
+    assert (call.line, call.column) == (3, 5)
+
+    nodes = [objects[0], matrix, matrix.rows[0][0], matrix.rows[1][0], call, call.arguments[0], call.arguments[0].rvalue]
+    assert not any(hasattr(node, "__dict__") for node in nodes)
@@ -0,0 +1,80 @@
+from ...lexer.Lexer import Lexer
+from ...parser.Parser import Parser
+from ...lexer.Source import SourceString
+from ...resolver.Resolver import Resolver
+
+
+def resolve(neo_code):
+    return Resolver().resolve_program(Parser(Lexer(SourceString(neo_code))).parse_program())
+
+
+def test_slots_in_nested_blocks_share_function_frame():
+    program = resolve('''
+    var a = 1
+    {
+        var b = 2
+        {
+            var c = a + b
+        }
+    }
+    ''')
+    declaration_a, outer_block = program.toplevel_objects
+    declaration_b, inner_block = outer_block.instructions
+    declaration_c = inner_block.instructions[0]
+
+    assert program.frame_size == 3
+    assert [declaration_a.identifier.slot, declaration_b.identifier.slot, declaration_c.identifier.slot] == [0, 1, 2]
+    assert (declaration_c.expression.lvalue.depth, declaration_c.expression.lvalue.slot) == (0, 0)
+    assert (declaration_c.expression.rvalue.depth, declaration_c.expression.rvalue.slot) == (0, 1)
+
+
+def test_depth_counts_function_frames():
+    program = resolve('''
+    var global_var = 1
+    func outer(x) {
+        func inner() {
+            return x + global_var
+        }
+        return inner
+    }
+    ''')
+    outer = program.toplevel_objects[1]
+    inner = outer.block.instructions[0]
+    addition = inner.block.instructions[0].expression
+
+    assert outer.block.frame_size == 2
+    assert (addition.lvalue.depth, addition.lvalue.slot) == (1, 0)
+    assert (addition.rvalue.depth, addition.rvalue.slot) == (2, 0)
+
+
+def test_names_are_hoisted_for_earlier_functions():
+    program = resolve('''
+    func is_even(n) {
+        return is_odd(n)
+    }
+    func is_odd(n) {
+        return is_even(n)
+    }
+    ''')
+    is_even, is_odd = program.toplevel_objects
+    call = is_even.block.instructions[0].expression
+    assert (call.function_name_or_body.depth, call.function_name_or_body.slot) == (1, is_odd.name.slot)
+
+
+def test_mutability_builtins_and_redeclaration():
+    program = resolve('''
+    var mut a = 1
+    var b = 2
+    a = 3
+    b = 4
+    c = 5
+    var b = 6
+    print(a)
+    ''')
+    _, first_b, assign_a, assign_b, assign_c, second_b, call = program.toplevel_objects
+
+    assert assign_a.mutable is True
+    assert assign_b.mutable is False
+    assert assign_c.mutable is None and assign_c.identifier.slot is None
+    assert not first_b.redeclared and second_b.redeclared
+    assert call.function_name_or_body.builtin